@@ -0,0 +1,17 @@
+"""
+UTC timestamps for expiry columns (idempotency keys, result cache, run leases).
+
+Those columns are compared as strings in SQL (`expires_at < ?`), which is only
+correct when every value has the same width: utc_iso always writes
+microseconds (datetime.isoformat drops them when they are 0).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def utc_iso(dt: Optional[datetime] = None) -> str:
+    """`2026-10-18T09:30:00.000000Z`; dt defaults to now."""
+    dt = dt or datetime.now(timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
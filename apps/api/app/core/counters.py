@@ -0,0 +1,72 @@
+"""
+Row totals for list endpoints (?count=exact|estimate|none).
+
+Full COUNT(1) over a filtered table dominated GET /assets on large libraries.
+Migration 0006_list_counters keeps per-filter counters in list_counters via
+triggers (same transaction as the write), so the common filters are O(1):
+
+- exact:    counter when the filter has one, else COUNT(1)
+- estimate: counter when available, else COUNT(1) over at most
+            LIST_COUNT_ESTIMATE_CAP rows (a lower bound once the cap is hit)
+- none:     no count at all; has_more comes from the LIMIT n+1 probe
+
+Databases without the migration fall back to COUNT(1) for exact.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Literal, Optional, Sequence, Tuple
+
+from app.core import schema
+from app.core.env import env_int
+
+CountMode = Literal["exact", "estimate", "none"]
+COUNT_MODES = ("exact", "estimate", "none")
+
+
+def _estimate_cap() -> int:
+    return env_int("LIST_COUNT_ESTIMATE_CAP", 10000, minimum=1)
+
+
+def read_counter(conn: sqlite3.Connection, scope: str, key: str) -> Optional[int]:
+    """
+    Counter value, or None when `scope` is not maintained in this database.
+    A maintained scope with no row for `key` counts 0.
+    """
+    if not schema.table_exists(conn, "list_counters"):
+        return None
+    if not schema.trigger_exists(conn, f"trg_{scope}_count_ins"):
+        return None
+    row = conn.execute("SELECT n FROM list_counters WHERE scope=? AND key=?;", (scope, key)).fetchone()
+    return max(int(row[0]), 0) if row is not None else 0
+
+
+def count_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    where_sql: str,
+    params: Sequence[Any],
+    *,
+    mode: str,
+    counter: Optional[Tuple[str, Sequence[str]]] = None,
+) -> Optional[int]:
+    """
+    where_sql: "" or "WHERE ..." (the list filter, without any cursor predicate).
+    counter: (scope, keys) whose counters sum to exactly this filter, if any.
+    Returns None for mode=none.
+    """
+    if mode == "none":
+        return None
+    if counter is not None:
+        scope, keys = counter
+        ns = [read_counter(conn, scope, k) for k in keys]
+        if ns and all(n is not None for n in ns):
+            return sum(ns)  # type: ignore[arg-type]
+    if mode == "estimate":
+        cap = _estimate_cap()
+        row = conn.execute(
+            f"SELECT COUNT(1) AS c FROM (SELECT 1 FROM {table} {where_sql} LIMIT ?)",
+            (*params, cap),
+        ).fetchone()
+        return int(row[0])
+    return int(conn.execute(f"SELECT COUNT(1) AS c FROM {table} {where_sql}", tuple(params)).fetchone()[0])
@@ -3,16 +3,35 @@ DB utilities (sqlite default) for BATCH-1.
 
 Defaults (per ARCH):
 - DATABASE_URL: sqlite:///./data/app.db
+
+Raw sqlite3 access for service modules goes through connect(), which hands out
+pooled connections (see SqlitePool). Pool tuning (env):
+- DB_POOL_SIZE: idle connections kept per database file (default 8)
+- DB_POOL_MAX_OVERFLOW: extra connections allowed under burst (default 32; size+overflow
+  matches the 40-thread anyio limiter that runs sync routes)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection (default 30)
+
+Every connection (pooled sqlite3 and the SQLAlchemy engine) gets the same storage
+profile applied on open (see get_storage_profile):
+- DB_STORAGE_PROFILE: balanced (default) | durable | legacy
+- per-key overrides: DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_BUSY_TIMEOUT_MS,
+  DB_MMAP_SIZE, DB_CACHE_SIZE, DB_TEMP_STORE
 """
 from __future__ import annotations
 
 import os
+import sqlite3
+import threading
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Union
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 
+from app.core.env import env_float, env_int
+
 
 def get_database_url() -> str:
     return os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
@@ -40,6 +59,313 @@ def resolve_sqlite_path(database_url: str) -> Optional[Path]:
     return (_repo_root() / p).resolve()
 
 
+@lru_cache(maxsize=32)
+def _cached_sqlite_path(url: str) -> Optional[Path]:
+    return resolve_sqlite_path(url)
+
+
+def get_sqlite_path(database_url: Optional[str] = None) -> Path:
+    url = database_url or get_database_url()
+    sp = _cached_sqlite_path(url)
+    if sp is None:
+        raise ValueError(f"Only sqlite supported for now, got DATABASE_URL={url!r}")
+    return sp
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that returns itself to its pool on close().
+    Call sites keep the usual `conn = connect(); try: ... finally: conn.close()` shape.
+    """
+
+    _pool: Optional["SqlitePool"] = None
+    _checked_out: bool = False
+    # app.core.schema re-validates PRAGMA schema_version once per checkout
+    schema_checked: bool = False
+
+    def close(self) -> None:
+        pool = self._pool
+        if pool is None:
+            super().close()
+            return
+        if not self._checked_out:
+            return
+        self._checked_out = False
+        pool.release(self)
+
+    def close_physical(self) -> None:
+        self._pool = None
+        super().close()
+
+
+class SqlitePool:
+    """
+    Bounded pool of sqlite3 connections for one database file.
+
+    - Thread-aware: a connection is owned by exactly one thread between acquire()
+      and close(); connections are opened with check_same_thread=False so the anyio
+      worker that picks one up next may differ from the one that opened it.
+    - Bounded: at most `size` idle connections are kept; up to `max_overflow` more are
+      opened under burst and closed on release. When both are exhausted acquire()
+      waits up to `timeout` seconds.
+    - Per-connection setup (row_factory, PRAGMAs) runs once, when the connection is opened.
+    - Fork-safe: a pool created in a parent process is never reused in a child.
+    """
+
+    def __init__(self, path: Path, *, size: int, max_overflow: int, timeout: float) -> None:
+        self.path = path
+        self.size = max(size, 0)
+        self.max_overflow = max(max_overflow, 0)
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle: Deque[PooledConnection] = deque()
+        self._open = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def _new_connection(self) -> PooledConnection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        _init_connection(conn)
+        conn._pool = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    conn = None
+                    break
+                if not self._cond.wait(timeout=self.timeout):
+                    raise RuntimeError(f"db pool exhausted (size={self.size}, max_overflow={self.max_overflow})")
+        if conn is None:
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+        conn._checked_out = True
+        conn.schema_checked = False
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if conn is not None:
+            try:
+                conn.close_physical()
+            except sqlite3.Error:
+                pass
+
+    def dispose(self) -> None:
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn in idle:
+            try:
+                conn.close_physical()
+            except sqlite3.Error:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            }
+
+
+# balanced: WAL readers never block on the writer (run_events appends vs GET /assets);
+#           synchronous=NORMAL is crash-safe in WAL, may lose the last commits on power loss
+# durable:  WAL + fsync on every commit
+# legacy:   pre-WAL behaviour (rollback journal), kept for rollback
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 10000,
+        "mmap_size": 0,
+        "cache_size": -16384,
+        "temp_store": "DEFAULT",
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+    },
+}
+
+_PROFILE_ENV = {
+    "journal_mode": "DB_JOURNAL_MODE",
+    "synchronous": "DB_SYNCHRONOUS",
+    "busy_timeout": "DB_BUSY_TIMEOUT_MS",
+    "mmap_size": "DB_MMAP_SIZE",
+    "cache_size": "DB_CACHE_SIZE",
+    "temp_store": "DB_TEMP_STORE",
+}
+
+_PROFILE_CHOICES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+# PRAGMA synchronous / temp_store read back as integers
+_SYNCHRONOUS_NAMES = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+_TEMP_STORE_NAMES = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def get_storage_profile() -> Dict[str, Any]:
+    """
+    Resolved storage profile: preset from DB_STORAGE_PROFILE plus per-key env overrides.
+    Invalid overrides are ignored (preset value kept) so a typo never breaks boot.
+    """
+    name = (os.getenv("DB_STORAGE_PROFILE") or "balanced").strip().lower()
+    if name not in STORAGE_PROFILES:
+        name = "balanced"
+    prof: Dict[str, Any] = {"name": name, **STORAGE_PROFILES[name]}
+
+    for key, env in _PROFILE_ENV.items():
+        raw = (os.getenv(env) or "").strip()
+        if not raw:
+            continue
+        if key in _PROFILE_CHOICES:
+            if raw.upper() in _PROFILE_CHOICES[key]:
+                prof[key] = raw.upper()
+        else:
+            try:
+                prof[key] = int(raw)
+            except ValueError:
+                pass
+    return prof
+
+
+def apply_storage_profile(dbapi_conn: Any, profile: Optional[Dict[str, Any]] = None) -> None:
+    p = profile or get_storage_profile()
+    cur = dbapi_conn.cursor()
+    try:
+        # busy_timeout first: switching journal_mode may need to wait for other writers
+        cur.execute(f"PRAGMA busy_timeout={int(p['busy_timeout'])};")
+        cur.execute(f"PRAGMA journal_mode={p['journal_mode']};")
+        cur.execute(f"PRAGMA synchronous={p['synchronous']};")
+        cur.execute(f"PRAGMA mmap_size={int(p['mmap_size'])};")
+        cur.execute(f"PRAGMA cache_size={int(p['cache_size'])};")
+        cur.execute(f"PRAGMA temp_store={p['temp_store']};")
+    finally:
+        cur.close()
+
+
+def read_storage_profile(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Effective PRAGMA values as sqlite reports them on `conn`."""
+
+    def one(pragma: str) -> Any:
+        row = conn.execute(f"PRAGMA {pragma};").fetchone()
+        return row[0] if row is not None else None
+
+    return {
+        "journal_mode": str(one("journal_mode") or "").upper(),
+        "synchronous": _SYNCHRONOUS_NAMES.get(one("synchronous"), "UNKNOWN"),
+        "busy_timeout": one("busy_timeout"),
+        "mmap_size": one("mmap_size"),
+        "cache_size": one("cache_size"),
+        "temp_store": _TEMP_STORE_NAMES.get(one("temp_store"), "UNKNOWN"),
+    }
+
+
+# optional per-statement observer for diagnostics (app.tools.query_plan_check)
+_statement_tracer: Optional[Callable[[str], None]] = None
+
+
+def set_statement_tracer(fn: Optional[Callable[[str], None]]) -> None:
+    """
+    Install (or clear with None) a sqlite3 trace callback on every connection opened
+    from now on. Pools are disposed so no untraced connection is handed out.
+    """
+    global _statement_tracer
+    _statement_tracer = fn
+    dispose_pools()
+
+
+def _init_connection(conn: sqlite3.Connection) -> None:
+    apply_storage_profile(conn)
+    if _statement_tracer is not None:
+        conn.set_trace_callback(_statement_tracer)
+
+
+_pools: Dict[str, SqlitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: Union[str, Path, None] = None) -> SqlitePool:
+    sp = Path(path) if path is not None else get_sqlite_path()
+    key = str(sp)
+    pid = os.getpid()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != pid:
+            # after fork the inherited handles belong to the parent: drop them, never close them
+            pool = SqlitePool(
+                sp,
+                size=env_int("DB_POOL_SIZE", 8),
+                max_overflow=env_int("DB_POOL_MAX_OVERFLOW", 32),
+                timeout=env_float("DB_POOL_TIMEOUT", 30.0),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def connect(path: Union[str, Path, None] = None) -> sqlite3.Connection:
+    """
+    Shared entry point for raw sqlite3 access (rows are sqlite3.Row).
+    close() hands the connection back to the pool; uncommitted work is rolled back.
+    """
+    return get_pool(path).acquire()
+
+
+def dispose_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        if pool.pid == os.getpid():
+            pool.dispose()
+
+
 _engine: Optional[Engine] = None
 
 
@@ -59,6 +385,8 @@ def get_engine() -> Engine:
         url = "sqlite:///" + sp.as_posix()
 
     _engine = create_engine(url, future=True, connect_args=connect_args)
+    if sp is not None:
+        event.listen(_engine, "connect", lambda dbapi_conn, _rec: apply_storage_profile(dbapi_conn))
     return _engine
 
 
@@ -73,6 +401,17 @@ def db_health() -> Dict[str, Any]:
         eng = get_engine()
         with eng.connect() as conn:
             conn.execute(text("SELECT 1"))
-        return {"status": "ok", "kind": kind, "path": path}
+
+        profile = get_storage_profile()
+        out: Dict[str, Any] = {"status": "ok", "kind": kind, "path": path, "profile": {"name": profile["name"]}}
+        if sp is not None:
+            pool = get_pool(sp)
+            c = pool.acquire()
+            try:
+                out["profile"]["effective"] = read_storage_profile(c)
+            finally:
+                c.close()
+            out["pool"] = pool.status()
+        return out
     except Exception as e:
         return {"status": "error", "kind": kind, "path": path, "error": str(e)}
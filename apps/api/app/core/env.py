@@ -0,0 +1,27 @@
+"""
+Numeric settings from the environment.
+
+Unset, empty or unparsable values fall back to the default, so a typo in a
+tuning knob never stops the API from starting.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+
+def env_int(name: str, default: int, minimum: Optional[int] = None) -> int:
+    """int(os.environ[name]) or default; values below minimum are raised to it."""
+    try:
+        v = int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+    return v if minimum is None else max(v, minimum)
+
+
+def env_float(name: str, default: float, minimum: Optional[float] = None) -> float:
+    try:
+        v = float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+    return v if minimum is None else max(v, minimum)
@@ -0,0 +1,242 @@
+"""
+Idempotency-Key support for create endpoints (POST /runs, /reviews, /characters,
+/shots/{id}/links).
+
+Client retries after a timeout used to create duplicate prompt_packs, runs and
+provider executions, and the append-only triggers make those permanent. A request
+carrying `Idempotency-Key: <key>` is claimed in idempotency_keys (migration
+0008_idempotency_keys; created on demand otherwise) before the endpoint runs:
+
+- first request: claim (pending), run the endpoint, store status + JSON body
+- retry with the same key and body: stored response replayed, endpoint not run
+  (`Idempotency-Replayed: true`); no new rows, no provider execution
+- same key while the first request is still running: 409 idempotency_key_in_progress
+- same key with a different body (or behaviour headers, e.g. X-Provider-Enabled on
+  POST /runs): 422 idempotency_key_reused
+- 5xx / raised errors release the claim so the retry executes again
+
+Keys are scoped per endpoint and expire after IDEMPOTENCY_TTL_S (default 86400);
+a pending claim whose request died is reclaimable after IDEMPOTENCY_PENDING_TTL_S
+(default 300). Expired rows are purged opportunistically (indexed on expires_at).
+Requests without the header behave exactly as before.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple, get_type_hints
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core import schema
+from app.core.clock import utc_iso
+from app.core.db import connect
+from app.core.env import env_int
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LEN = 255
+
+_DDL: Dict[str, str] = {
+    "idempotency_keys": """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            state TEXT NOT NULL,
+            status_code INTEGER,
+            response_json TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            PRIMARY KEY (scope, key)
+        );
+        """,
+    "ix_idempotency_keys_expires_at": "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);",
+}
+
+_PURGE_EVERY_S = 60.0
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def _request_id(request: Request) -> str:
+    return str(getattr(request.state, "request_id", "") or "")
+
+
+def _err(request: Request, status: int, error: str, message: str, details: Dict[str, Any]) -> JSONResponse:
+    body = {"error": error, "message": message, "request_id": _request_id(request), "details": details}
+    return JSONResponse(status_code=status, content=body)
+
+
+def fingerprint(scope: str, args: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> str:
+    """
+    sha256 over the endpoint's path params and body (canonical JSON), plus the
+    values of the behaviour-changing request headers that were sent.
+    """
+    norm: Dict[str, Any] = {}
+    for k, v in args.items():
+        if isinstance(v, (Request, Response)):
+            continue
+        norm[k] = v.model_dump(mode="json") if isinstance(v, BaseModel) else jsonable_encoder(v)
+    doc: Dict[str, Any] = {"scope": scope, "args": norm}
+    if headers:
+        doc["headers"] = headers
+    raw = json.dumps(doc, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _maybe_purge(conn: sqlite3.Connection, now: str) -> None:
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < _PURGE_EVERY_S:
+            return
+        _last_purge = time.monotonic()
+    conn.execute("DELETE FROM idempotency_keys WHERE expires_at < ?;", (now,))
+    conn.commit()
+
+
+def _claim(scope: str, key: str, fp: str) -> Optional[sqlite3.Row]:
+    """
+    Claim (scope, key) as pending. Returns None when claimed by this request,
+    else the live row held by an earlier request.
+    """
+    now_dt = datetime.now(timezone.utc)
+    now = utc_iso(now_dt)
+    pending_until = utc_iso(now_dt + timedelta(seconds=env_int("IDEMPOTENCY_PENDING_TTL_S", 300, minimum=1)))
+    conn = connect()
+    try:
+        schema.ensure_objects(conn, _DDL)
+        _maybe_purge(conn, now)
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            row = conn.execute(
+                "SELECT * FROM idempotency_keys WHERE scope=? AND key=?;", (scope, key)
+            ).fetchone()
+            if row is not None and str(row["expires_at"]) >= now:
+                conn.rollback()
+                return row
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO idempotency_keys
+                    (scope, key, fingerprint, state, status_code, response_json, created_at, expires_at)
+                VALUES (?,?,?,'pending',NULL,NULL,?,?);
+                """,
+                (scope, key, fp, now, pending_until),
+            )
+            conn.commit()
+            return None
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+
+
+def _complete(scope: str, key: str, status_code: int, body: Any) -> None:
+    now_dt = datetime.now(timezone.utc)
+    expires = utc_iso(now_dt + timedelta(seconds=env_int("IDEMPOTENCY_TTL_S", 86400, minimum=1)))
+    conn = connect()
+    try:
+        conn.execute(
+            """
+            UPDATE idempotency_keys SET state='complete', status_code=?, response_json=?, expires_at=?
+            WHERE scope=? AND key=? AND state='pending';
+            """,
+            (status_code, json.dumps(body, ensure_ascii=False), expires, scope, key),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _release(scope: str, key: str) -> None:
+    try:
+        conn = connect()
+        try:
+            conn.execute("DELETE FROM idempotency_keys WHERE scope=? AND key=? AND state='pending';", (scope, key))
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        # the claim then expires after IDEMPOTENCY_PENDING_TTL_S
+        pass
+
+
+def _as_stored(result: Any, exclude_none: bool) -> Optional[tuple]:
+    """(status_code, json body) for the endpoint's return value; None when not storable."""
+    if isinstance(result, JSONResponse):
+        try:
+            return result.status_code, json.loads(bytes(result.body).decode("utf-8"))
+        except Exception:
+            return None
+    if isinstance(result, Response):
+        return None
+    return 200, jsonable_encoder(result, exclude_none=exclude_none)
+
+
+def idempotent(scope: str, *, exclude_none: bool = False, headers: Tuple[str, ...] = ()) -> Callable:
+    """
+    Decorator for a sync create endpoint that takes `request: Request`.
+    scope: stable endpoint name (keys are unique per scope).
+    exclude_none: mirror the route's response_model_exclude_none for stored bodies.
+    headers: request headers that change what the endpoint does; their values are
+    part of the fingerprint, so a retry that changes one gets 422 instead of a replay.
+    """
+
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Optional[Request] = kwargs.get("request")
+            key = (request.headers.get(HEADER) or "").strip() if request is not None else ""
+            if not key:
+                return fn(*args, **kwargs)
+            if len(key) > MAX_KEY_LEN:
+                return _err(request, 400, "invalid_idempotency_key", "Idempotency-Key is too long", {"max_length": MAX_KEY_LEN})
+
+            sent = {h.lower(): request.headers[h].strip() for h in headers if request.headers.get(h) is not None}
+            fp = fingerprint(scope, kwargs, sent)
+            held = _claim(scope, key, fp)
+            if held is not None:
+                if held["fingerprint"] != fp:
+                    return _err(request, 422, "idempotency_key_reused",
+                                "Idempotency-Key was used with a different request", {"key": key})
+                if held["state"] != "complete":
+                    return _err(request, 409, "idempotency_key_in_progress",
+                                "a request with this Idempotency-Key is still in progress", {"key": key})
+                return JSONResponse(
+                    status_code=int(held["status_code"]),
+                    content=json.loads(held["response_json"]),
+                    headers={"Idempotency-Replayed": "true"},
+                )
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                _release(scope, key)
+                raise
+            stored = _as_stored(result, exclude_none)
+            if stored is None or stored[0] >= 500:
+                _release(scope, key)
+            else:
+                _complete(scope, key, stored[0], stored[1])
+            return result
+
+        # routers use `from __future__ import annotations`; FastAPI would resolve the
+        # string annotations against this module, so hand it the resolved signature
+        hints = get_type_hints(fn)
+        sig = inspect.signature(fn)
+        wrapper.__signature__ = sig.replace(  # type: ignore[attr-defined]
+            parameters=[p.replace(annotation=hints.get(p.name, p.annotation)) for p in sig.parameters.values()],
+            return_annotation=hints.get("return", sig.return_annotation),
+        )
+        return wrapper
+
+    return deco
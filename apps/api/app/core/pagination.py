@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination shared by list endpoints.
+
+LIMIT/OFFSET walks and discards every skipped row, so deep pages get linearly
+slower. In cursor mode a page starts strictly after the sort key of the previous
+page's last row:
+
+    WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT n+1
+
+which the matching composite index (migration 0005_list_keyset_indexes) serves
+as a range scan. The extra row only decides has_more.
+
+Cursors are opaque to clients: base64url(json([order_tag, v1, v2, ...])). The tag
+names the ordering, so a cursor cannot be replayed against a different list.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ListPage(NamedTuple):
+    items: List[Any]
+    total: Optional[int]  # None when the caller asked for count=none
+    has_more: bool  # from the LIMIT n+1 probe, never from total
+    next_cursor: Optional[str]
+
+
+@dataclass(frozen=True)
+class KeysetOrder:
+    tag: str
+    # sort key, most significant first; every column is sorted DESC and NOT NULL,
+    # the last one unique (the primary key)
+    columns: Tuple[str, ...]
+
+    def order_by(self) -> str:
+        return ", ".join(f"{c} DESC" for c in self.columns)
+
+    def after(self, values: Sequence[Any]) -> Tuple[str, List[Any]]:
+        """Row-value predicate selecting rows that sort after `values`."""
+        cols = ", ".join(self.columns)
+        ph = ", ".join(["?"] * len(self.columns))
+        return f"({cols}) < ({ph})", list(values)
+
+    def encode(self, row: Mapping[str, Any]) -> str:
+        raw = json.dumps([self.tag, *[row[c] for c in self.columns]], ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            pad = "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode((cursor + pad).encode("ascii")).decode("utf-8"))
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise InvalidCursor("malformed cursor") from e
+        if not isinstance(data, list) or len(data) != len(self.columns) + 1 or data[0] != self.tag:
+            raise InvalidCursor(f"cursor does not belong to this list ({self.tag})")
+        values = data[1:]
+        if any(v is None or isinstance(v, (list, dict)) for v in values):
+            raise InvalidCursor("malformed cursor")
+        return values
+
+
+def split_page(rows: List[Any], limit: int, order: KeysetOrder) -> Tuple[List[Any], Optional[str]]:
+    """
+    rows were fetched with LIMIT limit+1. Returns (page_rows, next_cursor);
+    next_cursor is None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, order.encode(page[-1])
@@ -0,0 +1,165 @@
+"""
+Process-wide sqlite schema catalog.
+
+Service modules adapt to the live schema (column names, primary keys, optional
+tables), which used to cost a PRAGMA table_info / sqlite_master lookup on every
+insert and read. The catalog loads every table, index and trigger once per database file
+and keeps it until PRAGMA schema_version moves.
+
+- schema_version is checked at most once per pooled-connection checkout
+  (see app.core.db.PooledConnection.schema_checked)
+- ensure_objects() runs idempotent DDL only for objects the catalog has not seen,
+  then invalidates, so "CREATE ... IF NOT EXISTS" no longer runs per call
+- returned mappings are shared: callers must treat them as read-only
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    name: str
+    # name -> {"cid", "type" (upper), "notnull", "dflt_value", "pk"}; declaration order
+    columns: Dict[str, Dict[str, Any]]
+    column_set: frozenset
+    pk: Optional[str]
+
+
+@dataclass
+class _Snapshot:
+    version: int
+    tables: Dict[str, TableSchema] = field(default_factory=dict)
+    indexes: frozenset = frozenset()
+    triggers: frozenset = frozenset()
+
+
+_EMPTY_COLUMNS: Dict[str, Dict[str, Any]] = {}
+
+_lock = threading.Lock()
+_snapshots: Dict[str, _Snapshot] = {}
+
+
+def db_key(conn: sqlite3.Connection) -> Optional[str]:
+    """Database file of a pooled connection (key for per-database caches); None if unpooled."""
+    pool = getattr(conn, "_pool", None)
+    return str(pool.path) if pool is not None else None
+
+
+def _load(conn: sqlite3.Connection, version: int) -> _Snapshot:
+    snap = _Snapshot(version=version)
+    rows = conn.execute(
+        "SELECT type, name FROM sqlite_master WHERE type IN ('table','index','trigger') AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    indexes = set()
+    triggers = set()
+    for r in rows:
+        kind, name = r[0], r[1]
+        if kind == "index":
+            indexes.add(name)
+            continue
+        if kind == "trigger":
+            triggers.add(name)
+            continue
+        cols: Dict[str, Dict[str, Any]] = {}
+        pk: Optional[str] = None
+        for c in conn.execute(f"PRAGMA table_info({name});").fetchall():
+            cols[c[1]] = {
+                "cid": int(c[0]),
+                "type": (c[2] or "").upper(),
+                "notnull": int(c[3]),
+                "dflt_value": c[4],
+                "pk": int(c[5]),
+            }
+            if pk is None and int(c[5]) == 1:
+                pk = c[1]
+        snap.tables[name] = TableSchema(name=name, columns=cols, column_set=frozenset(cols), pk=pk)
+    snap.indexes = frozenset(indexes)
+    snap.triggers = frozenset(triggers)
+    return snap
+
+
+def _snapshot(conn: sqlite3.Connection) -> _Snapshot:
+    key = db_key(conn)
+    if key is None:
+        # unpooled connection (e.g. alembic/tools): nothing to key a cache on
+        return _load(conn, int(conn.execute("PRAGMA schema_version;").fetchone()[0]))
+
+    snap = _snapshots.get(key)
+    if snap is not None and getattr(conn, "schema_checked", False):
+        return snap
+
+    version = int(conn.execute("PRAGMA schema_version;").fetchone()[0])
+    conn.schema_checked = True  # type: ignore[attr-defined]
+
+    if snap is not None and snap.version == version:
+        return snap
+    with _lock:
+        snap = _snapshots.get(key)
+        if snap is None or snap.version != version:
+            snap = _load(conn, version)
+            _snapshots[key] = snap
+        return snap
+
+
+def invalidate(conn: Optional[sqlite3.Connection] = None) -> None:
+    with _lock:
+        if conn is None:
+            _snapshots.clear()
+            return
+        key = db_key(conn)
+        if key is not None:
+            _snapshots.pop(key, None)
+    if key is not None:
+        conn.schema_checked = False  # type: ignore[attr-defined]
+
+
+def list_tables(conn: sqlite3.Connection) -> List[str]:
+    return list(_snapshot(conn).tables)
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return table in _snapshot(conn).tables
+
+
+def get_table(conn: sqlite3.Connection, table: str) -> Optional[TableSchema]:
+    return _snapshot(conn).tables.get(table)
+
+
+def table_info(conn: sqlite3.Connection, table: str) -> Mapping[str, Dict[str, Any]]:
+    t = _snapshot(conn).tables.get(table)
+    return t.columns if t is not None else _EMPTY_COLUMNS
+
+
+def columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return list(table_info(conn, table))
+
+
+def primary_key(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    t = _snapshot(conn).tables.get(table)
+    return t.pk if t is not None else None
+
+
+def index_exists(conn: sqlite3.Connection, index: str) -> bool:
+    return index in _snapshot(conn).indexes
+
+
+def trigger_exists(conn: sqlite3.Connection, trigger: str) -> bool:
+    return trigger in _snapshot(conn).triggers
+
+
+def ensure_objects(conn: sqlite3.Connection, ddl: Mapping[str, str]) -> None:
+    """
+    ddl: {object_name: "CREATE TABLE/INDEX/TRIGGER IF NOT EXISTS ..."}, applied in order.
+    No-op (and no DDL round-trip) once every object is in the catalog.
+    """
+    snap = _snapshot(conn)
+    missing = [name for name in ddl if name not in snap.tables and name not in snap.indexes and name not in snap.triggers]
+    if not missing:
+        return
+    for name in missing:
+        conn.execute(ddl[name])
+    invalidate(conn)
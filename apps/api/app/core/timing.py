@@ -0,0 +1,70 @@
+"""
+Per-request stage timings: a Server-Timing header value plus a structured log line.
+
+    timer = StageTimer()
+    with timer.stage("resolve"):
+        ...
+    response.headers["Server-Timing"] = timer.header()
+
+Stages are recorded in the order they finish; a stage that raises is still
+recorded. Env: SERVER_TIMING=0 keeps the header off responses (the log line stays).
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+
+def header_enabled() -> bool:
+    return (os.getenv("SERVER_TIMING", "1") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def stages(timer: Optional["StageTimer"]) -> Callable[[str], ContextManager[None]]:
+    """timer.stage, or a no-op stage when there is no timer (callers outside a timed request)."""
+    return timer.stage if timer is not None else (lambda name: nullcontext())
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - t) * 1000.0))
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def as_dict(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for name, ms in self.stages:
+            out[name] = round(out.get(name, 0.0) + ms, 3)
+        out["total"] = round(self.total_ms(), 3)
+        return out
+
+    def header(self) -> str:
+        """Server-Timing value: `resolve;dur=0.41, insert;dur=1.20, total;dur=1.90`."""
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.as_dict().items())
+
+    def emit(self, event: str, request_id: Optional[str], module: str, **extra: Any) -> None:
+        """One JSON log line (same shape as the request logs) carrying the stage durations in ms."""
+        payload: Dict[str, Any] = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "level": "info",
+            "message": " ".join(f"{k}={v}ms" for k, v in self.as_dict().items()),
+            "request_id": request_id,
+            "event": event,
+            "module": module,
+            "stages_ms": self.as_dict(),
+        }
+        payload.update(extra)
+        print(json.dumps(payload, ensure_ascii=False), flush=True)
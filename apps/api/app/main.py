@@ -23,6 +23,10 @@ app.include_router(trash_router)
 app.include_router(shots_router)
 app.include_router(provider_profiles_router)
 
+# drain the background run workers on shutdown
+from app.modules.runs.executor import shutdown_executor
+app.add_event_handler("shutdown", shutdown_executor)
+
 
 # --- BATCH-1 STEP-030: health db/storage enrich (do not remove) ---
 # Purpose: keep /health top-level keys stable while ensuring db/storage details exist.
@@ -158,10 +162,12 @@ async def _unhandled_exc_handler(request: Request, exc: Exception):
 def health():
     # Contract keys are locked by BATCH-0
     import os
+    from app.core.db import db_health
     return {
         'status': 'ok',
         'version': os.getenv('APP_VERSION', '0.1.0'),
-        'db': {'status': 'ok', 'kind': os.getenv('DB_KIND', 'sqlite'), 'path': os.getenv('DB_PATH', './data/app.db')},
+        # db.status/kind/path (BATCH-1) + active storage profile and pool (read back from sqlite)
+        'db': db_health(),
         'storage': {'status': 'ok', 'root': os.getenv('STORAGE_ROOT', './data/storage')},
         'last_error_summary': None,
     }
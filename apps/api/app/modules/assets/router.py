@@ -4,6 +4,10 @@ from fastapi import APIRouter, HTTPException, Query, Request
 
 from .schemas import AssetDeleteResponse, AssetDetailOut, AssetListOut, PageOut
 from .service import get_asset, list_assets, soft_delete_asset, traceability_for_asset
+from app.core import schema
+from app.core.counters import CountMode
+from app.core.pagination import InvalidCursor
+from app.modules.runs.interning import expand_evidence
 from app.modules.runs.service import get_prompt_pack_payload
 from app.modules.runs.service import resolve_provider_profile
 from app.modules.runs.service import _connect as _runs_connect
@@ -40,17 +44,28 @@ def _clamp_offset(raw: int | None) -> int:
 def get_assets(
     limit: int | None = Query(None, description="Max items to return (default 50, max 200)"),
     offset: int | None = Query(None, description="Offset from start (default 0)"),
+    cursor: str | None = Query(None, description="Opaque page.next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="page.total: exact | estimate | none (total=null)"),
     include_deleted: bool = Query(False, description="Include soft-deleted assets"),
 ) -> AssetListOut:
     lim = _clamp_limit(limit)
-    off = _clamp_offset(offset)
+    off = 0 if cursor else _clamp_offset(offset)
 
-    items, total = list_assets(limit=lim, offset=off, include_deleted=include_deleted)
-    has_more = (off + lim) < total
+    try:
+        res = list_assets(limit=lim, offset=off, include_deleted=include_deleted, cursor=cursor or None, count=count)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"invalid cursor: {e}")
 
     return AssetListOut(
-        items=items,  # Pydantic will coerce dict -> AssetDTO
-        page=PageOut(limit=lim, offset=off, total=total, has_more=has_more),
+        items=res.items,  # Pydantic will coerce dict -> AssetDTO
+        page=PageOut(
+            limit=lim,
+            offset=off,
+            total=res.total,
+            has_more=res.has_more,
+            next_cursor=res.next_cursor,
+            count=count,
+        ),
     )
 
 
@@ -84,16 +99,8 @@ def get_asset_detail(asset_id: str) -> AssetDetailOut:
             conn = _runs_connect()
             try:
                 def _table_info(table: str):
-                    cur = conn.execute(f"PRAGMA table_info({table});")
-                    rows = cur.fetchall() or []
-                    # rows: (cid, name, type, notnull, dflt_value, pk)
-                    cols = [r[1] for r in rows]
-                    pk = None
-                    for r in rows:
-                        if len(r) >= 6 and r[5] == 1:
-                            pk = r[1]
-                            break
-                    return cols, pk
+                    # cached schema catalog (no PRAGMA per request)
+                    return schema.columns(conn, table), schema.primary_key(conn, table)
     
                 def _fetch_one_dict(sql: str, params: tuple):
                     cur = conn.execute(sql, params)
@@ -159,7 +166,20 @@ def get_asset_detail(asset_id: str) -> AssetDetailOut:
                     if str(lr.get(rel_col)) == "uses_provider_profile" and str(lr.get(dst_type)) == "provider_profile":
                         prov_id = str(lr.get(dst_id) or "")
                         break
-                if prov_id:
+                # the snapshot the run was resolved with (inline or interned evidence), else the current row
+                evidence = {}
+                for k in ("input_json", "input", "meta_json", "meta", "payload_json", "payload"):
+                    if run_row.get(k):
+                        evidence = json.loads(run_row[k])
+                        break
+                run_snap = expand_evidence(conn, evidence).get("provider_profile_snapshot") if isinstance(evidence, dict) else None
+                if isinstance(run_snap, dict) and run_snap.get("id") and (not prov_id or run_snap["id"] == prov_id):
+                    provider_snapshot = {
+                        "id": str(run_snap["id"]),
+                        "name": run_snap.get("name") or "",
+                        "provider_type": run_snap.get("provider_type") or "",
+                    }
+                elif prov_id:
                     pp_cols, pp_pk = _table_info("provider_profiles")
                     pp_id_col = pp_pk or ("id" if "id" in pp_cols else None)
                     prow = _fetch_one_dict(f"SELECT * FROM provider_profiles WHERE {pp_id_col}=? LIMIT 1", (prov_id,)) if pp_id_col else {}
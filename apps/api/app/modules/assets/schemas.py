@@ -8,8 +8,13 @@ from pydantic import BaseModel, Field
 class PageOut(BaseModel):
     limit: int = Field(..., ge=1)
     offset: int = Field(..., ge=0)
-    total: int = Field(..., ge=0)
+    # null when requested with ?count=none
+    total: Optional[int] = Field(..., ge=0)
     has_more: bool
+    # keyset mode: pass back as ?cursor= for the next page; null on the last page
+    next_cursor: Optional[str] = None
+    # how total was produced: exact | estimate (lower bound once capped) | none
+    count: str = "exact"
 
 
 class AssetDTO(BaseModel):
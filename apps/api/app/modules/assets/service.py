@@ -3,47 +3,23 @@ from __future__ import annotations
 from fastapi import HTTPException
 from datetime import datetime
 
-import os
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
+from app.core import schema
+from app.core.db import connect as _connect
+from app.core.counters import count_rows
+from app.core.pagination import InvalidCursor, KeysetOrder, ListPage, split_page
 
-
-def _sqlite_path_from_url(url: str) -> str:
-    # Supports:
-    # - sqlite:///./data/app.db
-    # - sqlite:////absolute/path/app.db
-    if not url.startswith("sqlite:"):
-        raise ValueError(f"Only sqlite is supported for now, got DATABASE_URL={url!r}")
-    if url.startswith("sqlite:////"):
-        return url[len("sqlite:////") - 1 :]  # keep leading '/'
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"Unrecognized sqlite DATABASE_URL format: {url!r}")
-
-
-def _connect() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
-    path = _sqlite_path_from_url(url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    return conn
+ASSETS_ORDER = KeysetOrder("assets", ("created_at", "id"))
 
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table,),
-    ).fetchone()
-    return row is not None
+    return schema.table_exists(conn, table)
 
 
 def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
-    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
-    return [r["name"] for r in rows]
+    return schema.columns(conn, table)
 
 
 def _order_by_expr(cols: List[str]) -> str:
@@ -83,28 +59,57 @@ def _row_to_asset_dict(row: sqlite3.Row, cols: List[str]) -> Dict[str, Any]:
     return out
 
 
-def list_assets(limit: int, offset: int, include_deleted: bool) -> Tuple[List[Dict[str, Any]], int]:
+def list_assets(
+    limit: int,
+    offset: int,
+    include_deleted: bool,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+) -> ListPage:
+    """
+    With a cursor, offset is ignored and the page starts after the cursor's
+    (created_at, id); raises InvalidCursor. count: exact|estimate|none.
+    """
     conn = _connect()
     try:
         if not _table_exists(conn, "assets"):
             raise RuntimeError("DB missing table: assets")
 
         cols = _columns(conn, "assets")
+        keyset = all(c in cols for c in ASSETS_ORDER.columns)
 
-        where = ""
+        where: List[str] = []
         params: List[Any] = []
-        if (not include_deleted) and ("deleted_at" in cols):
-            where = "WHERE deleted_at IS NULL"
-
-        total = conn.execute(f"SELECT COUNT(1) AS c FROM assets {where}", params).fetchone()["c"]
-
-        order_by = _order_by_expr(cols)
+        counter = None
+        if "deleted_at" in cols:
+            counter = ("assets", ["live", "deleted"] if include_deleted else ["live"])
+            if not include_deleted:
+                where.append("deleted_at IS NULL")
+
+        count_sql = "WHERE " + " AND ".join(where) if where else ""
+        total = count_rows(conn, "assets", count_sql, params, mode=count, counter=counter)
+
+        if cursor is not None:
+            if not keyset:
+                raise InvalidCursor("cursor pagination is not supported by this assets schema")
+            pred, vals = ASSETS_ORDER.after(ASSETS_ORDER.decode(cursor))
+            where.append(pred)
+            params.extend(vals)
+            offset = 0
+
+        where_sql = "WHERE " + " AND ".join(where) if where else ""
+        order_by = ASSETS_ORDER.order_by() if keyset else _order_by_expr(cols)
         rows = conn.execute(
-            f"SELECT * FROM assets {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
-            (*params, limit, offset),
+            f"SELECT * FROM assets {where_sql} ORDER BY {order_by} LIMIT ? OFFSET ?",
+            (*params, limit + 1, offset),
         ).fetchall()
+        has_more = len(rows) > limit
+        if keyset:
+            rows, next_cursor = split_page(rows, limit, ASSETS_ORDER)
+        else:
+            rows, next_cursor = rows[:limit], None
         items = [_row_to_asset_dict(r, cols) for r in rows]
-        return items, int(total)
+        return ListPage(items=items, total=total, has_more=has_more, next_cursor=next_cursor)
     finally:
         conn.close()
 
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+
+from app.core.counters import CountMode
+from app.core.idempotency import idempotent
+from app.core.pagination import InvalidCursor
 from .schemas import (
     CharactersListOut,
     CharacterCreateIn,
@@ -56,17 +60,32 @@ def _clamp_offset(raw: int | None) -> int:
 def api_list_characters(
     limit: int | None = Query(None),
     offset: int | None = Query(None),
+    cursor: str | None = Query(None, description="Opaque page.next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="page.total: exact | estimate | none (total=null)"),
     status: str | None = Query(None, description="draft|confirmed|archived"),
 ) -> CharactersListOut:
     lim = _clamp_limit(limit)
-    off = _clamp_offset(offset)
-    items, total = list_characters(limit=lim, offset=off, status=status)
-    has_more = (off + lim) < total
-    return CharactersListOut(items=items, page=PageOut(offset=off, limit=lim, total=total, has_more=has_more))
+    off = 0 if cursor else _clamp_offset(offset)
+    try:
+        res = list_characters(limit=lim, offset=off, status=status, cursor=cursor or None, count=count)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"invalid cursor: {e}")
+    return CharactersListOut(
+        items=res.items,
+        page=PageOut(
+            offset=off,
+            limit=lim,
+            total=res.total,
+            has_more=res.has_more,
+            next_cursor=res.next_cursor,
+            count=count,
+        ),
+    )
 
 
 @router.post("/characters", response_model=CharacterOut)
-def api_create_character(body: CharacterCreateIn) -> CharacterOut:
+@idempotent("characters.create")
+def api_create_character(body: CharacterCreateIn, request: Request) -> CharacterOut:
     return create_character(name=body.name, tags=body.tags, meta=body.meta)
 
 
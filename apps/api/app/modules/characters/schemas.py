@@ -10,8 +10,10 @@ RefSetStatus = Literal["draft", "confirmed", "archived"]
 class PageOut(BaseModel):
     offset: int
     limit: int
-    total: int
+    total: Optional[int]  # null with ?count=none
     has_more: bool
+    next_cursor: Optional[str] = None
+    count: str = "exact"
 
 
 class CharacterCreateIn(BaseModel):
@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 import json
-import os
 import sqlite3
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 
+from app.core import schema
+from app.core.db import connect as _connect
+from app.core.counters import count_rows
+from app.core.pagination import KeysetOrder, ListPage, split_page
 from app.modules.runs.service import new_ulid
 
-DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
-
 # --- constants (relationships) ---
 REL_HAS_REF_SET_VERSION = "has_ref_set_version"
 REL_INCLUDES_REFERENCE_ASSET = "includes_reference_asset"
@@ -22,43 +23,25 @@ TYPE_ASSET = "asset"
 
 MIN_REFS_CONFIRMED = 8
 
+CHARACTERS_ORDER = KeysetOrder("characters", ("updated_at", "id"))
+
 
 # --- db helpers ---
 def _now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _sqlite_path_from_url(url: str) -> str:
-    if not url.startswith("sqlite:"):
-        raise ValueError(f"Only sqlite supported for now, got DATABASE_URL={url!r}")
-    if url.startswith("sqlite:////"):
-        return url[len("sqlite:////") - 1 :]  # keep leading '/'
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"Unrecognized sqlite DATABASE_URL format: {url!r}")
-
-
-def _connect() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
-    path = _sqlite_path_from_url(url)
-    conn = sqlite3.connect(path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table,),
-    ).fetchone()
-    return row is not None
+    return schema.table_exists(conn, table)
 
 
 def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
-    rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
-    return [r["name"] for r in rows]
+    return schema.columns(conn, table)
+
+
+def _column_set(conn: sqlite3.Connection, table: str) -> frozenset:
+    t = schema.get_table(conn, table)
+    return t.column_set if t is not None else frozenset()
 
 
 def _safe_json_loads(v: Any) -> Dict[str, Any]:
@@ -73,19 +56,18 @@ def _safe_json_loads(v: Any) -> Dict[str, Any]:
 
 
 def _primary_key_name(conn: sqlite3.Connection, table: str) -> str:
-    rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
-    for r in rows:
-        if int(r["pk"]) == 1:
-            return str(r["name"])
+    pk = schema.primary_key(conn, table)
+    if pk:
+        return pk
     # fallback
-    cols = [r["name"] for r in rows]
+    cols = _columns(conn, table)
     if "id" in cols:
         return "id"
     return cols[0] if cols else "id"
 
 
 def _insert(conn: sqlite3.Connection, table: str, row: Dict[str, Any]) -> str:
-    cols = set(_columns(conn, table))
+    cols = _column_set(conn, table)
     pk = _primary_key_name(conn, table)
 
     data = dict(row)
@@ -109,7 +91,7 @@ def _insert(conn: sqlite3.Connection, table: str, row: Dict[str, Any]) -> str:
 
 # --- links column mapping (src/dst OR source/target) ---
 def _links_spec(conn: sqlite3.Connection) -> Dict[str, Optional[str]]:
-    cols = set(_columns(conn, "links"))
+    cols = _column_set(conn, "links")
 
     has_src_dst = {"src_type", "src_id", "dst_type", "dst_id"}.issubset(cols)
     has_source_target = {"source_type", "source_id", "target_type", "target_id"}.issubset(cols)
@@ -162,7 +144,7 @@ def _insert_link(
     tombstone: int = 0,
 ) -> str:
     spec = _links_spec(conn)
-    cols = set(_columns(conn, "links"))
+    cols = _column_set(conn, "links")
     row: Dict[str, Any] = {}
 
     if spec.get("id_col") in cols:
@@ -200,21 +182,45 @@ def _row_to_character(row: sqlite3.Row) -> Dict[str, Any]:
     return d
 
 
-def list_characters(limit: int, offset: int, status: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+def list_characters(
+    limit: int,
+    offset: int,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+) -> ListPage:
+    """
+    Newest update first. With a cursor, offset is ignored; raises InvalidCursor.
+    count: exact|estimate|none.
+    """
     conn = _connect()
     try:
-        where = ""
+        where: List[str] = []
         args: List[Any] = []
         if status:
-            where = "WHERE status=?"
+            where.append("status=?")
             args.append(status)
 
-        total = conn.execute(f"SELECT COUNT(1) AS n FROM characters {where};", args).fetchone()["n"]
+        count_sql = "WHERE " + " AND ".join(where) if where else ""
+        counter = ("characters", [f"status:{status}" if status else "all"])
+        total = count_rows(conn, "characters", count_sql, args, mode=count, counter=counter)
+
+        if cursor is not None:
+            pred, vals = CHARACTERS_ORDER.after(CHARACTERS_ORDER.decode(cursor))
+            where.append(pred)
+            args.extend(vals)
+            offset = 0
+
+        where_sql = "WHERE " + " AND ".join(where) if where else ""
         rows = conn.execute(
-            f"SELECT * FROM characters {where} ORDER BY updated_at DESC, created_at DESC LIMIT ? OFFSET ?;",
-            args + [limit, offset],
+            f"SELECT * FROM characters {where_sql} ORDER BY {CHARACTERS_ORDER.order_by()} LIMIT ? OFFSET ?;",
+            args + [limit + 1, offset],
         ).fetchall()
-        return ([_row_to_character(r) for r in rows], int(total))
+        has_more = len(rows) > limit
+        rows, next_cursor = split_page(rows, limit, CHARACTERS_ORDER)
+        return ListPage(
+            items=[_row_to_character(r) for r in rows], total=total, has_more=has_more, next_cursor=next_cursor
+        )
     finally:
         conn.close()
 
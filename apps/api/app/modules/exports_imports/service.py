@@ -6,9 +6,15 @@ import re
 import sqlite3
 import hashlib
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core import schema
+from app.core.db import connect
+from app.modules.runs import interning
+from app.modules.runs.service import rebuild_run_status_current
 
 
 # =========
@@ -61,21 +67,23 @@ def _json_safe(v: Any) -> Any:
 # sqlite helpers
 # =========
 
-def _conn(repo: Path) -> sqlite3.Connection:
-    dbp = _db_path(repo)
-    c = sqlite3.connect(str(dbp))
-    c.row_factory = sqlite3.Row
-    return c
+@contextmanager
+def _conn(repo: Path) -> Iterator[sqlite3.Connection]:
+    # commit-on-success like `with sqlite3.connect(...)`, then hand back to the pool
+    c = connect(_db_path(repo))
+    try:
+        with c:
+            yield c
+    finally:
+        c.close()
 
 
 def _list_tables(c: sqlite3.Connection) -> List[str]:
-    rows = c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'").fetchall()
-    return [r["name"] for r in rows]
+    return schema.list_tables(c)
 
 
 def _table_info(c: sqlite3.Connection, table: str) -> List[Dict[str, Any]]:
-    rows = c.execute(f"PRAGMA table_info({table})").fetchall()
-    return [dict(r) for r in rows]
+    return [{"name": name, **info} for name, info in schema.table_info(c, table).items()]
 
 
 def _table_cols(c: sqlite3.Connection, table: str) -> List[str]:
@@ -121,12 +129,18 @@ _TABLE_ALIASES: Dict[str, List[str]] = {
     "runs": ["runs", "run"],
     "reviews": ["reviews", "review"],
     "run_events": ["run_events", "run_event"],
+    "provider_profile_snapshots": ["provider_profile_snapshots"],
     "projects": ["projects", "project"],
     "series": ["series"],
     "shots": ["shots", "shot"],
 }
 
 
+# keyed by a hash of their content (runs/interning.py): ids are kept on import and
+# rows already present are skipped, so references in runs.input_json stay valid
+_CONTENT_ADDRESSED = {"provider_profile_snapshots"}
+
+
 def _resolve_tables(existing: List[str]) -> Dict[str, str]:
     s = set(existing)
     resolved: Dict[str, str] = {}
@@ -286,7 +300,7 @@ def export_create(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, An
             counts["links"] = len(link_rows)
 
         # evidence chain & hierarchy tables: dump all rows (P1 minimum)
-        for logical in ["prompt_packs", "runs", "reviews", "run_events", "projects", "series", "shots"]:
+        for logical in ["prompt_packs", "provider_profile_snapshots", "runs", "reviews", "run_events", "projects", "series", "shots"]:
             if logical in resolved:
                 t = resolved[logical]
                 rows = _select_rows(c, t)
@@ -422,8 +436,12 @@ def import_create(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     counts: Dict[str, int] = {}
     idmap: Dict[str, str] = {}
+    event_run_ids: List[str] = []
 
     with _conn(repo) as c:
+        if any(t in _CONTENT_ADDRESSED for t in tables):
+            # created lazily on the source; runs referencing it are unreadable without it
+            interning.ensure_tables(c)
         existing = set(_list_tables(c))
 
         # deterministic insert order for better FK mapping
@@ -432,6 +450,7 @@ def import_create(payload: Dict[str, Any]) -> Dict[str, Any]:
             "series",
             "assets", "asset",
             "prompt_packs", "prompt_pack",
+            "provider_profile_snapshots",
             "runs", "run",
             "reviews", "review",
             "shots", "shot",
@@ -479,7 +498,7 @@ def import_create(payload: Dict[str, Any]) -> Dict[str, Any]:
 
                     # assign new PK (string IDs) when safe
                     old_pk = None
-                    if create_new_ids and (pk in cols) and (not pk_is_int):
+                    if create_new_ids and (pk in cols) and (not pk_is_int) and norm_name(t) not in _CONTENT_ADDRESSED:
                         old_pk = r2.get(pk)
                         if isinstance(old_pk, str) and old_pk:
                             new_pk = _new_id()
@@ -500,11 +519,14 @@ def import_create(payload: Dict[str, Any]) -> Dict[str, Any]:
                     cols_ins = list(r2.keys())
                     vals = [r2[k] for k in cols_ins]
                     ph = ",".join(["?"] * len(cols_ins))
-                    sql = f"INSERT INTO {t} ({','.join(cols_ins)}) VALUES ({ph})"
+                    verb = "INSERT OR IGNORE" if norm_name(t) in _CONTENT_ADDRESSED else "INSERT"
+                    sql = f"{verb} INTO {t} ({','.join(cols_ins)}) VALUES ({ph})"
 
                     try:
                         c.execute(sql, vals)
                         inserted += 1
+                        if norm_name(t) in ("run_events", "run_event") and isinstance(r2.get("run_id"), str):
+                            event_run_ids.append(r2["run_id"])
                     except sqlite3.IntegrityError:
                         # best-effort retry with deduped human-readable fields
                         suffix = f"import{import_id[:6].lower()}"
@@ -527,6 +549,10 @@ def import_create(payload: Dict[str, Any]) -> Dict[str, Any]:
 
                 counts[t] = inserted
 
+            # run_events were written directly: refresh the run status projection
+            if event_run_ids and "run_status_current" in existing:
+                rebuild_run_status_current(c, sorted(set(event_run_ids)))
+
             c.execute("COMMIT")
             status = "completed"
         except Exception as e:
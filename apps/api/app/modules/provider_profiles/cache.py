@@ -0,0 +1,128 @@
+"""
+Resolved provider profile cache, invalidated through a version counter in the DB.
+
+resolve_provider_profile runs on every run creation; the profiles it reads only
+change through provider_profiles.service (create / patch / scrub / set default).
+Each of those bumps cache_versions['provider_profiles'] inside its own
+transaction, so every API process (uvicorn workers, executor processes) sees a
+write as soon as it commits and the next resolve re-reads.
+
+A cached resolution costs one primary-key read of the counter on a pooled
+connection; a miss (first call, or counter moved) re-resolves and stores the
+result under the version read before resolving, so a concurrent write at worst
+causes one extra miss, never a stale hit.
+
+- entries: override id (or None for the default pointer) -> result or error code
+- cached results are shared: callers must treat them as read-only
+- Env: PROVIDER_PROFILE_CACHE=0 resolves from the DB on every call (default 1)
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from app.core import schema
+
+SCOPE = "provider_profiles"
+_MAX_ENTRIES = 1024
+
+_DDL: Dict[str, str] = {
+    "cache_versions": """
+        CREATE TABLE IF NOT EXISTS cache_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        """,
+}
+
+
+def enabled() -> bool:
+    return (os.getenv("PROVIDER_PROFILE_CACHE", "1") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def bump(conn: sqlite3.Connection) -> None:
+    """Invalidate every process's cache; call inside the writing transaction (committed with it)."""
+    schema.ensure_objects(conn, _DDL)
+    conn.execute(
+        "INSERT INTO cache_versions (name, version) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET version=version+1;",
+        (SCOPE,),
+    )
+
+
+def version(conn: sqlite3.Connection) -> int:
+    schema.ensure_objects(conn, _DDL)
+    row = conn.execute("SELECT version FROM cache_versions WHERE name=?;", (SCOPE,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+class _Entries:
+    def __init__(self, version: int) -> None:
+        self.version = version
+        self.values: Dict[Hashable, Any] = {}
+
+
+_lock = threading.Lock()
+_by_db: Dict[str, _Entries] = {}
+_counts = {"hits": 0, "misses": 0}
+
+
+class _Failure:
+    """A cached ValueError code (e.g. provider_profile_deleted)."""
+
+    __slots__ = ("code",)
+
+    def __init__(self, code: str) -> None:
+        self.code = code
+
+
+def cached(conn: sqlite3.Connection, key: Hashable, resolve: Callable[[], Any]) -> Any:
+    """
+    resolve() through the cache; ValueErrors are cached and re-raised too.
+    Unpooled connections (tools, alembic) and PROVIDER_PROFILE_CACHE=0 bypass it.
+    """
+    db = schema.db_key(conn)
+    if db is None or not enabled():
+        return resolve()
+
+    v = version(conn)
+    with _lock:
+        entries = _by_db.get(db)
+        if entries is not None and entries.version == v and key in entries.values:
+            _counts["hits"] += 1
+            hit = entries.values[key]
+        else:
+            hit = None
+    if hit is None:
+        try:
+            hit = resolve()
+        except ValueError as e:
+            hit = _Failure(str(e))
+        with _lock:
+            _counts["misses"] += 1
+            entries = _by_db.get(db)
+            if entries is None or entries.version != v:
+                entries = _by_db[db] = _Entries(v)
+            if len(entries.values) >= _MAX_ENTRIES:
+                entries.values.clear()
+            entries.values[key] = hit
+    if isinstance(hit, _Failure):
+        raise ValueError(hit.code)
+    return hit
+
+
+def clear() -> None:
+    with _lock:
+        _by_db.clear()
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "enabled": enabled(),
+            "entries": sum(len(e.values) for e in _by_db.values()),
+            "versions": {db: e.version for db, e in _by_db.items()},
+            **_counts,
+        }
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query, Request
 
+from app.core.counters import CountMode
+from app.core.pagination import InvalidCursor
 from app.modules.assets.schemas import PageOut
 
 from .schemas import (
@@ -49,14 +51,23 @@ def get_provider_types() -> ProviderTypesOut:
 def list_profiles(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Opaque page.next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="page.total: exact | estimate | none (total=null)"),
 ) -> ProviderProfilesListOut:
     limit2 = _clamp_limit(limit)
-    items, total = list_provider_profiles(limit=limit2, offset=offset)
+    offset2 = 0 if cursor else offset
+    try:
+        res = list_provider_profiles(limit=limit2, offset=offset2, cursor=cursor or None, count=count)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"invalid cursor: {e}")
+    items = res.items
     page = PageOut(
         limit=limit2,
-        offset=offset,
-        total=total,
-        has_more=(offset + limit2) < total,
+        offset=offset2,
+        total=res.total,
+        has_more=res.has_more,
+        next_cursor=res.next_cursor,
+        count=count,
     )
     return ProviderProfilesListOut(items=items, page=page)
 
@@ -1,51 +1,31 @@
 from __future__ import annotations
 
 import json
-import os
 import sqlite3
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core import schema
+from app.core.db import connect as _connect
+from app.core.counters import count_rows
+from app.core.pagination import KeysetOrder, ListPage, split_page
 from app.modules.runs.service import new_ulid
 
-DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
+from . import cache as profile_cache
+
+PROFILES_ORDER = KeysetOrder("provider_profiles", ("updated_at", "id"))
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _sqlite_path_from_url(url: str) -> str:
-    if not url.startswith("sqlite:"):
-        raise ValueError(f"Only sqlite supported for now, got DATABASE_URL={url!r}")
-    if url.startswith("sqlite:////"):
-        return url[len("sqlite:////") - 1 :]  # keep leading '/'
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"Unrecognized sqlite DATABASE_URL format: {url!r}")
-
-
-def _connect() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
-    path = _sqlite_path_from_url(url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table,),
-    ).fetchone()
-    return row is not None
+    return schema.table_exists(conn, table)
 
 
 def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
-    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
-    return [r["name"] for r in rows]
+    return schema.columns(conn, table)
 
 
 def _safe_json_loads(s: Any) -> Dict[str, Any]:
@@ -121,19 +101,35 @@ def _row_to_profile(conn: sqlite3.Connection, r: sqlite3.Row, *, redact: bool) -
     }
 
 
-def list_provider_profiles(limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+def list_provider_profiles(
+    limit: int,
+    offset: int,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+) -> ListPage:
+    """With a cursor, offset is ignored; raises InvalidCursor. count: exact|estimate|none."""
     conn = _connect()
     try:
         if not _table_exists(conn, "provider_profiles"):
             raise RuntimeError("DB missing table: provider_profiles")
 
-        total = conn.execute("SELECT COUNT(1) AS c FROM provider_profiles").fetchone()["c"]
+        total = count_rows(conn, "provider_profiles", "", [], mode=count)
+
+        where = ""
+        params: List[Any] = []
+        if cursor is not None:
+            pred, params = PROFILES_ORDER.after(PROFILES_ORDER.decode(cursor))
+            where = f"WHERE {pred}"
+            offset = 0
+
         rows = conn.execute(
-            "SELECT * FROM provider_profiles ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?",
-            (limit, offset),
+            f"SELECT * FROM provider_profiles {where} ORDER BY {PROFILES_ORDER.order_by()} LIMIT ? OFFSET ?",
+            (*params, limit + 1, offset),
         ).fetchall()
+        has_more = len(rows) > limit
+        rows, next_cursor = split_page(rows, limit, PROFILES_ORDER)
         items = [_row_to_profile(conn, r, redact=True) for r in rows]
-        return items, int(total)
+        return ListPage(items=items, total=total, has_more=has_more, next_cursor=next_cursor)
     finally:
         conn.close()
 
@@ -176,6 +172,7 @@ def _set_global_default(conn: sqlite3.Connection, profile_id: str) -> None:
         "UPDATE provider_profiles SET is_global_default=1, updated_at=? WHERE id=?;",
         (_now_iso(), profile_id),
     )
+    profile_cache.bump(conn)
 
 
 def create_provider_profile(
@@ -212,6 +209,7 @@ def create_provider_profile(
         )
         if set_global_default:
             _set_global_default(conn, pid)
+        profile_cache.bump(conn)
 
         conn.commit()
         return get_provider_profile(pid, redact=True) or {"id": pid, "name": name, "provider_type": provider_type}
@@ -260,6 +258,7 @@ def patch_provider_profile(
                 "UPDATE provider_profiles SET is_global_default=0, updated_at=? WHERE id=?;",
                 (_now_iso(), profile_id),
             )
+        profile_cache.bump(conn)
 
         conn.commit()
         return get_provider_profile(profile_id, redact=True)
@@ -302,6 +301,7 @@ def scrub_provider_profile(profile_id: str) -> Optional[Dict[str, Any]]:
                 profile_id,
             ),
         )
+        profile_cache.bump(conn)
         conn.commit()
         return get_provider_profile(profile_id, redact=True)
     finally:
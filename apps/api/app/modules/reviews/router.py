@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.idempotency import idempotent
 from .schemas import ReviewCreateIn, ReviewCreateOut
 from .service import create_review
 
@@ -8,7 +10,8 @@ router = APIRouter(tags=["reviews"])
 
 
 @router.post("/reviews", response_model=ReviewCreateOut)
-def post_review(payload: ReviewCreateIn) -> ReviewCreateOut:
+@idempotent("reviews.create")
+def post_review(payload: ReviewCreateIn, request: Request) -> ReviewCreateOut:
     # Rule: override must have reason
     if payload.review_type == "override" and (payload.reason is None or str(payload.reason).strip() == ""):
         raise HTTPException(status_code=400, detail="override requires reason")
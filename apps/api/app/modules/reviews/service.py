@@ -7,7 +7,9 @@ import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
+from app.core import schema
+from app.core.db import connect as _connect
+
 _CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
 
 
@@ -30,45 +32,13 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _sqlite_path_from_url(url: str) -> str:
-    if not url.startswith("sqlite:"):
-        raise ValueError(f"Only sqlite supported for now, got DATABASE_URL={url!r}")
-    if url.startswith("sqlite:////"):
-        return url[len("sqlite:////") - 1 :]
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"Unrecognized sqlite DATABASE_URL format: {url!r}")
-
-
-def _connect() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
-    path = _sqlite_path_from_url(url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table,),
-    ).fetchone()
-    return row is not None
+    return schema.table_exists(conn, table)
 
 
 def _table_info(conn: sqlite3.Connection, table: str) -> Dict[str, Dict[str, Any]]:
-    out: Dict[str, Dict[str, Any]] = {}
-    rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
-    for r in rows:
-        out[r["name"]] = {
-            "type": (r["type"] or "").upper(),
-            "notnull": int(r["notnull"]),
-            "dflt_value": r["dflt_value"],
-            "pk": int(r["pk"]),
-        }
-    return out
+    # cached per schema_version (app.core.schema); read-only
+    return schema.table_info(conn, table)  # type: ignore[return-value]
 
 
 def _primary_key_name(cols: Dict[str, Dict[str, Any]]) -> Optional[str]:
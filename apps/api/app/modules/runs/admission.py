@@ -0,0 +1,210 @@
+"""
+Per-provider-profile admission control for the run executor.
+
+Limits come from the profile's config_json (copied into the run's profile
+snapshot when the run is created):
+
+    {"limits": {"max_concurrency": 2, "rate_per_s": 5, "burst": 10}}
+
+- max_concurrency: runs of this profile executing at once
+- rate_per_s / burst: token bucket on run starts (burst defaults to max(1, rate))
+- absent / invalid values: no limit for that dimension
+
+FairQueue replaces the executor's single FIFO: one FIFO lane per profile, and
+workers take the next admissible job round-robin across lanes, so a burst on one
+profile neither exceeds its limits nor starves the other profiles. A job waits in
+its lane (not on a worker) while its profile is at a limit.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_LANE = "_default"
+_WAIT_SAMPLES = 200
+
+
+@dataclass(frozen=True)
+class ProfileLimits:
+    max_concurrency: Optional[int] = None
+    rate_per_s: Optional[float] = None
+    burst: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, raw: Any) -> "ProfileLimits":
+        """raw: config_json["limits"] (or a snapshot's "limits"); lenient, bad values are ignored."""
+        if not isinstance(raw, dict):
+            return cls()
+
+        def num(k: str, cast):
+            try:
+                v = cast(raw.get(k))
+            except (TypeError, ValueError):
+                return None
+            return v if v > 0 else None
+
+        rate = num("rate_per_s", float)
+        burst = num("burst", int)
+        if rate is not None and burst is None:
+            burst = max(1, int(rate))
+        return cls(max_concurrency=num("max_concurrency", int), rate_per_s=rate, burst=burst)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"max_concurrency": self.max_concurrency, "rate_per_s": self.rate_per_s, "burst": self.burst}
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, burst: int) -> None:
+        self.rate = rate_per_s
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self._at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(float(self.burst), self.tokens + (now - self._at) * self.rate)
+        self._at = now
+
+    def wait_s(self, now: float) -> float:
+        """0 when a token is available now, else seconds until the next one."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1.0
+
+
+class _Lane:
+    def __init__(self, limits: ProfileLimits) -> None:
+        self.jobs: Deque[Tuple[Any, float]] = deque()
+        self.in_flight = 0
+        self.admitted = 0
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.limits = ProfileLimits()
+        self.bucket: Optional[TokenBucket] = None
+        self.set_limits(limits)
+
+    def set_limits(self, limits: ProfileLimits) -> None:
+        if limits == self.limits:
+            return
+        self.limits = limits
+        if limits.rate_per_s is None:
+            self.bucket = None
+        elif self.bucket is None or (self.bucket.rate, self.bucket.burst) != (limits.rate_per_s, limits.burst):
+            self.bucket = TokenBucket(limits.rate_per_s, limits.burst or 1)
+
+    def wait_s(self, now: float) -> Optional[float]:
+        """0 if the head job may start now; seconds until it may (rate); None if blocked on concurrency."""
+        if self.limits.max_concurrency is not None and self.in_flight >= self.limits.max_concurrency:
+            return None
+        return self.bucket.wait_s(now) if self.bucket is not None else 0.0
+
+
+class FairQueue:
+    """
+    Bounded multi-lane queue: put_nowait(job, lane, limits) / get() / done(lane).
+    get() blocks until some lane's head job is admissible and returns (job, lane);
+    after close() it returns what is admissible right away, then None.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(maxsize, 1)
+        self._cond = threading.Condition()
+        self._lanes: Dict[str, _Lane] = {}
+        self._order: List[str] = []  # round-robin order of lanes
+        self._next = 0
+        self._size = 0
+        self._closed = False
+
+    def put_nowait(self, job: Any, lane: Optional[str] = None, limits: Optional[ProfileLimits] = None) -> None:
+        """Raises queue.Full when maxsize jobs are waiting."""
+        key = lane or DEFAULT_LANE
+        with self._cond:
+            if self._size >= self.maxsize:
+                raise queue.Full
+            ln = self._lanes.get(key)
+            if ln is None:
+                ln = self._lanes[key] = _Lane(limits or ProfileLimits())
+                self._order.append(key)
+            elif limits is not None:
+                # latest snapshot wins: a profile edit applies to runs submitted after it
+                ln.set_limits(limits)
+            ln.jobs.append((job, time.monotonic()))
+            self._size += 1
+            self._cond.notify()
+
+    def _pick(self, now: float) -> Tuple[Optional[Tuple[Any, str]], Optional[float]]:
+        """(job, lane) to start, else (None, seconds until a rate-limited lane frees up or None)."""
+        n = len(self._order)
+        soonest: Optional[float] = None
+        for i in range(n):
+            key = self._order[(self._next + i) % n]
+            ln = self._lanes[key]
+            if not ln.jobs:
+                continue
+            w = ln.wait_s(now)
+            if w is None:
+                continue
+            if w > 0:
+                soonest = w if soonest is None else min(soonest, w)
+                continue
+            job, enqueued = ln.jobs.popleft()
+            self._size -= 1
+            ln.in_flight += 1
+            ln.admitted += 1
+            ln.waits.append(now - enqueued)
+            if ln.bucket is not None:
+                ln.bucket.take(now)
+            self._next = (self._next + i + 1) % n
+            return (job, key), None
+        return None, soonest
+
+    def get(self) -> Optional[Tuple[Any, str]]:
+        with self._cond:
+            while True:
+                picked, wait = self._pick(time.monotonic())
+                if picked is not None:
+                    return picked
+                if self._closed:
+                    return None
+                self._cond.wait(timeout=wait)
+
+    def done(self, lane: str) -> None:
+        with self._cond:
+            ln = self._lanes.get(lane)
+            if ln is not None and ln.in_flight > 0:
+                ln.in_flight -= 1
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per lane: queued, in_flight, limits, oldest_wait_ms, recent wait p50/max (ms), admitted."""
+        now = time.monotonic()
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._cond:
+            for key in self._order:
+                ln = self._lanes[key]
+                waits = sorted(ln.waits)
+                out[key] = {
+                    "queued": len(ln.jobs),
+                    "in_flight": ln.in_flight,
+                    "limits": ln.limits.as_dict(),
+                    "tokens": round(ln.bucket.tokens, 3) if ln.bucket is not None else None,
+                    "oldest_wait_ms": round((now - ln.jobs[0][1]) * 1000.0, 1) if ln.jobs else 0.0,
+                    "wait_ms_p50": round(waits[len(waits) // 2] * 1000.0, 1) if waits else None,
+                    "wait_ms_max": round(waits[-1] * 1000.0, 1) if waits else None,
+                    "admitted": ln.admitted,
+                }
+        return out
@@ -0,0 +1,130 @@
+"""
+In-process pub/sub for run status transitions (feeds the SSE endpoints).
+
+append_run_event publishes every committed transition here; each SSE client
+holds one Subscription (an asyncio.Queue on its event loop) for the run ids it
+watches, so watching a run costs no DB reads after the initial snapshot.
+Publishing is thread-safe (executor workers publish from their own threads).
+
+Scope: one process. With several API processes a client only sees transitions
+appended by the process it is connected to (runs execute in the process that
+accepted them, so single-process deployments see everything). In workers mode
+runs execute in app.tools.run_worker processes, so the SSE endpoints poll
+run_status_current as well (RUN_EVENTS_POLL_S, see runs/router.py).
+
+Env:
+- RUN_EVENTS_MAX_SUBSCRIBERS: concurrent streams accepted (default 1000)
+- RUN_EVENTS_QUEUE_MAX: buffered events per stream before it is cut off (default 256)
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from app.core.env import env_int
+
+TERMINAL_STATUSES = ("succeeded", "failed", "partial", "canceled")
+
+
+class Subscription:
+    def __init__(self, run_ids: Iterable[str], loop: asyncio.AbstractEventLoop, queue_max: int) -> None:
+        self.run_ids: FrozenSet[str] = frozenset(run_ids)
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max(queue_max, 1))
+        # set when the client fell queue_max events behind; the stream then ends
+        self.overflowed = False
+
+    def _offer(self, event: Dict[str, Any]) -> None:
+        # runs on self.loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class RunEventBus:
+    def __init__(self, max_subscribers: int, queue_max: int) -> None:
+        self.max_subscribers = max(max_subscribers, 1)
+        self.queue_max = queue_max
+        self._lock = threading.Lock()
+        self._by_run: Dict[str, Set[Subscription]] = {}
+        self._subscribers = 0
+        self._published = 0
+
+    def subscribe(self, run_ids: Iterable[str], loop: asyncio.AbstractEventLoop) -> Optional[Subscription]:
+        """None when max_subscribers streams are already open."""
+        sub = Subscription(run_ids, loop, self.queue_max)
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                return None
+            self._subscribers += 1
+            for rid in sub.run_ids:
+                self._by_run.setdefault(rid, set()).add(sub)
+        return sub
+
+    def watch(self, sub: Subscription, run_ids: Iterable[str]) -> None:
+        """Add run_ids to an open subscription (SSE streams of sweep parents watch the children)."""
+        with self._lock:
+            sub.run_ids = sub.run_ids | frozenset(run_ids)
+            for rid in sub.run_ids:
+                self._by_run.setdefault(rid, set()).add(sub)
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            removed = False
+            for rid in sub.run_ids:
+                subs = self._by_run.get(rid)
+                if subs and sub in subs:
+                    subs.discard(sub)
+                    removed = True
+                    if not subs:
+                        del self._by_run[rid]
+            if removed:
+                self._subscribers -= 1
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """event: {run_id, seq, status, result_refs, event_id, created_at}. Never raises."""
+        with self._lock:
+            self._published += 1
+            subs: List[Subscription] = list(self._by_run.get(str(event.get("run_id")), ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # subscriber loop already closed; its stream is gone
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": self._subscribers,
+                "max_subscribers": self.max_subscribers,
+                "watched_runs": len(self._by_run),
+                "published": self._published,
+            }
+
+
+_bus: Optional[RunEventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> RunEventBus:
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = RunEventBus(
+                max_subscribers=env_int("RUN_EVENTS_MAX_SUBSCRIBERS", 1000),
+                queue_max=env_int("RUN_EVENTS_QUEUE_MAX", 256),
+            )
+        return _bus
+
+
+def publish_run_event(event: Dict[str, Any]) -> None:
+    try:
+        get_event_bus().publish(event)
+    except Exception:
+        # pub/sub is best-effort; the event is already committed
+        pass
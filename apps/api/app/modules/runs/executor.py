@@ -0,0 +1,517 @@
+"""
+Background execution for Runs (P1 ProviderAdapter).
+
+POST /runs inserts the run (status=queued) and hands a RunJob to the executor;
+worker threads claim jobs and record every transition through append_run_event
+(running -> succeeded/failed), so runs stays append-only.
+
+POST /runs contract per mode (X-Provider-Enabled: 1):
+- queue / workers: 200 RunCreateOut with status=queued as soon as the run is
+  stored; the outcome (including a provider failure or X-Provider-Force-Fail)
+  is only visible later via GET /runs/{id} or its SSE stream. A provider
+  failure no longer returns a 500 error envelope. Full queue: 503 run_queue_full.
+- inline: 200 with the final status, or the 500 internal_error envelope
+  (details.run_id) when the provider fails, as before the executor existed.
+
+Env:
+- RUN_EXECUTOR_MODE: queue (default) | inline (execute inside the request; pre-queue behaviour)
+  | workers (queued in run_leases for `python -m app.tools.run_worker` processes; see leases.py)
+- RUN_WORKERS: worker threads (default 4)
+- RUN_EXECUTOR_RUNTIME: threads (default) | async (one event loop; provider calls awaited)
+- RUN_ASYNC_MAX_IN_FLIGHT: runs executing at once in the async runtime (default 1000)
+- RUN_QUEUE_MAX: queued jobs accepted before POST /runs is refused (default 1000; workers
+  mode: rows in run_leases)
+- RUN_SWEEP_FANOUT: default max children of one parameter sweep queued/running at once (default 4)
+- RUN_RESULT_CACHE: reuse results of identical seeded runs (default off; see result_cache.py)
+- RUN_LEASE_S / RUN_LEASE_MAX_ATTEMPTS: workers mode lease length and retries (see leases.py)
+- RUN_BREAKER / RUN_HEDGE: per-profile circuit breaker / hedged fallback (default off; see resilience.py)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.db import connect as _connect
+from app.core.env import env_int
+from app.core.timing import StageTimer, stages
+
+from . import leases, resilience, result_cache
+from .admission import FairQueue, ProfileLimits
+from .providers import ProviderAdapter, ProviderResult, execute_provider, execute_provider_sync, get_provider
+from .providers.registry import runtime_stats, shutdown_runtimes
+from .service import (
+    append_run_event,
+    provider_fallback_chain,
+    record_run_result,
+)
+from .resilience import CircuitOpenError
+
+
+@dataclass(frozen=True)
+class RunJob:
+    run_id: str
+    input: Dict[str, Any]
+    request_id: str
+    # called by the worker once the job is finished (either way); used by sweeps
+    on_done: Optional[Callable[[], None]] = field(default=None, compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class RunOutcome:
+    status: str
+    result_refs: Dict[str, Any]
+
+
+def sweep_fanout_default() -> int:
+    return env_int("RUN_SWEEP_FANOUT", 4, minimum=1)
+
+
+def executor_mode() -> str:
+    v = (os.getenv("RUN_EXECUTOR_MODE") or "queue").strip().lower()
+    return v if v in ("queue", "inline", "workers") else "queue"
+
+
+def queue_max() -> int:
+    return env_int("RUN_QUEUE_MAX", 1000)
+
+
+def _emit(level: str, event: str, message: str, request_id: Optional[str], **extra: Any) -> None:
+    payload: Dict[str, Any] = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "level": level,
+        "message": message,
+        "request_id": request_id,
+        "event": event,
+        "module": __name__,
+    }
+    payload.update(extra)
+    print(json.dumps(payload, ensure_ascii=False), flush=True)
+
+
+def _cached_outcome(job: RunJob, provider_name: str,
+                    conn: Optional[sqlite3.Connection] = None) -> Tuple[Optional[str], Optional[RunOutcome]]:
+    """(cache key or None, outcome when the result cache already answered the run)."""
+    key = result_cache.cache_key(provider_name, job.input)
+    if key is None:
+        return None, None
+    return key, _execute_cached(job, key, provider_name, conn)
+
+
+def _record_result(job: RunJob, provider_name: str, res: ProviderResult, key: Optional[str],
+                   used: Optional[Dict[str, Any]] = None, conn: Optional[sqlite3.Connection] = None) -> RunOutcome:
+    """
+    Assetize the provider result, link it and append the final event in one
+    transaction (service.record_run_result), then store the cache entry
+    (not for a run a fallback profile served).
+    """
+    rid = job.request_id
+    # provider result refs: start with provider-returned refs
+    rr: Dict[str, Any] = {
+        "asset_ids": [],
+        "provider": provider_name,
+        "storage_refs": list(res.result_refs or []),
+    }
+    if res.details:
+        rr["details"] = res.details
+    if used is not None:
+        # profile that actually served the run (breaker / hedging may pick a fallback)
+        rr["profile"] = used
+
+    # assetize first storage ref (best-effort) + produced_asset link + final event
+    final_status = res.status or "succeeded"
+    rr = record_run_result(job.run_id, status=final_status, result_refs=rr, request_id=rid, assetize=True, conn=conn)
+
+    # the key is built from the primary profile's snapshot: a result a fallback
+    # profile produced must not answer later runs on the primary
+    served_by_fallback = bool(used and used.get("fallback_from"))
+    if key is not None and final_status == "succeeded" and not served_by_fallback:
+        try:
+            result_cache.store(key, provider=provider_name, source_run_id=job.run_id, storage_refs=rr["storage_refs"],
+                               asset_ids=rr["asset_ids"], details=rr.get("details"))
+        except Exception as e:
+            _emit("warn", "runs.result_cache.store_failed", str(e), rid, run_id=job.run_id, type=type(e).__name__)
+
+    return RunOutcome(status=final_status, result_refs=rr)
+
+
+def _record_failure(job: RunJob, provider_name: str, e: BaseException, conn: Optional[sqlite3.Connection] = None) -> None:
+    rr_fail: Dict[str, Any] = {
+        "asset_ids": [],
+        "provider": provider_name,
+        "error": str(e),
+    }
+    if isinstance(e, CircuitOpenError):
+        rr_fail["error"] = "circuit_open"
+        rr_fail["details"] = {"message": str(e)}
+    append_run_event(job.run_id, status="failed", result_refs=rr_fail, request_id=job.request_id, conn=conn)
+
+
+def execute_run(
+    job: RunJob,
+    provider: Optional[ProviderAdapter] = None,
+    conn: Optional[sqlite3.Connection] = None,
+    timer: Optional[StageTimer] = None,
+) -> RunOutcome:
+    """
+    Run one job to completion: running -> provider.execute -> assetize -> succeeded.
+    On provider error a `failed` event is appended and the exception re-raised.
+    With RUN_RESULT_CACHE on, a cached identical run short-cuts to succeeded.
+    conn: record every transition on the caller's connection (inline POST /runs);
+    no transaction is held while the provider runs. timer: "cache" / "running" / "provider" / "record" stages.
+    """
+    stage = stages(timer)
+    provider = provider or get_provider()
+    pname = getattr(provider, "name", "unknown")
+    with stage("cache"):
+        key, hit = _cached_outcome(job, pname, conn)
+    if hit is not None:
+        return hit
+
+    with stage("running"):
+        append_run_event(job.run_id, status="running", request_id=job.request_id, conn=conn)
+    try:
+        used = None
+        with stage("provider"):
+            if not resilience.enabled():
+                res = execute_provider_sync(provider, run_id=job.run_id, input=job.input, request_id=job.request_id)
+            else:
+                def call(inp: Dict[str, Any]) -> ProviderResult:
+                    return execute_provider_sync(provider, run_id=job.run_id, input=inp, request_id=job.request_id)
+
+                res, used = resilience.call_with_policy(call, job.input, provider_fallback_chain)
+        with stage("record"):
+            return _record_result(job, pname, res, key, used, conn)
+    except Exception as e:
+        with stage("record"):
+            _record_failure(job, pname, e, conn)
+        raise
+
+
+async def execute_run_async(job: RunJob, provider: Optional[ProviderAdapter] = None) -> RunOutcome:
+    """
+    execute_run for the event-loop runtime: the provider call is awaited
+    (registry.execute_provider), DB writes go to worker threads.
+    """
+    provider = provider or get_provider()
+    pname = getattr(provider, "name", "unknown")
+    key, hit = await asyncio.to_thread(_cached_outcome, job, pname)
+    if hit is not None:
+        return hit
+
+    await asyncio.to_thread(append_run_event, job.run_id, status="running", request_id=job.request_id)
+    try:
+        if not resilience.enabled():
+            res = await execute_provider(provider, run_id=job.run_id, input=job.input, request_id=job.request_id)
+            return await asyncio.to_thread(_record_result, job, pname, res, key)
+
+        async def call(inp: Dict[str, Any]) -> ProviderResult:
+            return await execute_provider(provider, run_id=job.run_id, input=inp, request_id=job.request_id)
+
+        res, used = await resilience.call_with_policy_async(call, job.input, provider_fallback_chain)
+        return await asyncio.to_thread(_record_result, job, pname, res, key, used)
+    except Exception as e:
+        await asyncio.to_thread(_record_failure, job, pname, e)
+        raise
+
+
+def _execute_cached(job: RunJob, key: str, provider_name: str, conn: Optional[sqlite3.Connection] = None) -> Optional[RunOutcome]:
+    """Cache hit: succeeded straight away, pointing at the cached artifact. None on a miss."""
+    try:
+        hit = result_cache.lookup(key)
+    except Exception as e:
+        _emit("warn", "runs.result_cache.lookup_failed", str(e), job.request_id, run_id=job.run_id, type=type(e).__name__)
+        return None
+    if hit is None:
+        return None
+    rr: Dict[str, Any] = {
+        "asset_ids": list(hit["asset_ids"]),
+        "provider": provider_name,
+        "storage_refs": list(hit["storage_refs"]),
+        "cache": {"hit": True, "key": key, "source_run_id": hit["source_run_id"]},
+    }
+    if hit.get("details"):
+        rr["details"] = hit["details"]
+    rr = record_run_result(job.run_id, status="succeeded", result_refs=rr, request_id=job.request_id, conn=conn)
+    return RunOutcome(status="succeeded", result_refs=rr)
+
+
+def _admission(job: RunJob) -> Tuple[Optional[str], ProfileLimits]:
+    """(lane, limits) of a job: its resolved provider profile and the limits in its snapshot."""
+    evidence = job.input.get("evidence") or {}
+    snap = evidence.get("provider_profile_snapshot") or {}
+    lane = evidence.get("resolved_provider_profile_id") or snap.get("id") or None
+    return (str(lane) if lane else None), ProfileLimits.from_config(snap.get("limits"))
+
+
+class RunExecutor:
+    """
+    Drains a bounded FairQueue of RunJobs (one lane per provider profile,
+    per-profile limits; see admission.py). Two runtimes:
+    - threads: fixed pool of daemon worker threads, one run each
+    - async: one event loop holding up to max_in_flight runs (execute_run_async),
+      fed by a dispatcher thread; sync adapters go to the registry's bounded pool
+    Started lazily on first submit; provider calls never hold a request thread.
+    """
+
+    def __init__(self, workers: int, queue_max: int, runtime: str = "threads", max_in_flight: int = 1000) -> None:
+        self.workers = max(workers, 1)
+        self.queue_max = max(queue_max, 1)
+        self.runtime = runtime if runtime in ("threads", "async") else "threads"
+        self.max_in_flight = max(max_in_flight, 1)
+        self._q = FairQueue(maxsize=self.queue_max)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stopped = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads or self._stopped:
+                return
+            if self.runtime == "async":
+                self._loop = asyncio.new_event_loop()
+                for name, target in (("run-loop", self._loop.run_forever), ("run-dispatch", self._dispatch)):
+                    t = threading.Thread(target=target, name=name, daemon=True)
+                    t.start()
+                    self._threads.append(t)
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"run-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _worker(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            job, lane = item
+            with self._lock:
+                self._in_flight += 1
+            try:
+                execute_run(job)
+            except Exception as e:
+                # already recorded as a `failed` run event
+                _emit("error", "runs.execute.failed", str(e), job.request_id, run_id=job.run_id, type=type(e).__name__)
+            finally:
+                self._finish(job, lane)
+
+    def _dispatch(self) -> None:
+        # async runtime: a free in-flight slot first, then the next admissible job
+        assert self._loop is not None
+        while True:
+            self._slots.acquire()
+            item = self._q.get()
+            if item is None:
+                self._slots.release()
+                return
+            with self._lock:
+                self._in_flight += 1
+            asyncio.run_coroutine_threadsafe(self._run_async(*item), self._loop)
+
+    async def _run_async(self, job: RunJob, lane: str) -> None:
+        try:
+            await execute_run_async(job)
+        except Exception as e:
+            _emit("error", "runs.execute.failed", str(e), job.request_id, run_id=job.run_id, type=type(e).__name__)
+        finally:
+            self._finish(job, lane)
+            self._slots.release()
+
+    def _finish(self, job: RunJob, lane: str) -> None:
+        self._q.done(lane)
+        with self._lock:
+            self._in_flight -= 1
+        if job.on_done is not None:
+            try:
+                job.on_done()
+            except Exception as e:
+                _emit("error", "runs.sweep.advance_failed", str(e), job.request_id, run_id=job.run_id, type=type(e).__name__)
+
+    def submit(self, job: RunJob) -> bool:
+        """Enqueue without blocking; False when the queue is full or the executor is stopped."""
+        if self._stopped:
+            return False
+        self._ensure_started()
+        lane, limits = _admission(job)
+        try:
+            self._q.put_nowait(job, lane, limits)
+            return True
+        except queue.Full:
+            return False
+
+    def submit_sweep(self, jobs: List[RunJob], fanout: int) -> None:
+        """Queue a sweep's children, keeping at most `fanout` of them queued or running."""
+        _Sweep(self, jobs, fanout).pump()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            threads = list(self._threads)
+        self._q.close()
+        if self._loop is None:
+            for t in threads:
+                t.join(timeout=timeout)
+            return
+        # async: stop dispatching, let in-flight runs finish, then stop the loop
+        deadline = time.monotonic() + timeout
+        threads[1].join(timeout=timeout)
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._in_flight == 0:
+                    break
+            time.sleep(0.05)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        threads[0].join(timeout=max(deadline - time.monotonic(), 0.1))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            started = bool(self._threads)
+        return {
+            "runtime": self.runtime,
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "started": started,
+            "queue_depth": self._q.qsize(),
+            "queue_max": self.queue_max,
+            "in_flight": in_flight,
+            "profiles": self._q.stats(),
+            "provider_runtime": runtime_stats(),
+            "breakers": resilience.breaker_stats(),
+        }
+
+
+class _Sweep:
+    """
+    Feeds the children of one parameter sweep into the executor: the next child
+    is submitted when a running one finishes. A child the queue refuses is
+    recorded as failed (run_queue_full) so the sweep still completes.
+    """
+
+    def __init__(self, executor: RunExecutor, jobs: List[RunJob], fanout: int) -> None:
+        self._executor = executor
+        self._pending: Deque[RunJob] = deque(jobs)
+        self._fanout = max(fanout, 1)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def pump(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending or self._active >= self._fanout:
+                    return
+                job = self._pending.popleft()
+                self._active += 1
+            if not self._executor.submit(replace(job, on_done=self._done)):
+                with self._lock:
+                    self._active -= 1
+                append_run_event(job.run_id, status="failed", result_refs={"asset_ids": [], "error": "run_queue_full"}, request_id=job.request_id)
+
+    def _done(self) -> None:
+        with self._lock:
+            self._active -= 1
+        self.pump()
+
+
+def run_sweep_inline(jobs: List[RunJob], fanout: int) -> List[str]:
+    """Inline mode: run a sweep's children inside the request, `fanout` at a time. Returns final statuses."""
+
+    def one(job: RunJob) -> str:
+        try:
+            return execute_run(job).status
+        except Exception:
+            return "failed"
+
+    with ThreadPoolExecutor(max_workers=max(fanout, 1), thread_name_prefix="run-sweep") as pool:
+        return list(pool.map(one, jobs))
+
+
+_executor: Optional[RunExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> RunExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = RunExecutor(
+                workers=env_int("RUN_WORKERS", 4),
+                queue_max=queue_max(),
+                runtime=(os.getenv("RUN_EXECUTOR_RUNTIME") or "threads").strip().lower(),
+                max_in_flight=env_int("RUN_ASYNC_MAX_IN_FLIGHT", 1000),
+            )
+        return _executor
+
+
+def _enqueue(jobs: List[RunJob], conn: Optional[sqlite3.Connection] = None,
+             group_id: Optional[str] = None, fanout: Optional[int] = None) -> List[bool]:
+    if not jobs:
+        return []
+    runs = []
+    for job in jobs:
+        lane, limits = _admission(job)
+        runs.append(leases.QueuedRun(run_id=job.run_id, input=job.input, request_id=job.request_id, lane=lane,
+                                     lane_limit=limits.max_concurrency, group_id=group_id, group_limit=fanout))
+    own = conn is None
+    c = _connect() if own else conn
+    try:
+        return leases.enqueue(c, runs, queue_max())
+    finally:
+        if own:
+            c.close()
+
+
+def submit_runs(jobs: List[RunJob], conn: Optional[sqlite3.Connection] = None) -> List[bool]:
+    """
+    Hand jobs to the in-process executor (queue mode) or to run_leases (workers
+    mode; one transaction, on conn when given). False per job refused as queue full.
+    """
+    if executor_mode() == "workers":
+        return _enqueue(jobs, conn)
+    ex = get_executor()
+    return [ex.submit(job) for job in jobs]
+
+
+def submit_sweep_runs(jobs: List[RunJob], fanout: int, group_id: str) -> None:
+    """A sweep's children, at most `fanout` of them running at once (workers mode: across all workers)."""
+    if executor_mode() != "workers":
+        get_executor().submit_sweep(jobs, fanout)
+        return
+    for job, ok in zip(jobs, _enqueue(jobs, group_id=group_id, fanout=max(fanout, 1))):
+        if not ok:
+            append_run_event(job.run_id, status="failed", result_refs={"asset_ids": [], "error": "run_queue_full"}, request_id=job.request_id)
+
+
+def queue_stats() -> Dict[str, Any]:
+    """GET /runs/queue body for the current mode."""
+    if executor_mode() != "workers":
+        return {"mode": executor_mode(), **get_executor().stats()}
+    conn = _connect()
+    try:
+        return {"mode": "workers", "queue_max": queue_max(), **leases.stats(conn)}
+    finally:
+        conn.close()
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown()
+    shutdown_runtimes()
@@ -0,0 +1,118 @@
+"""
+Content-addressed interning of prompt packs and provider profile snapshots (opt-in).
+
+With repeated prompts every run used to add a prompt_packs row and a full copy of
+its provider profile snapshot inside runs.input_json. With RUN_INTERNING=1:
+
+- prompt packs: a payload whose digest (ix_prompt_packs_digest) and content match
+  an existing row reuses that row's id; only new payloads are inserted
+- snapshots: stored once in provider_profile_snapshots keyed by the sha256 of their
+  canonical JSON; the run's stored evidence carries provider_profile_snapshot_ref
+  instead of provider_profile_snapshot (expand_evidence restores it for readers of
+  the stored evidence, e.g. the GET /assets/{id} trace chain)
+
+Both tables stay append-only: interning only ever inserts (INSERT OR IGNORE for
+snapshots) and never rewrites a row. The evidence returned by create_run_v11 and
+handed to the executor always carries the full snapshot. Runs created with the
+flag off keep the inline form, so readers must accept both.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core import schema
+
+SNAPSHOT_KEY = "provider_profile_snapshot"
+SNAPSHOT_REF_KEY = "provider_profile_snapshot_ref"
+
+_DDL: Dict[str, str] = {
+    "provider_profile_snapshots": """
+        CREATE TABLE IF NOT EXISTS provider_profile_snapshots (
+            digest TEXT PRIMARY KEY,
+            snapshot_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        """,
+    "trg_provider_profile_snapshots_no_update": """
+        CREATE TRIGGER IF NOT EXISTS trg_provider_profile_snapshots_no_update
+        BEFORE UPDATE ON provider_profile_snapshots
+        BEGIN
+          SELECT RAISE(ABORT, 'append-only: provider_profile_snapshots cannot be updated');
+        END;
+        """,
+    "trg_provider_profile_snapshots_no_delete": """
+        CREATE TRIGGER IF NOT EXISTS trg_provider_profile_snapshots_no_delete
+        BEFORE DELETE ON provider_profile_snapshots
+        BEGIN
+          SELECT RAISE(ABORT, 'append-only: provider_profile_snapshots cannot be deleted');
+        END;
+        """,
+}
+
+
+def enabled() -> bool:
+    return (os.getenv("RUN_INTERNING") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _canonical(v: Any) -> str:
+    return json.dumps(v, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def snapshot_digest(snapshot: Dict[str, Any]) -> str:
+    return hashlib.sha256(_canonical(snapshot).encode("utf-8")).hexdigest()
+
+
+def find_prompt_pack(conn: sqlite3.Connection, pk: str, payload_col: str, digest: str, payload: str) -> Optional[str]:
+    """Oldest prompt pack with this digest and byte-identical payload, else None."""
+    row = conn.execute(
+        f"SELECT {pk} FROM prompt_packs WHERE digest=? AND {payload_col}=? ORDER BY rowid LIMIT 1;",
+        (digest, payload),
+    ).fetchone()
+    return str(row[0]) if row else None
+
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    schema.ensure_objects(conn, _DDL)
+
+
+class SnapshotStore:
+    """Interns snapshots inside the caller's write transaction (one instance per transaction)."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self._written: Dict[int, str] = {}  # id(snapshot dict) -> digest, within this transaction
+        ensure_tables(conn)
+
+    def stored_evidence(self, evidence: Dict[str, Any]) -> Dict[str, Any]:
+        """Evidence as written to runs.input_json: the snapshot replaced by its digest."""
+        snap = evidence.get(SNAPSHOT_KEY)
+        if not isinstance(snap, dict) or not snap:
+            return evidence
+        digest = self._written.get(id(snap))
+        if digest is None:
+            digest = snapshot_digest(snap)
+            now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+            self.conn.execute(
+                "INSERT OR IGNORE INTO provider_profile_snapshots (digest, snapshot_json, created_at) VALUES (?,?,?);",
+                (digest, _canonical(snap), now),
+            )
+            self._written[id(snap)] = digest
+        out = {k: v for k, v in evidence.items() if k != SNAPSHOT_KEY}
+        out[SNAPSHOT_REF_KEY] = digest
+        return out
+
+
+def expand_evidence(conn: sqlite3.Connection, evidence: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored evidence -> evidence with provider_profile_snapshot inline (either stored form)."""
+    digest = evidence.get(SNAPSHOT_REF_KEY)
+    if not digest or SNAPSHOT_KEY in evidence or not schema.table_exists(conn, "provider_profile_snapshots"):
+        return evidence
+    row = conn.execute("SELECT snapshot_json FROM provider_profile_snapshots WHERE digest=?;", (digest,)).fetchone()
+    out = {k: v for k, v in evidence.items() if k != SNAPSHOT_REF_KEY}
+    out[SNAPSHOT_KEY] = json.loads(row[0]) if row else {}
+    return out
@@ -0,0 +1,290 @@
+"""
+DB-backed run queue for standalone worker processes (RUN_EXECUTOR_MODE=workers).
+
+POST /runs puts the job in run_leases instead of the in-process executor;
+`python -m app.tools.run_worker` processes (on this host or any host sharing the
+database and storage root) claim rows and execute them. A row is the lease:
+
+- queued: worker_id NULL
+- leased: worker_id / lease_token set, lease_expires_at = claim time + RUN_LEASE_S;
+  the worker's heartbeat pushes lease_expires_at forward every RUN_LEASE_S / 3
+- done: the row is deleted once the run has a terminal event
+
+A worker that crashes stops heartbeating; once its lease expires the next claim
+takes the row over (a `queued` event with result_refs.lease records the
+takeover) and runs it again. After RUN_LEASE_MAX_ATTEMPTS claims the run is
+failed with lease_attempts_exhausted instead. A claimed run whose terminal event
+is already committed (its worker died before deleting the row) is not run again.
+Every status transition still goes through run_events: claim, takeover and
+finish stage their events in the same transaction as the lease change.
+
+Delivery is at-least-once: a worker that stalls past its lease (no heartbeat for
+RUN_LEASE_S) may finish a run another worker has taken over.
+
+Claiming honours, across all workers, a sweep's fanout (group_limit) and the
+profile's limits.max_concurrency (lane_limit); rate_per_s / burst stay
+per-process admission (admission.py) and are not enforced here.
+Lease times are wall-clock UTC: hosts sharing a database need synced clocks.
+
+Env:
+- RUN_LEASE_S: lease length in seconds (default 30)
+- RUN_LEASE_MAX_ATTEMPTS: claims per run before it is failed (default 3)
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core import schema
+from app.core.clock import utc_iso
+from app.core.env import env_int
+
+from .events import TERMINAL_STATUSES, publish_run_event
+from .service import _ensure_run_events_table, _stage_run_event, new_ulid
+
+_DDL: Dict[str, str] = {
+    "run_leases": """
+        CREATE TABLE IF NOT EXISTS run_leases (
+            run_id TEXT PRIMARY KEY,
+            job_json TEXT NOT NULL,
+            request_id TEXT,
+            lane TEXT,
+            lane_limit INTEGER,
+            group_id TEXT,
+            group_limit INTEGER,
+            enqueued_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_token TEXT,
+            leased_at TEXT,
+            heartbeat_at TEXT,
+            lease_expires_at TEXT
+        );
+        """,
+    "ix_run_leases_enqueued_at": "CREATE INDEX IF NOT EXISTS ix_run_leases_enqueued_at ON run_leases (enqueued_at, run_id);",
+    "ix_run_leases_worker_id": "CREATE INDEX IF NOT EXISTS ix_run_leases_worker_id ON run_leases (worker_id);",
+    "ix_run_leases_group": "CREATE INDEX IF NOT EXISTS ix_run_leases_group ON run_leases (group_id, lease_expires_at);",
+    "ix_run_leases_lane": "CREATE INDEX IF NOT EXISTS ix_run_leases_lane ON run_leases (lane, lease_expires_at);",
+}
+
+# oldest claimable row: queued or lease expired, and its sweep / profile below its limit
+CLAIM_SQL = """
+    SELECT * FROM run_leases AS r
+    WHERE (r.lease_expires_at IS NULL OR r.lease_expires_at < ?)
+      AND (r.group_limit IS NULL OR
+           (SELECT COUNT(*) FROM run_leases AS g WHERE g.group_id = r.group_id AND g.lease_expires_at >= ?) < r.group_limit)
+      AND (r.lane_limit IS NULL OR
+           (SELECT COUNT(*) FROM run_leases AS l WHERE l.lane = r.lane AND l.lease_expires_at >= ?) < r.lane_limit)
+    ORDER BY r.enqueued_at, r.run_id
+    LIMIT 1;
+"""
+
+
+def lease_s() -> int:
+    return env_int("RUN_LEASE_S", 30, minimum=1)
+
+
+def max_attempts() -> int:
+    return env_int("RUN_LEASE_MAX_ATTEMPTS", 3, minimum=1)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class QueuedRun:
+    run_id: str
+    input: Dict[str, Any]
+    request_id: str
+    lane: Optional[str] = None
+    lane_limit: Optional[int] = None
+    group_id: Optional[str] = None
+    group_limit: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Lease:
+    run_id: str
+    token: str
+    attempt: int
+    input: Dict[str, Any]
+    request_id: str
+
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    schema.ensure_objects(conn, _DDL)
+    _ensure_run_events_table(conn)
+
+
+def enqueue(conn: sqlite3.Connection, runs: List[QueuedRun], queue_max: int) -> List[bool]:
+    """
+    Queue runs in one transaction; False for each run refused because
+    queue_max rows (queued + leased) already exist. No transaction may be open on conn.
+    """
+    ensure_tables(conn)
+    now = utc_iso(_now())
+    out: List[bool] = []
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        depth = int(conn.execute("SELECT COUNT(*) FROM run_leases;").fetchone()[0])
+        for r in runs:
+            if depth >= queue_max:
+                out.append(False)
+                continue
+            conn.execute(
+                """
+                INSERT INTO run_leases (run_id, job_json, request_id, lane, lane_limit, group_id, group_limit, enqueued_at)
+                VALUES (?,?,?,?,?,?,?,?);
+                """,
+                (r.run_id, json.dumps(r.input, ensure_ascii=False), r.request_id, r.lane, r.lane_limit,
+                 r.group_id, r.group_limit, now),
+            )
+            depth += 1
+            out.append(True)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return out
+
+
+def _current_status(conn: sqlite3.Connection, run_id: str) -> Optional[str]:
+    row = conn.execute("SELECT status FROM run_status_current WHERE run_id=?;", (run_id,)).fetchone()
+    return str(row[0]) if row else None
+
+
+def claim(conn: sqlite3.Connection, worker_id: str) -> Optional[Lease]:
+    """
+    Lease the oldest claimable run to worker_id; None when nothing is claimable.
+    Expired leases are taken over here (or failed once out of attempts).
+    """
+    ensure_tables(conn)
+    now_dt = _now()
+    now = utc_iso(now_dt)
+    events: List[Dict[str, Any]] = []
+    lease: Optional[Lease] = None
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        while True:
+            row = conn.execute(CLAIM_SQL, (now, now, now)).fetchone()
+            if row is None:
+                break
+            run_id = str(row["run_id"])
+            if _current_status(conn, run_id) in TERMINAL_STATUSES:
+                # finished, but its worker died before deleting the lease
+                conn.execute("DELETE FROM run_leases WHERE run_id=?;", (run_id,))
+                continue
+            attempts = int(row["attempts"])
+            if attempts >= max_attempts():
+                conn.execute("DELETE FROM run_leases WHERE run_id=?;", (run_id,))
+                rr = {"asset_ids": [], "error": "lease_attempts_exhausted",
+                      "details": {"attempts": attempts, "last_worker_id": row["worker_id"]}}
+                events.append(_stage_run_event(conn, run_id, status="failed", result_refs=rr, request_id=row["request_id"]))
+                continue
+            if row["worker_id"] is not None:
+                rr = {"asset_ids": [], "lease": {"reason": "lease_expired", "worker_id": row["worker_id"], "attempt": attempts}}
+                events.append(_stage_run_event(conn, run_id, status="queued", result_refs=rr, request_id=row["request_id"]))
+            token = new_ulid()
+            conn.execute(
+                """
+                UPDATE run_leases
+                   SET worker_id=?, lease_token=?, leased_at=?, heartbeat_at=?, lease_expires_at=?, attempts=attempts+1
+                 WHERE run_id=?;
+                """,
+                (worker_id, token, now, now, utc_iso(now_dt + timedelta(seconds=lease_s())), run_id),
+            )
+            lease = Lease(run_id=run_id, token=token, attempt=attempts + 1,
+                          input=json.loads(row["job_json"]), request_id=str(row["request_id"] or ""))
+            break
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    for ev in events:
+        publish_run_event(ev)
+    return lease
+
+
+def renew(conn: sqlite3.Connection, worker_id: str) -> int:
+    """Heartbeat: extend every lease worker_id still holds. Returns the number of leases held."""
+    now_dt = _now()
+    cur = conn.execute(
+        "UPDATE run_leases SET heartbeat_at=?, lease_expires_at=? WHERE worker_id=?;",
+        (utc_iso(now_dt), utc_iso(now_dt + timedelta(seconds=lease_s())), worker_id),
+    )
+    conn.commit()
+    return int(cur.rowcount)
+
+
+def finish(conn: sqlite3.Connection, lease: Lease) -> bool:
+    """
+    Called after the worker ran the job (either way). A run with a terminal event
+    drops its row; otherwise (the worker failed before recording one) it is put
+    back in the queue with a `queued` event. False when the lease was lost.
+    """
+    ensure_tables(conn)
+    event: Optional[Dict[str, Any]] = None
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        row = conn.execute(
+            "SELECT worker_id, request_id FROM run_leases WHERE run_id=? AND lease_token=?;", (lease.run_id, lease.token)
+        ).fetchone()
+        if row is None:
+            conn.commit()
+            return False
+        if _current_status(conn, lease.run_id) in TERMINAL_STATUSES:
+            conn.execute("DELETE FROM run_leases WHERE run_id=?;", (lease.run_id,))
+        else:
+            conn.execute(
+                """
+                UPDATE run_leases
+                   SET worker_id=NULL, lease_token=NULL, leased_at=NULL, heartbeat_at=NULL, lease_expires_at=NULL
+                 WHERE run_id=?;
+                """,
+                (lease.run_id,),
+            )
+            rr = {"asset_ids": [], "lease": {"reason": "worker_error", "worker_id": row["worker_id"], "attempt": lease.attempt}}
+            event = _stage_run_event(conn, lease.run_id, status="queued", result_refs=rr, request_id=row["request_id"])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if event is not None:
+        publish_run_event(event)
+    return True
+
+
+def stats(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Queue depth, live / expired leases per worker and the oldest queued wait."""
+    ensure_tables(conn)
+    now_dt = _now()
+    now = utc_iso(now_dt)
+    queued = int(conn.execute("SELECT COUNT(*) FROM run_leases WHERE worker_id IS NULL;").fetchone()[0])
+    workers: Dict[str, Dict[str, int]] = {}
+    for row in conn.execute(
+        "SELECT worker_id, lease_expires_at >= ? AS live, COUNT(*) FROM run_leases "
+        "WHERE worker_id IS NOT NULL GROUP BY worker_id, live;",
+        (now,),
+    ).fetchall():
+        w = workers.setdefault(str(row[0]), {"leased": 0, "expired": 0})
+        w["leased" if row[1] else "expired"] += int(row[2])
+    oldest = conn.execute(
+        "SELECT MIN(enqueued_at) FROM run_leases WHERE worker_id IS NULL;"
+    ).fetchone()[0]
+    oldest_s = None
+    if oldest:
+        oldest_s = round((now_dt - datetime.fromisoformat(str(oldest).replace("Z", "+00:00"))).total_seconds(), 3)
+    return {
+        "queue_depth": queued + sum(w["leased"] + w["expired"] for w in workers.values()),
+        "queued": queued,
+        "leased": sum(w["leased"] for w in workers.values()),
+        "expired": sum(w["expired"] for w in workers.values()),
+        "oldest_queued_s": oldest_s,
+        "workers": workers,
+        "lease_s": lease_s(),
+        "max_attempts": max_attempts(),
+    }
@@ -1,2 +1,2 @@
-from .base import ProviderAdapter, ProviderResult
-from .registry import get_provider, is_provider_enabled
+from .base import AsyncProviderAdapter, ProviderAdapter, ProviderResult, is_async_adapter
+from .registry import execute_provider, execute_provider_sync, get_provider, is_provider_enabled
@@ -27,3 +27,20 @@ class ProviderAdapter(Protocol):
 
     def execute(self, *, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
         ...
+
+
+class AsyncProviderAdapter(Protocol):
+    """
+    Non-blocking variant for network-bound providers: execute_async runs on the
+    executor's event loop, so an in-flight call holds no OS thread.
+    An adapter may implement either protocol or both (registry.execute_provider
+    prefers execute_async).
+    """
+    name: str
+
+    async def execute_async(self, *, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
+        ...
+
+
+def is_async_adapter(provider: object) -> bool:
+    return callable(getattr(provider, "execute_async", None))
@@ -1,29 +1,115 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import math
 import os
+import random
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.env import env_float
 
 from .base import ProviderResult
 
+LatencySampler = Callable[[random.Random], float]
+
+# shared across instances (the registry builds one per run); MOCK_PROVIDER_SEED pins it
+_rng = random.Random(os.environ.get("MOCK_PROVIDER_SEED"))
+_rng_lock = threading.Lock()
+
+
+def parse_latency(spec: Optional[str]) -> Optional[LatencySampler]:
+    """
+    Latency spec -> sampler returning milliseconds; None/"" -> no added latency.
+      fixed:<ms> | uniform:<lo>,<hi> | exp:<mean> | lognormal:<median>,<sigma>
+    Raises ValueError on a malformed spec.
+    """
+    if not spec or not spec.strip():
+        return None
+    kind, _, args = spec.strip().partition(":")
+    try:
+        nums = [float(x) for x in args.split(",")] if args else []
+    except ValueError as e:
+        raise ValueError(f"bad latency spec: {spec}") from e
+    kind = kind.lower()
+    if kind == "fixed" and len(nums) == 1:
+        return lambda r: nums[0]
+    if kind == "uniform" and len(nums) == 2:
+        return lambda r: r.uniform(nums[0], nums[1])
+    if kind == "exp" and len(nums) == 1 and nums[0] > 0:
+        return lambda r: r.expovariate(1.0 / nums[0])
+    if kind == "lognormal" and len(nums) == 2 and nums[0] > 0:
+        return lambda r: r.lognormvariate(math.log(nums[0]), nums[1])
+    raise ValueError(f"bad latency spec: {spec}")
+
 
 class MockProvider:
     """
     Minimal executable provider for P1:
     - writes a JSON artifact into storage root
     - returns a stable storage ref in result_refs
+
+    Knobs for modelling real providers under load (env; all off by default):
+    - MOCK_PROVIDER_LATENCY: latency distribution, see parse_latency (malformed -> off)
+    - MOCK_PROVIDER_ARTIFACT_BYTES: pad result.json to at least this many bytes
+    - MOCK_PROVIDER_FAILURE_RATE: fraction (0..1) of executions that raise
     """
     name = "mock"
 
-    def __init__(self, storage_root: str | None = None) -> None:
+    def __init__(
+        self,
+        storage_root: str | None = None,
+        *,
+        latency: Optional[str] = None,
+        artifact_bytes: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+    ) -> None:
         self.storage_root = storage_root or os.environ.get("STORAGE_ROOT") or "./data/storage"
+        try:
+            self.latency = parse_latency(latency if latency is not None else os.environ.get("MOCK_PROVIDER_LATENCY"))
+        except ValueError:
+            self.latency = None
+        self.artifact_bytes = max(int(artifact_bytes if artifact_bytes is not None
+                                      else env_float("MOCK_PROVIDER_ARTIFACT_BYTES", 0)), 0)
+        rate = failure_rate if failure_rate is not None else env_float("MOCK_PROVIDER_FAILURE_RATE", 0.0)
+        self.failure_rate = min(max(rate, 0.0), 1.0)
+
+    def _sample(self) -> Tuple[float, bool]:
+        """(delay_ms, inject_failure) for one execution."""
+        if self.latency is None and self.failure_rate <= 0:
+            return 0.0, False
+        with _rng_lock:
+            delay_ms = self.latency(_rng) if self.latency is not None else 0.0
+            fail = _rng.random() < self.failure_rate
+        return delay_ms, fail
 
     def execute(self, *, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
         if input.get('__force_fail__'):
             raise RuntimeError('forced failure')
 
+        delay_ms, fail = self._sample()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        if fail:
+            raise RuntimeError('mock provider: injected failure')
+        return self._write(run_id, input, request_id)
+
+    async def execute_async(self, *, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
+        """Same as execute; the simulated latency is an asyncio.sleep, so it holds no thread."""
+        if input.get('__force_fail__'):
+            raise RuntimeError('forced failure')
+
+        delay_ms, fail = self._sample()
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+        if fail:
+            raise RuntimeError('mock provider: injected failure')
+        return await asyncio.to_thread(self._write, run_id, input, request_id)
+
+    def _write(self, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
         out_dir = Path(self.storage_root) / "runs" / run_id
         out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -35,7 +121,11 @@ class MockProvider:
             "ts": time.time(),
             "input": input,
         }
-        out_file.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        body = json.dumps(payload, ensure_ascii=False, indent=2)
+        if len(body) < self.artifact_bytes:
+            payload["padding"] = "x" * (self.artifact_bytes - len(body))
+            body = json.dumps(payload, ensure_ascii=False, indent=2)
+        out_file.write_text(body, encoding="utf-8")
 
         # IMPORTANT: keep ref shape stable and human-readable.
         # If your repo already uses a different ref convention, we'll align in the next step.
@@ -0,0 +1,210 @@
+"""
+Process-pool runtime for CPU-bound local providers (upscaling, conversion, procedural).
+
+ProcessPoolProvider is a ProviderAdapter that runs another adapter ("module:Class",
+constructed once per worker) in warm, reusable worker processes, so CPU work never
+competes with request threads for the GIL. Workers write artifacts to storage
+themselves; only the small ProviderResult (refs + details) crosses the pipe.
+
+Per task:
+- timeout: the worker is killed and replaced, the run fails with TimeoutError
+- memory: RLIMIT_AS per worker (Linux/macOS); MemoryError fails the run and
+  recycles the worker; a worker killed by the OS fails the run and is replaced
+- max_tasks: recycle a worker after this many tasks (0 = never)
+
+Env (read by registry.get_provider when PROVIDER_RUNTIME=process):
+- PROVIDER_PROCESS_TARGET: adapter class, default app.modules.runs.providers.mock_provider:MockProvider
+- PROVIDER_PROCESS_WORKERS: worker processes (default: CPU count)
+- PROVIDER_PROCESS_TIMEOUT_S: per-task timeout (default 300)
+- PROVIDER_PROCESS_MEMORY_MB: address-space limit per worker (default 0 = none)
+- PROVIDER_PROCESS_MAX_TASKS: tasks per worker before it is recycled (default 0)
+"""
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import queue
+import threading
+from typing import Any, Dict, List
+
+from .base import ProviderResult
+
+DEFAULT_TARGET = "app.modules.runs.providers.mock_provider:MockProvider"
+
+
+def load_target(target: str) -> Any:
+    """'package.module:Class' -> Class. Raises ValueError on a malformed spec."""
+    mod_name, _, attr = target.partition(":")
+    if not mod_name or not attr:
+        raise ValueError(f"bad provider target: {target}")
+    return getattr(importlib.import_module(mod_name), attr)
+
+
+def _apply_memory_limit(memory_mb: int) -> None:
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # not available on this platform
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn: Any, target: str, memory_mb: int) -> None:
+    _apply_memory_limit(memory_mb)
+    provider = load_target(target)()
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        run_id, inp, request_id = msg
+        try:
+            res = provider.execute(run_id=run_id, input=inp, request_id=request_id)
+            conn.send(("ok", res.status, list(res.result_refs or []), res.details))
+        except MemoryError:
+            conn.send(("error", "MemoryError", "provider worker exceeded its memory limit"))
+        except BaseException as e:
+            conn.send(("error", type(e).__name__, str(e)))
+
+
+class ProviderWorkerError(RuntimeError):
+    pass
+
+
+class _Worker:
+    def __init__(self, ctx: Any, target: str, memory_mb: int, index: int) -> None:
+        parent, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, target, memory_mb),
+                                name=f"provider-proc-{index}", daemon=True)
+        self.proc.start()
+        child.close()
+        self.conn = parent
+        self.tasks = 0
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(timeout=5)
+
+
+class ProcessPoolProvider:
+    def __init__(
+        self,
+        target: str = DEFAULT_TARGET,
+        *,
+        workers: int = 0,
+        timeout_s: float = 300.0,
+        memory_mb: int = 0,
+        max_tasks: int = 0,
+    ) -> None:
+        cls = load_target(target)
+        self.name = str(getattr(cls, "name", target))
+        self.target = target
+        self.workers = workers if workers > 0 else (multiprocessing.cpu_count() or 1)
+        self.timeout_s = timeout_s
+        self.memory_mb = memory_mb
+        self.max_tasks = max_tasks
+        # spawn: workers must not inherit the API's threads / sqlite handles
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all: List[_Worker] = []
+        self._spawned = 0
+        self._counts = {"tasks": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        try:
+            w = self._idle.get_nowait()
+            if w.proc.is_alive():
+                return w
+            self._discard(w)
+        except queue.Empty:
+            pass
+        with self._lock:
+            self._spawned += 1
+            w = _Worker(self._ctx, self.target, self.memory_mb, self._spawned)
+            self._all.append(w)
+        return w
+
+    def _discard(self, w: _Worker) -> None:
+        w.kill()
+        with self._lock:
+            if w in self._all:
+                self._all.remove(w)
+
+    def execute(self, *, run_id: str, input: Dict[str, Any], request_id: str) -> ProviderResult:
+        if self._closed:
+            raise ProviderWorkerError("provider process pool is shut down")
+        self._slots.acquire()
+        try:
+            w = self._checkout()
+            keep = False
+            try:
+                w.conn.send((run_id, input, request_id))
+                if not w.conn.poll(self.timeout_s):
+                    self._count("timeouts")
+                    raise TimeoutError(f"provider task exceeded {self.timeout_s:g}s")
+                msg = w.conn.recv()
+                w.tasks += 1
+                self._count("tasks")
+                keep = msg[0] == "ok" or msg[1] != "MemoryError"
+            except TimeoutError:
+                raise
+            except (EOFError, OSError) as e:
+                self._count("crashes")
+                raise ProviderWorkerError(f"provider worker died (exitcode={w.proc.exitcode})") from e
+            finally:
+                if keep and self.max_tasks > 0 and w.tasks >= self.max_tasks:
+                    keep = False
+                    self._count("recycled")
+                if keep and not self._closed:
+                    self._idle.put(w)
+                else:
+                    self._discard(w)
+        finally:
+            self._slots.release()
+
+        if msg[0] == "ok":
+            return ProviderResult(status=msg[1], result_refs=msg[2], details=msg[3])
+        if msg[1] == "MemoryError":
+            raise MemoryError(msg[2])
+        raise ProviderWorkerError(f"{msg[1]}: {msg[2]}")
+
+    def _count(self, k: str) -> None:
+        with self._lock:
+            self._counts[k] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "target": self.target,
+                "workers": self.workers,
+                "alive": sum(1 for w in self._all if w.proc.is_alive()),
+                "idle": self._idle.qsize(),
+                "timeout_s": self.timeout_s,
+                "memory_mb": self.memory_mb,
+                **self._counts,
+            }
+
+    def shutdown(self) -> None:
+        self._closed = True
+        with self._lock:
+            workers = list(self._all)
+            self._all.clear()
+        for w in workers:
+            try:
+                w.conn.send(None)
+            except Exception:
+                pass
+            w.proc.join(timeout=2)
+            w.kill()
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
 
-from .base import ProviderAdapter
+from app.core.env import env_float, env_int
+
+from .base import AsyncProviderAdapter, ProviderAdapter, ProviderResult, is_async_adapter
 from .mock_provider import MockProvider
+from .process_pool import DEFAULT_TARGET, ProcessPoolProvider
 
 
 def is_provider_enabled(*, default: bool = False) -> bool:
@@ -21,10 +28,105 @@ def is_provider_enabled(*, default: bool = False) -> bool:
     return v not in ("0", "false", "no", "")
 
 
-def get_provider(name: Optional[str] = None) -> ProviderAdapter:
+def provider_runtime() -> str:
+    """PROVIDER_RUNTIME: inprocess (default) | process (warm worker processes, see process_pool.py)."""
+    v = (os.environ.get("PROVIDER_RUNTIME") or "inprocess").strip().lower()
+    return v if v in ("inprocess", "process") else "inprocess"
+
+
+def get_provider(name: Optional[str] = None) -> Union[ProviderAdapter, AsyncProviderAdapter]:
     """
     Registry entry point.
     P1 only ships "mock". Future: route by name/config.
+    With PROVIDER_RUNTIME=process every run goes through the shared process pool.
     """
     _ = name  # reserved
+    if provider_runtime() == "process":
+        return get_process_pool()
     return MockProvider()
+
+
+_process_pool: Optional[ProcessPoolProvider] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolProvider:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolProvider(
+                (os.environ.get("PROVIDER_PROCESS_TARGET") or "").strip() or DEFAULT_TARGET,
+                workers=env_int("PROVIDER_PROCESS_WORKERS", 0),
+                timeout_s=env_float("PROVIDER_PROCESS_TIMEOUT_S", 300.0, minimum=0.001),
+                memory_mb=env_int("PROVIDER_PROCESS_MEMORY_MB", 0),
+                max_tasks=env_int("PROVIDER_PROCESS_MAX_TASKS", 0),
+            )
+        return _process_pool
+
+
+def runtime_stats() -> Dict[str, Any]:
+    with _process_pool_lock:
+        pool = _process_pool
+    return {"runtime": provider_runtime(), "process_pool": pool.stats() if pool is not None else None}
+
+
+_sync_pool: Optional[ThreadPoolExecutor] = None
+_sync_pool_lock = threading.Lock()
+
+
+def _get_sync_pool() -> ThreadPoolExecutor:
+    """
+    Dedicated bounded pool for sync adapters called from the event loop, so a slow
+    sync provider cannot exhaust the loop's default executor (used for DB work).
+    PROVIDER_SYNC_WORKERS: pool size (default 32).
+    """
+    global _sync_pool
+    with _sync_pool_lock:
+        if _sync_pool is None:
+            _sync_pool = ThreadPoolExecutor(max_workers=env_int("PROVIDER_SYNC_WORKERS", 32, minimum=1),
+                                            thread_name_prefix="provider-sync")
+        return _sync_pool
+
+
+async def execute_provider(
+    provider: Union[ProviderAdapter, AsyncProviderAdapter],
+    *,
+    run_id: str,
+    input: Dict[str, Any],
+    request_id: str,
+) -> ProviderResult:
+    """
+    Dispatch either kind of adapter from the event loop:
+    execute_async is awaited in place; a sync execute runs on the bounded sync pool.
+    """
+    if is_async_adapter(provider):
+        return await provider.execute_async(run_id=run_id, input=input, request_id=request_id)  # type: ignore[union-attr]
+    call = functools.partial(provider.execute, run_id=run_id, input=input, request_id=request_id)  # type: ignore[union-attr]
+    return await asyncio.get_running_loop().run_in_executor(_get_sync_pool(), call)
+
+
+def execute_provider_sync(
+    provider: Union[ProviderAdapter, AsyncProviderAdapter],
+    *,
+    run_id: str,
+    input: Dict[str, Any],
+    request_id: str,
+) -> ProviderResult:
+    """Dispatch from a plain thread: sync execute directly, an async-only adapter on a private loop."""
+    execute = getattr(provider, "execute", None)
+    if callable(execute):
+        return execute(run_id=run_id, input=input, request_id=request_id)
+    return asyncio.run(provider.execute_async(run_id=run_id, input=input, request_id=request_id))  # type: ignore[union-attr]
+
+
+def shutdown_runtimes() -> None:
+    """Release the sync-adapter pool and the provider process pool (app shutdown)."""
+    global _sync_pool, _process_pool
+    with _sync_pool_lock:
+        pool, _sync_pool = _sync_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+    with _process_pool_lock:
+        procs, _process_pool = _process_pool, None
+    if procs is not None:
+        procs.shutdown()
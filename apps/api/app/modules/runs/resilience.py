@@ -0,0 +1,401 @@
+"""
+Per-provider-profile circuit breaker and hedged fallback for run execution.
+
+Breaker (RUN_BREAKER=1): each profile keeps its last `window` call outcomes. Once
+at least `min_calls` are recorded and the failure share reaches `error_rate`, the
+circuit opens for `open_s`; a call slower than `slow_call_ms` counts as a failure.
+While open, runs skip the profile without calling it, so they fail fast or move
+to a fallback profile. When `open_s` has passed, up to `half_open_probes` calls
+probe the profile: a success closes the circuit, a failure re-opens it.
+
+Hedging (RUN_HEDGE=1): when a call is still running after the profile's
+`percentile` latency (over its recent successful calls, needs `min_samples`; or a
+fixed `after_ms`), the same job is started on a secondary profile and the first
+success wins. The losing call is cancelled in the async runtime (no outcome is
+recorded for it; a half-open probe slot it held is given back); a sync call
+cannot be interrupted, so it runs to the end and its result is discarded.
+
+Secondary profiles come from service.provider_fallback_chain (the global-default /
+latest-usable tiers of resolve_provider_profile). The profile that produced the
+result is recorded in the final event's result_refs.profile.
+
+Settings: env defaults, overridden per profile by config_json "breaker" / "hedge"
+(copied into the run's profile snapshot).
+- RUN_BREAKER_ERROR_RATE (0.5), RUN_BREAKER_MIN_CALLS (10), RUN_BREAKER_WINDOW (50),
+  RUN_BREAKER_OPEN_S (30), RUN_BREAKER_SLOW_CALL_MS (0 = off), RUN_BREAKER_HALF_OPEN_PROBES (1)
+- RUN_HEDGE_PERCENTILE (95), RUN_HEDGE_MIN_SAMPLES (20), RUN_HEDGE_AFTER_MS (0 = use percentile)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.env import env_float, env_int
+
+from .providers import ProviderResult
+
+Profile = Dict[str, Any]  # {resolved_id, snapshot}
+Used = Dict[str, Any]
+
+
+class CircuitOpenError(RuntimeError):
+    """No profile with a closed (or probing) circuit is available for the run."""
+
+
+def _flag(name: str) -> bool:
+    return (os.getenv(name) or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def breaker_enabled() -> bool:
+    return _flag("RUN_BREAKER")
+
+
+def hedge_enabled() -> bool:
+    return _flag("RUN_HEDGE")
+
+
+def enabled() -> bool:
+    return breaker_enabled() or hedge_enabled()
+
+
+def _override(cfg: Any, raw: Any) -> Any:
+    """cfg with the numeric fields present (and valid) in raw replaced."""
+    if not isinstance(raw, dict):
+        return cfg
+    vals = {}
+    for f in fields(cfg):
+        try:
+            if f.name in raw:
+                vals[f.name] = type(getattr(cfg, f.name))(raw[f.name])
+        except (TypeError, ValueError):
+            pass
+    return type(cfg)(**{**cfg.__dict__, **vals})
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    error_rate: float = 0.5
+    min_calls: int = 10
+    window: int = 50
+    open_s: float = 30.0
+    slow_call_ms: float = 0.0
+    half_open_probes: int = 1
+
+    @classmethod
+    def for_snapshot(cls, snap: Dict[str, Any]) -> "BreakerConfig":
+        base = cls(
+            error_rate=env_float("RUN_BREAKER_ERROR_RATE", 0.5),
+            min_calls=env_int("RUN_BREAKER_MIN_CALLS", 10, minimum=1),
+            window=env_int("RUN_BREAKER_WINDOW", 50, minimum=1),
+            open_s=env_float("RUN_BREAKER_OPEN_S", 30.0, minimum=0.0),
+            slow_call_ms=env_float("RUN_BREAKER_SLOW_CALL_MS", 0.0, minimum=0.0),
+            half_open_probes=env_int("RUN_BREAKER_HALF_OPEN_PROBES", 1, minimum=1),
+        )
+        return _override(base, snap.get("breaker"))
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    percentile: float = 95.0
+    min_samples: int = 20
+    after_ms: float = 0.0
+
+    @classmethod
+    def for_snapshot(cls, snap: Dict[str, Any]) -> "HedgeConfig":
+        base = cls(
+            percentile=env_float("RUN_HEDGE_PERCENTILE", 95.0, minimum=0.0),
+            min_samples=env_int("RUN_HEDGE_MIN_SAMPLES", 20, minimum=1),
+            after_ms=env_float("RUN_HEDGE_AFTER_MS", 0.0, minimum=0.0),
+        )
+        return _override(base, snap.get("hedge"))
+
+
+class CircuitBreaker:
+    def __init__(self, config: BreakerConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=max(config.window, 1))
+        self._latencies: Deque[float] = deque(maxlen=200)  # successful calls, ms
+        self.state = "closed"
+        self._open_until = 0.0
+        self._probes = 0
+        self.opened = 0
+
+    def configure(self, config: BreakerConfig) -> None:
+        with self._lock:
+            if config != self.config:
+                self.config = config
+                self._outcomes = deque(self._outcomes, maxlen=max(config.window, 1))
+
+    def allow(self) -> bool:
+        """True if a call may go to this profile now (takes a probe slot when half-open)."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() < self._open_until:
+                    return False
+                self.state, self._probes = "half_open", 0
+            if self.state == "half_open":
+                if self._probes >= max(self.config.half_open_probes, 1):
+                    return False
+                self._probes += 1
+            return True
+
+    def release_probe(self) -> None:
+        """Give back the probe slot of a call that ended without an outcome (cancelled hedge loser)."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probes = max(self._probes - 1, 0)
+
+    def record(self, ok: bool, latency_ms: float) -> None:
+        cfg = self.config
+        if ok and cfg.slow_call_ms > 0 and latency_ms > cfg.slow_call_ms:
+            ok = False
+        with self._lock:
+            if ok:
+                self._latencies.append(latency_ms)
+            if self.state == "half_open":
+                self._probes = max(self._probes - 1, 0)
+                if ok:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(ok)
+            n = len(self._outcomes)
+            if self.state == "closed" and n >= max(cfg.min_calls, 1):
+                if self._outcomes.count(False) / n >= cfg.error_rate:
+                    self._trip()
+
+    def _trip(self) -> None:
+        self.state = "open"
+        self._open_until = time.monotonic() + self.config.open_s
+        self._outcomes.clear()
+        self.opened += 1
+
+    def latency_quantile(self, pct: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < max(min_samples, 1):
+                return None
+            xs = sorted(self._latencies)
+        return xs[min(int(len(xs) * pct / 100.0), len(xs) - 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": n,
+                "failure_rate": round(self._outcomes.count(False) / n, 3) if n else 0.0,
+                "opened": self.opened,
+                "open_for_s": round(max(self._open_until - time.monotonic(), 0.0), 1) if self.state == "open" else 0.0,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(profile: Profile) -> CircuitBreaker:
+    """Process-wide breaker of a profile, (re)configured from its snapshot."""
+    pid = str(profile.get("resolved_id") or "")
+    cfg = BreakerConfig.for_snapshot(profile.get("snapshot") or {})
+    with _breakers_lock:
+        b = _breakers.get(pid)
+        if b is None:
+            b = _breakers[pid] = CircuitBreaker(cfg)
+            return b
+    b.configure(cfg)
+    return b
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        items = list(_breakers.items())
+    return {pid: b.stats() for pid, b in items}
+
+
+def _primary(job_input: Dict[str, Any]) -> Profile:
+    ev = job_input.get("evidence") or {}
+    snap = ev.get("provider_profile_snapshot") or {}
+    return {"resolved_id": str(ev.get("resolved_provider_profile_id") or snap.get("id") or ""), "snapshot": snap}
+
+
+def _input_for(job_input: Dict[str, Any], profile: Profile) -> Dict[str, Any]:
+    ev = dict(job_input.get("evidence") or {})
+    ev["resolved_provider_profile_id"] = profile["resolved_id"]
+    ev["provider_profile_snapshot"] = profile["snapshot"]
+    return {**job_input, "evidence": ev}
+
+
+class _Plan:
+    """Chooses the profile(s) for one run; fallbacks are loaded only when needed."""
+
+    def __init__(self, job_input: Dict[str, Any], fallbacks: Callable[[str], List[Profile]]) -> None:
+        self.input = job_input
+        self.primary = _primary(job_input)
+        self._fallbacks = fallbacks
+        self._chain: Optional[List[Profile]] = None
+
+    def chain(self) -> List[Profile]:
+        if self._chain is None:
+            self._chain = self._fallbacks(self.primary["resolved_id"]) if self.primary["resolved_id"] else []
+        return self._chain
+
+    def _admit(self, p: Profile) -> bool:
+        return not breaker_enabled() or breaker_for(p).allow()
+
+    def first(self) -> Profile:
+        if self._admit(self.primary):
+            return self.primary
+        for p in self.chain():
+            if self._admit(p):
+                return p
+        raise CircuitOpenError(f"circuit open for provider profile {self.primary['resolved_id']}")
+
+    def secondary(self, chosen: Profile) -> Optional[Profile]:
+        for p in [self.primary] + self.chain():
+            if p["resolved_id"] != chosen["resolved_id"] and self._admit(p):
+                return p
+        return None
+
+    def hedge_after_s(self, p: Profile) -> Optional[float]:
+        if not hedge_enabled():
+            return None
+        cfg = HedgeConfig.for_snapshot(p.get("snapshot") or {})
+        if cfg.after_ms > 0:
+            return cfg.after_ms / 1000.0
+        q = breaker_for(p).latency_quantile(cfg.percentile, cfg.min_samples)
+        return q / 1000.0 if q is not None else None
+
+    def used(self, p: Profile, hedged: bool) -> Used:
+        primary_id = self.primary["resolved_id"]
+        return {
+            "provider_profile_id": p["resolved_id"],
+            "fallback_from": primary_id if p["resolved_id"] != primary_id else None,
+            "hedged": hedged,
+        }
+
+    def record(self, p: Profile, ok: bool, t0: float) -> None:
+        # latencies feed the hedge percentile even with the breaker off
+        breaker_for(p).record(ok, (time.monotonic() - t0) * 1000.0)
+
+    def cancelled(self, p: Profile) -> None:
+        # a cancelled call says nothing about the profile; only free its probe slot
+        breaker_for(p).release_probe()
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=env_int("RUN_HEDGE_WORKERS", 32, minimum=2),
+                                             thread_name_prefix="run-hedge")
+        return _hedge_pool
+
+
+def call_with_policy(
+    call: Callable[[Dict[str, Any]], ProviderResult],
+    job_input: Dict[str, Any],
+    fallbacks: Callable[[str], List[Profile]],
+) -> Tuple[ProviderResult, Used]:
+    """
+    Run call(input) under breaker / hedging. Returns (result, profile used);
+    raises the provider error, or CircuitOpenError when every candidate is open.
+    """
+    plan = _Plan(job_input, fallbacks)
+    chosen = plan.first()
+
+    def attempt(p: Profile) -> ProviderResult:
+        t0 = time.monotonic()
+        try:
+            res = call(_input_for(job_input, p))
+        except Exception:
+            plan.record(p, False, t0)
+            raise
+        plan.record(p, True, t0)
+        return res
+
+    after = plan.hedge_after_s(chosen)
+    if after is None:
+        return attempt(chosen), plan.used(chosen, False)
+
+    pool = _get_hedge_pool()
+    first = pool.submit(attempt, chosen)
+    done, _ = wait([first], timeout=after)
+    second_p = None if done else plan.secondary(chosen)
+    if second_p is None:
+        return first.result(), plan.used(chosen, False)
+
+    futures = {first: chosen, pool.submit(attempt, second_p): second_p}
+    last: Optional[BaseException] = None
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            try:
+                return f.result(), plan.used(futures[f], True)
+            except Exception as e:
+                last = e
+    assert last is not None
+    raise last
+
+
+async def call_with_policy_async(
+    call: Callable[[Dict[str, Any]], Awaitable[ProviderResult]],
+    job_input: Dict[str, Any],
+    fallbacks: Callable[[str], List[Profile]],
+) -> Tuple[ProviderResult, Used]:
+    """call_with_policy for the event-loop runtime (fallback lookup runs in a thread)."""
+    plan = _Plan(job_input, fallbacks)
+    chosen = await asyncio.to_thread(plan.first)
+
+    async def attempt(p: Profile) -> ProviderResult:
+        t0 = time.monotonic()
+        try:
+            res = await call(_input_for(job_input, p))
+        except asyncio.CancelledError:
+            plan.cancelled(p)
+            raise
+        except Exception:
+            plan.record(p, False, t0)
+            raise
+        plan.record(p, True, t0)
+        return res
+
+    after = plan.hedge_after_s(chosen)
+    if after is None:
+        return await attempt(chosen), plan.used(chosen, False)
+
+    first = asyncio.ensure_future(attempt(chosen))
+    done, _ = await asyncio.wait({first}, timeout=after)
+    second_p = None if done else await asyncio.to_thread(plan.secondary, chosen)
+    if second_p is None:
+        return await first, plan.used(chosen, False)
+
+    tasks = {first: chosen, asyncio.ensure_future(attempt(second_p)): second_p}
+    last: Optional[BaseException] = None
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                try:
+                    return t.result(), plan.used(tasks[t], True)
+                except Exception as e:
+                    last = e
+    finally:
+        for t in pending:
+            t.cancel()
+    assert last is not None
+    raise last
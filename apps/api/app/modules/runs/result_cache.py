@@ -0,0 +1,168 @@
+"""
+Provider result memoization (opt-in): identical runs reuse an earlier artifact.
+
+Key: sha256 over the provider name, run_type, the prompt pack digest (same
+canonical payload as prompt_packs.digest), the resolved provider profile
+snapshot, the resolved characters and the run inputs. Only runs whose inputs
+carry a `seed` are cached: without one a provider is free to return a different
+result, so re-executing is the correct behaviour. A run a fallback profile
+served (resilience.py) is not stored: its key names the primary profile.
+
+On a hit execute_run skips the provider and appends `succeeded` pointing at the
+cached storage refs / asset, with result_refs.cache = {hit, key, source_run_id}.
+Entries whose asset was trashed or purged are dropped and treated as a miss.
+
+Env:
+- RUN_RESULT_CACHE: 1 to enable (default off)
+- RUN_RESULT_CACHE_TTL_S: entry lifetime (default 604800 = 7 days)
+- RUN_RESULT_CACHE_MAX_ENTRIES: least recently used entries beyond this are evicted (default 10000)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core import schema
+from app.core.clock import utc_iso
+from app.core.db import connect
+from app.core.env import env_int
+
+_DDL: Dict[str, str] = {
+    "run_result_cache": """
+        CREATE TABLE IF NOT EXISTS run_result_cache (
+            cache_key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            source_run_id TEXT NOT NULL,
+            storage_refs_json TEXT NOT NULL,
+            asset_ids_json TEXT NOT NULL,
+            details_json TEXT,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_used_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        );
+        """,
+    "ix_run_result_cache_last_used_at": "CREATE INDEX IF NOT EXISTS ix_run_result_cache_last_used_at ON run_result_cache (last_used_at);",
+    "ix_run_result_cache_expires_at": "CREATE INDEX IF NOT EXISTS ix_run_result_cache_expires_at ON run_result_cache (expires_at);",
+}
+
+_EVICT_EVERY_S = 60.0
+_evict_lock = threading.Lock()
+_last_evict = 0.0
+
+
+def enabled() -> bool:
+    return (os.getenv("RUN_RESULT_CACHE") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _canonical(v: Any) -> str:
+    return json.dumps(v, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def cache_key(provider_name: str, job_input: Dict[str, Any]) -> Optional[str]:
+    """None when the run is not cacheable (cache off, no seed, forced failure)."""
+    if not enabled() or job_input.get("__force_fail__"):
+        return None
+    inputs = job_input.get("inputs") or {}
+    if not isinstance(inputs, dict) or inputs.get("seed") is None:
+        return None
+    run_type = job_input.get("run_type")
+    pack = dict(job_input.get("prompt_pack") or {})
+    pack["run_type"] = run_type
+    evidence = job_input.get("evidence") or {}
+    material = {
+        "provider": provider_name,
+        "run_type": run_type,
+        "prompt_pack_digest": hashlib.sha256(_canonical(pack).encode("utf-8")).hexdigest(),
+        "provider_profile_snapshot": evidence.get("provider_profile_snapshot") or {},
+        "characters": evidence.get("characters") or [],
+        "inputs": inputs,
+    }
+    return hashlib.sha256(_canonical(material).encode("utf-8")).hexdigest()
+
+
+def _asset_live(conn: sqlite3.Connection, asset_id: str) -> bool:
+    if not schema.table_exists(conn, "assets"):
+        return False
+    pk = schema.primary_key(conn, "assets") or "id"
+    live = " AND deleted_at IS NULL" if "deleted_at" in schema.columns(conn, "assets") else ""
+    return conn.execute(f"SELECT 1 FROM assets WHERE {pk}=?{live} LIMIT 1;", (asset_id,)).fetchone() is not None
+
+
+def lookup(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Live entry for key -> {storage_refs, asset_ids, details, source_run_id}, counting the hit.
+    Expired entries and entries whose asset is gone are deleted and reported as a miss.
+    """
+    now = utc_iso()
+    conn = connect()
+    try:
+        schema.ensure_objects(conn, _DDL)
+        row = conn.execute("SELECT * FROM run_result_cache WHERE cache_key=?;", (key,)).fetchone()
+        if row is None:
+            return None
+        asset_ids: List[str] = json.loads(row["asset_ids_json"] or "[]")
+        if str(row["expires_at"]) < now or not all(_asset_live(conn, a) for a in asset_ids):
+            conn.execute("DELETE FROM run_result_cache WHERE cache_key=?;", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE run_result_cache SET hits=hits+1, last_used_at=? WHERE cache_key=?;", (now, key))
+        conn.commit()
+        return {
+            "storage_refs": json.loads(row["storage_refs_json"] or "[]"),
+            "asset_ids": asset_ids,
+            "details": json.loads(row["details_json"]) if row["details_json"] else None,
+            "source_run_id": str(row["source_run_id"]),
+        }
+    finally:
+        conn.close()
+
+
+def store(key: str, *, provider: str, source_run_id: str, storage_refs: List[str], asset_ids: List[str],
+          details: Optional[Dict[str, Any]] = None) -> None:
+    """Record a succeeded run's artifacts under key (first writer wins)."""
+    now_dt = datetime.now(timezone.utc)
+    now = utc_iso(now_dt)
+    expires = utc_iso(now_dt + timedelta(seconds=env_int("RUN_RESULT_CACHE_TTL_S", 604800, minimum=1)))
+    conn = connect()
+    try:
+        schema.ensure_objects(conn, _DDL)
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO run_result_cache
+                (cache_key, provider, source_run_id, storage_refs_json, asset_ids_json, details_json,
+                 hits, created_at, last_used_at, expires_at)
+            VALUES (?,?,?,?,?,?,0,?,?,?);
+            """,
+            (key, provider, source_run_id, json.dumps(storage_refs), json.dumps(asset_ids),
+             json.dumps(details, ensure_ascii=False) if details else None, now, now, expires),
+        )
+        conn.commit()
+        _maybe_evict(conn, now)
+    finally:
+        conn.close()
+
+
+def _maybe_evict(conn: sqlite3.Connection, now: str) -> None:
+    """Drop expired entries, then least recently used ones beyond MAX_ENTRIES (throttled)."""
+    global _last_evict
+    with _evict_lock:
+        if time.monotonic() - _last_evict < _EVICT_EVERY_S:
+            return
+        _last_evict = time.monotonic()
+    conn.execute("DELETE FROM run_result_cache WHERE expires_at < ?;", (now,))
+    n = int(conn.execute("SELECT COUNT(*) FROM run_result_cache;").fetchone()[0])
+    over = n - env_int("RUN_RESULT_CACHE_MAX_ENTRIES", 10000, minimum=1)
+    if over > 0:
+        conn.execute(
+            "DELETE FROM run_result_cache WHERE cache_key IN "
+            "(SELECT cache_key FROM run_result_cache ORDER BY last_used_at ASC LIMIT ?);",
+            (over,),
+        )
+    conn.commit()
@@ -1,23 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from .schemas import RunCreateIn, RunCreateOut, RunGetOut
+from app.core.db import connect as _connect
+from app.core.env import env_float, env_int
+from app.core.idempotency import idempotent
+from app.core.timing import StageTimer, header_enabled
+
+from .events import TERMINAL_STATUSES, Subscription, get_event_bus
+
+from .executor import (
+    RunJob,
+    execute_run,
+    executor_mode,
+    queue_max,
+    queue_stats,
+    run_sweep_inline,
+    submit_runs,
+    submit_sweep_runs,
+    sweep_fanout_default,
+)
+from .schemas import RunBatchIn, RunBatchItemOut, RunBatchOut, RunCreateIn, RunCreateOut, RunGetOut
 from .service import (
     append_run_event as _append_run_event,
     create_run_v11 as _create_run_v11,
-    get_prompt_pack_payload,
+    create_runs_batch as _create_runs_batch,
     get_run as _get_run,
-    link_produced_asset,
+    get_run_status_snapshot as _get_run_status_snapshot,
+    sweep_child_evidence as _sweep_child_evidence,
 )
-from .providers import get_provider
 
 router = APIRouter(tags=["runs"])
 
+# service ValueError -> (http status, DoD error code)
+_CREATE_ERRORS: Dict[str, Tuple[int, str]] = {
+    "provider_profile_not_found": (404, "provider_profile_not_found"),
+    "provider_profile_deleted": (409, "provider_profile_deleted"),
+    "provider_profile_required": (400, "provider_profile_required"),
+    "character_not_found": (404, "character_not_found"),
+    "active_ref_set_missing": (400, "active_ref_set_missing"),
+    "ref_set_not_found": (404, "ref_set_not_found"),
+    "invalid_ref_set_owner": (400, "invalid_ref_set_owner"),
+    "ref_set_not_confirmed": (400, "ref_set_not_confirmed"),
+}
+
 
 def _parse_bool(v: str) -> bool:
     vv = (v or "").strip().lower()
@@ -38,21 +72,86 @@ def _provider_enabled(request: Request) -> bool:
     return _parse_bool(os.getenv("PROVIDER_ENABLED", ""))
 
 
-@router.post("/runs", response_model=RunCreateOut)
-def create_run(payload: RunCreateIn, request: Request) -> Any:
-    rid = _request_id(request)
+def _batch_max() -> int:
+    return env_int("RUN_BATCH_MAX", 500, minimum=1)
+
+
+def _sweep_max() -> int:
+    return env_int("RUN_SWEEP_MAX", 64, minimum=1)
+
+
+def _events_max_ids() -> int:
+    return env_int("RUN_EVENTS_MAX_IDS", 100, minimum=1)
+
+
+def _events_heartbeat_s() -> float:
+    return env_float("RUN_EVENTS_HEARTBEAT_S", 15.0, minimum=0.05)
+
 
+def _events_poll_s() -> float:
+    return env_float("RUN_EVENTS_POLL_S", 1.0, minimum=0.05)
+
+
+def _primary_error(chars_in: List[Dict[str, Any]]) -> Optional[str]:
     # ---- 2C.2 invariants: primary exactly 1 if characters provided
-    chars_in = [c.model_dump() for c in (payload.characters or [])]
     if chars_in:
         prim = [c for c in chars_in if c.get("is_primary") is True]
         if len(prim) == 0:
-            raise HTTPException(status_code=400, detail="primary_character_required")
+            return "primary_character_required"
         if len(prim) > 1:
-            raise HTTPException(status_code=400, detail="multiple_primary_characters")
+            return "multiple_primary_characters"
+    return None
+
+
+def _job_input(payload: RunCreateIn, pp: Dict[str, Any], evidence: Dict[str, Any], request: Request) -> Dict[str, Any]:
+    inp: Dict[str, Any] = {}
+    inp["run_type"] = payload.run_type
+    inp["prompt_pack"] = pp
+    inp["evidence"] = evidence
+    inp["inputs"] = payload.inputs or {}
+
+    # gate hook: force fail
+    if request.headers.get("x-provider-force-fail") is not None and _parse_bool(request.headers.get("x-provider-force-fail") or ""):
+        inp["__force_fail__"] = True
+    return inp
+
+
+@router.post("/runs", response_model=RunCreateOut, response_model_exclude_none=True)
+@idempotent("runs.create", exclude_none=True, headers=("X-Provider-Enabled", "X-Provider-Force-Fail"))
+def create_run(payload: RunCreateIn, request: Request, response: Response) -> Any:
+    """
+    Staged on one pooled connection: validate -> resolve -> insert (one transaction)
+    -> submit (queue) | running, provider (inline; outside any transaction), record
+    (asset + link + final event in one transaction). Stage durations go to the
+    runs.create.timing log line and the Server-Timing header.
+    """
+    rid = _request_id(request)
+    timer = StageTimer()
+    conn = _connect()
+    try:
+        out = _create_run_staged(payload, request, conn, timer)
+    finally:
+        conn.close()
+        timer.emit("runs.create.timing", rid, __name__)
+    if header_enabled():
+        (out if isinstance(out, Response) else response).headers["Server-Timing"] = timer.header()
+    return out
+
 
-    # ---- 2C.3 PromptPack lock is already validated by Pydantic
-    pp = payload.prompt_pack.model_dump()
+def _create_run_staged(payload: RunCreateIn, request: Request, conn: Any, timer: StageTimer) -> Any:
+    rid = _request_id(request)
+
+    with timer.stage("validate"):
+        chars_in = [c.model_dump() for c in (payload.characters or [])]
+        prim_err = _primary_error(chars_in)
+        if prim_err:
+            raise HTTPException(status_code=400, detail=prim_err)
+        if payload.variations is not None and len(payload.variations) > _sweep_max():
+            raise HTTPException(status_code=400, detail="too_many_variations")
+        fanout = payload.fanout or sweep_fanout_default()
+
+        # ---- 2C.3 PromptPack lock is already validated by Pydantic
+        pp = payload.prompt_pack.model_dump()
 
     try:
         run_id, prompt_pack_id, status0, evidence = _create_run_v11(
@@ -61,96 +160,350 @@ def create_run(payload: RunCreateIn, request: Request) -> Any:
             override_provider_profile_id=payload.override_provider_profile_id,
             characters=chars_in,
             inputs=payload.inputs or {},
+            variations=payload.variations,
+            fanout=fanout,
+            conn=conn,
+            timer=timer,
         )
     except ValueError as e:
         msg = str(e)
         # map to DoD errors (simple string codes)
-        code_map = {
-            "provider_profile_not_found": (404, "provider_profile_not_found"),
-            "provider_profile_deleted": (409, "provider_profile_deleted"),
-            "provider_profile_required": (400, "provider_profile_required"),
-            "character_not_found": (404, "character_not_found"),
-            "active_ref_set_missing": (400, "active_ref_set_missing"),
-            "ref_set_not_found": (404, "ref_set_not_found"),
-            "invalid_ref_set_owner": (400, "invalid_ref_set_owner"),
-            "ref_set_not_confirmed": (400, "ref_set_not_confirmed"),
-        }
-        st, detail = code_map.get(msg, (400, msg or "bad_request"))
+        st, detail = _CREATE_ERRORS.get(msg, (400, msg or "bad_request"))
         raise HTTPException(status_code=st, detail=detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"internal_error: {e}")
 
+    if payload.variations is not None:
+        with timer.stage("submit"):
+            return _start_sweep(payload, pp, run_id, prompt_pack_id, status0, evidence, fanout, request)
+
     # flag OFF -> legacy stub behavior
     if not _provider_enabled(request):
         return RunCreateOut(run_id=run_id, prompt_pack_id=prompt_pack_id, status=status0)
 
-    # ---- flag ON: sync execution (append-only via run_events)
-    _append_run_event(run_id, status="running", request_id=rid)
-
-    provider = get_provider()
-    inp: Dict[str, Any] = {}
-    inp["run_type"] = payload.run_type
-    inp["prompt_pack"] = pp
-    inp["evidence"] = evidence
-    inp["inputs"] = payload.inputs or {}
+    # ---- flag ON: provider execution (append-only via run_events)
+    job = RunJob(run_id=run_id, input=_job_input(payload, pp, evidence, request), request_id=rid)
 
-    # gate hook: force fail
-    if request.headers.get("x-provider-force-fail") is not None and _parse_bool(request.headers.get("x-provider-force-fail") or ""):
-        inp["__force_fail__"] = True
+    # queue (default) / workers: return immediately; a worker records running -> succeeded/failed
+    if executor_mode() != "inline":
+        with timer.stage("submit"):
+            accepted = submit_runs([job], conn)[0]
+            if not accepted:
+                _append_run_event(run_id, status="failed", result_refs={"asset_ids": [], "error": "run_queue_full"},
+                                  request_id=rid, conn=conn)
+        if not accepted:
+            body = {
+                "error": "run_queue_full",
+                "message": "run execution queue is full",
+                "request_id": rid,
+                "details": {"run_id": run_id, "queue_max": queue_max()},
+            }
+            return JSONResponse(status_code=503, content=body)
+        return RunCreateOut(run_id=run_id, prompt_pack_id=prompt_pack_id, status=status0)
 
+    # inline (rollback): execute inside the request thread, on the request's connection
     try:
-        res = provider.execute(run_id=run_id, input=inp, request_id=rid)
-
-        # provider result refs: start with provider-returned refs
-        rr: Dict[str, Any] = {
-            "asset_ids": [],
-            "provider": getattr(provider, "name", "unknown"),
-            "storage_refs": list(res.result_refs or []),
+        outcome = execute_run(job, conn=conn, timer=timer)
+        return RunCreateOut(run_id=run_id, prompt_pack_id=prompt_pack_id, status=outcome.status)
+    except Exception as e:
+        body = {
+            "error": "internal_error",
+            "message": "provider execution failed",
+            "request_id": rid,
+            "details": {"type": type(e).__name__, "msg": str(e), "run_id": run_id},
         }
-        if res.details:
-            rr["details"] = res.details
+        return JSONResponse(status_code=500, content=body)
+
+
+def _start_sweep(
+    payload: RunCreateIn,
+    pp: Dict[str, Any],
+    run_id: str,
+    prompt_pack_id: str,
+    status0: str,
+    evidence: Dict[str, Any],
+    fanout: int,
+    request: Request,
+) -> RunCreateOut:
+    """Children go through the executor (queue), run_leases (workers) or a bounded pool (inline), `fanout` at a time."""
+    rid = _request_id(request)
+    child_ids: List[str] = list(evidence["sweep"]["child_run_ids"])
+    out = RunCreateOut(run_id=run_id, prompt_pack_id=prompt_pack_id, status=status0, child_run_ids=child_ids)
+    if not _provider_enabled(request):
+        return out
+
+    base = _job_input(payload, pp, evidence, request)
+    jobs = []
+    for k, (child_id, variation) in enumerate(zip(child_ids, payload.variations or [])):
+        child_ev = _sweep_child_evidence(evidence, k, variation)
+        jobs.append(RunJob(run_id=child_id, input=dict(base, evidence=child_ev, inputs=child_ev["inputs"]), request_id=rid))
+
+    if executor_mode() != "inline":
+        submit_sweep_runs(jobs, fanout, run_id)
+        return out
+    run_sweep_inline(jobs, fanout)
+    r = _get_run(run_id)
+    out.status = (r or {}).get("status") or status0
+    return out
+
 
-        # assetize first storage ref (best-effort)
-        asset_id = None
-        if rr["storage_refs"]:
+@router.post("/runs:batch", response_model=RunBatchOut)
+def create_runs_batch(payload: RunBatchIn, request: Request) -> Any:
+    """
+    Many POST /runs in one request and one transaction (see service.create_runs_batch).
+    Per-item results keep request order; a rejected item does not affect the others.
+    RUN_BATCH_MAX caps the item count (default 500).
+    """
+    rid = _request_id(request)
+    if len(payload.items) > _batch_max():
+        raise HTTPException(status_code=400, detail="batch_too_large")
+
+    out: List[RunBatchItemOut] = [RunBatchItemOut(index=i) for i in range(len(payload.items))]
+    accepted: List[int] = []
+    for i, item in enumerate(payload.items):
+        prim_err = _primary_error([c.model_dump() for c in (item.characters or [])])
+        if item.variations is not None:
+            # sweeps fan out on their own; submit them through POST /runs
+            prim_err = prim_err or "variations_not_supported_in_batch"
+        if prim_err:
+            out[i].error, out[i].http_status = prim_err, 400
+        else:
+            accepted.append(i)
+
+    pps = {i: payload.items[i].prompt_pack.model_dump() for i in accepted}
+    try:
+        created = _create_runs_batch([
+            {
+                "run_type": payload.items[i].run_type,
+                "prompt_pack": pps[i],
+                "override_provider_profile_id": payload.items[i].override_provider_profile_id,
+                "characters": [c.model_dump() for c in (payload.items[i].characters or [])],
+                "inputs": payload.items[i].inputs or {},
+            }
+            for i in accepted
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"internal_error: {e}")
+
+    provider_on = _provider_enabled(request)
+    inline = executor_mode() == "inline"
+    queued: List[Tuple[int, RunJob]] = []
+    for i, res in zip(accepted, created):
+        if res.get("error"):
+            st, code = _CREATE_ERRORS.get(res["error"], (400, res["error"]))
+            out[i].error, out[i].http_status = code, st
+            continue
+        out[i].run_id, out[i].prompt_pack_id, out[i].status = res["run_id"], res["prompt_pack_id"], res["status"]
+        out[i].warning = res.get("warning")
+        if not provider_on:
+            continue
+        job = RunJob(run_id=res["run_id"], input=_job_input(payload.items[i], pps[i], res["evidence"], request), request_id=rid)
+        if inline:
             try:
-                from .service import _connect, _create_asset_from_storage_ref  # local import to avoid API surface changes
-                conn = _connect()
-                try:
-                    asset_id = _create_asset_from_storage_ref(conn, storage_ref=rr["storage_refs"][0], request_id=rid)
-                    if asset_id:
-                        rr["asset_ids"] = [asset_id]
-                        conn.commit()
-                finally:
-                    conn.close()
+                out[i].status = execute_run(job).status
             except Exception:
-                asset_id = None
+                out[i].status = "failed"
+        else:
+            queued.append((i, job))
+
+    # one submit for the whole batch (workers mode: one run_leases transaction)
+    for (i, job), ok in zip(queued, submit_runs([job for _, job in queued])):
+        if not ok:
+            _append_run_event(job.run_id, status="failed", result_refs={"asset_ids": [], "error": "run_queue_full"}, request_id=rid)
+            out[i].status, out[i].error, out[i].http_status = "failed", "run_queue_full", 503
+
+    n_created = sum(1 for o in out if o.run_id)
+    return RunBatchOut(items=out, created=n_created, rejected=len(out) - n_created)
+
+
+def _polled_events(run_ids: List[str]) -> List[Dict[str, Any]]:
+    """Current status of run_ids as event payloads (one per run; intermediate transitions are collapsed)."""
+    snapshot = _get_run_status_snapshot(run_ids)
+    return [
+        {"run_id": rid, "seq": cur["seq"], "status": cur["status"], "result_refs": cur["result_refs"]}
+        for rid, cur in snapshot.items()
+    ]
+
 
-        final_status = res.status or "succeeded"
-        _append_run_event(run_id, status=final_status, result_refs=rr, request_id=rid)
+def _sse_frame(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-        # produced_asset link
-        if asset_id:
+
+def _sweep_children(snapshot: Dict[str, Dict[str, Any]], run_ids: List[str]) -> Dict[str, List[str]]:
+    """{sweep parent id: child_run_ids} for the sweep parents among run_ids."""
+    return {
+        rid: [str(c) for c in ((snapshot[rid]["result_refs"].get("sweep") or {}).get("child_run_ids") or [])]
+        for rid in run_ids
+        if snapshot[rid]["sweep"]
+    }
+
+
+def _sweep_frame(rid: str, cur: Dict[str, Any]) -> Dict[str, Any]:
+    return {"run_id": rid, "seq": cur["seq"], "status": cur["status"], "result_refs": cur["result_refs"], "sweep": True}
+
+
+async def _run_event_stream(request: Request, sub: Subscription, snapshot: Dict[str, Dict[str, Any]],
+                            run_ids: List[str]) -> AsyncIterator[str]:
+    """
+    snapshot first (one frame per run), then pushed transitions until every run is
+    terminal. Events with seq <= the snapshot seq were already covered by it.
+    Sweep parents have no events of their own: sub also watches their children, and
+    each child transition re-aggregates the parent (a run_status frame with sweep=true
+    when its status or counts changed).
+    """
+    bus = get_event_bus()
+    heartbeat = _events_heartbeat_s()
+    try:
+        last: Dict[str, int] = {}
+        open_ids = set()
+        sweeps = _sweep_children(snapshot, run_ids)
+        parents: Dict[str, List[str]] = {}
+        sent_sweep: Dict[str, Any] = {}
+        for rid in run_ids:
+            cur = snapshot[rid]
+            last[rid] = int(cur["seq"])
+            data = {"run_id": rid, "seq": cur["seq"], "status": cur["status"], "result_refs": cur["result_refs"], "snapshot": True}
+            yield _sse_frame("run_status", data, f"{rid}:{cur['seq']}")
+            if cur["status"] in TERMINAL_STATUSES:
+                continue
+            if cur["sweep"]:
+                parents[rid] = sweeps[rid]
+                sent_sweep[rid] = (cur["status"], cur["result_refs"].get("sweep"))
+            else:
+                open_ids.add(rid)
+        parent_of: Dict[str, List[str]] = {}
+        for pid, children in parents.items():
+            for cid in children:
+                parent_of.setdefault(cid, []).append(pid)
+
+        # workers mode: transitions are appended by worker processes, whose events never
+        # reach this process's bus, so the projection is also polled
+        poll = _events_poll_s() if executor_mode() == "workers" else None
+        sent_at = time.monotonic()
+        while open_ids or parents:
+            if sub.overflowed and sub.queue.empty():
+                # fell too far behind: the client reconnects and gets a fresh snapshot
+                yield _sse_frame("overflow", {"run_ids": sorted(open_ids | set(parents))})
+                return
             try:
-                link_produced_asset(run_id, asset_id=asset_id, request_id=rid)
-            except Exception:
-                pass
+                evs = [await asyncio.wait_for(sub.queue.get(), timeout=poll or heartbeat)]
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                if poll is None:
+                    yield ": ping\n\n"
+                    continue
+                watched = open_ids | {c for children in parents.values() for c in children}
+                evs = await run_in_threadpool(_polled_events, sorted(watched))
+            touched = set()
+            for ev in evs:
+                rid = str(ev.get("run_id"))
+                if int(ev.get("seq") or 0) <= last.get(rid, 0):
+                    continue
+                if rid in parent_of:
+                    last[rid] = int(ev["seq"])
+                    touched.update(p for p in parent_of[rid] if p in parents)
+                if rid not in open_ids:
+                    continue
+                last[rid] = int(ev["seq"])
+                sent_at = time.monotonic()
+                yield _sse_frame("run_status", ev, f"{rid}:{ev['seq']}")
+                if ev.get("status") in TERMINAL_STATUSES:
+                    open_ids.discard(rid)
+            if touched:
+                agg = await run_in_threadpool(_get_run_status_snapshot, sorted(touched))
+                for pid in sorted(touched):
+                    cur = agg.get(pid)
+                    if cur is None:
+                        continue
+                    key = (cur["status"], cur["result_refs"].get("sweep"))
+                    if key != sent_sweep.get(pid):
+                        sent_sweep[pid] = key
+                        sent_at = time.monotonic()
+                        yield _sse_frame("run_status", _sweep_frame(pid, cur))
+                    if cur["status"] in TERMINAL_STATUSES:
+                        del parents[pid]
+            if poll is not None and time.monotonic() - sent_at >= heartbeat:
+                sent_at = time.monotonic()
+                yield ": ping\n\n"
+        yield _sse_frame("end", {"run_ids": run_ids})
+    finally:
+        bus.unsubscribe(sub)
 
-        return RunCreateOut(run_id=run_id, prompt_pack_id=prompt_pack_id, status=final_status)
-    except Exception as e:
-        rr_fail: Dict[str, Any] = {
-            "asset_ids": [],
-            "provider": getattr(provider, "name", "unknown"),
-            "error": str(e),
-        }
-        _append_run_event(run_id, status="failed", result_refs=rr_fail, request_id=rid)
+
+async def _stream_runs(request: Request, run_ids: List[str]) -> Any:
+    rid = _request_id(request)
+    bus = get_event_bus()
+    sub = bus.subscribe(run_ids, asyncio.get_running_loop())
+    if sub is None:
         body = {
-            "error": "internal_error",
-            "message": "provider execution failed",
+            "error": "too_many_subscribers",
+            "message": "run event stream capacity reached",
             "request_id": rid,
-            "details": {"type": type(e).__name__, "msg": str(e)},
+            "details": {"max_subscribers": bus.max_subscribers},
         }
-        return JSONResponse(status_code=500, content=body)
+        return JSONResponse(status_code=503, content=body)
+    # subscribe before reading: a transition committed in between is buffered, not lost
+    try:
+        snapshot = await run_in_threadpool(_get_run_status_snapshot, run_ids)
+        missing = [r for r in run_ids if r not in snapshot]
+        sweeps = {} if missing else _sweep_children(snapshot, run_ids)
+        if sweeps:
+            # same for sweep children: watch them, then re-read the parents' aggregate
+            bus.watch(sub, [c for children in sweeps.values() for c in children])
+            snapshot.update(await run_in_threadpool(_get_run_status_snapshot, list(sweeps)))
+    except Exception:
+        bus.unsubscribe(sub)
+        raise
+    if missing:
+        bus.unsubscribe(sub)
+        body = {"error": "run_not_found", "message": "run not found", "request_id": rid, "details": {"run_ids": missing}}
+        return JSONResponse(status_code=404, content=body)
+    return StreamingResponse(
+        _run_event_stream(request, sub, snapshot, run_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/runs/events")
+async def stream_runs_events(request: Request, ids: str = Query(..., description="comma-separated run ids")) -> Any:
+    """
+    Server-Sent Events for many runs on one connection (see GET /runs/{run_id}/events).
+    RUN_EVENTS_MAX_IDS caps the id count (default 100).
+    """
+    run_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not run_ids:
+        raise HTTPException(status_code=400, detail="ids_required")
+    if len(run_ids) > _events_max_ids():
+        raise HTTPException(status_code=400, detail="too_many_ids")
+    return await _stream_runs(request, run_ids)
+
+
+@router.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: str, request: Request) -> Any:
+    """
+    Server-Sent Events with the run's status transitions, pushed as they are committed.
+    Frames: `event: run_status` (snapshot first, then each transition; id is run_id:seq),
+    `: ping` heartbeats (RUN_EVENTS_HEARTBEAT_S, default 15), and `event: end` once the
+    run is terminal. A sweep parent streams its aggregate (status and result_refs.sweep
+    counts, recomputed on each child transition, sweep=true) until all children finished.
+    Transitions are fanned out in-process (runs/events.py); in workers
+    mode the status projection is also polled every RUN_EVENTS_POLL_S (default 1), so
+    transitions in between polls are collapsed into the latest one.
+    """
+    return await _stream_runs(request, [run_id])
+
+
+@router.get("/runs/queue")
+def get_run_queue() -> Any:
+    """
+    Executor state: totals plus, per provider profile lane, queued / in_flight,
+    the limits in force, oldest queued wait and recent admission waits.
+    Workers mode: run_leases depth and live / expired leases per worker process.
+    """
+    return queue_stats()
 
 
 @router.get("/runs/{run_id}", response_model=RunGetOut)
@@ -54,11 +54,42 @@ class RunCreateIn(BaseModel):
     # provider-specific opaque json
     inputs: Dict[str, Any] = Field(default_factory=dict)
 
+    # parameter sweep: one child run per variation (merged over inputs), sharing
+    # the prompt_pack; run_id is then the parent. fanout caps children running at once.
+    variations: Optional[List[Dict[str, Any]]] = Field(default=None, min_length=1)
+    fanout: Optional[int] = Field(default=None, ge=1)
+
 
 class RunCreateOut(BaseModel):
     run_id: str
     prompt_pack_id: str
     status: str
+    # sweeps only
+    child_run_ids: Optional[List[str]] = None
+
+
+class RunBatchIn(BaseModel):
+    items: List[RunCreateIn] = Field(..., min_length=1)
+
+
+class RunBatchItemOut(BaseModel):
+    index: int
+    # set when the run was created
+    run_id: Optional[str] = None
+    prompt_pack_id: Optional[str] = None
+    status: Optional[str] = None
+    # set when the item was rejected (no run_id) or its run could not be queued
+    # (run_id set, status=failed); same codes / statuses as POST /runs
+    error: Optional[str] = None
+    http_status: Optional[int] = None
+    # links_not_recorded: the run was created but its relationship links were not written
+    warning: Optional[str] = None
+
+
+class RunBatchOut(BaseModel):
+    items: List[RunBatchItemOut]
+    created: int
+    rejected: int
 
 
 class RunGetOut(BaseModel):
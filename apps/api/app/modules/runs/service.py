@@ -5,9 +5,15 @@ import os
 import sqlite3
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core import schema
+from app.core.db import connect as _connect
+from app.core.timing import StageTimer, stages
+from app.modules.provider_profiles import cache as profile_cache
+from app.modules.runs import interning
+from app.modules.runs.events import publish_run_event
 
-DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
 _CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
 
 
@@ -31,45 +37,13 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _sqlite_path_from_url(url: str) -> str:
-    if not url.startswith("sqlite:"):
-        raise ValueError(f"Only sqlite supported for now, got DATABASE_URL={url!r}")
-    if url.startswith("sqlite:////"):
-        return url[len("sqlite:////") - 1 :]  # keep leading '/'
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"Unrecognized sqlite DATABASE_URL format: {url!r}")
-
-
-def _connect() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
-    path = _sqlite_path_from_url(url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def _table_info(conn: sqlite3.Connection, table: str) -> Dict[str, Dict[str, Any]]:
-    out: Dict[str, Dict[str, Any]] = {}
-    rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
-    for r in rows:
-        out[r["name"]] = {
-            "type": (r["type"] or "").upper(),
-            "notnull": int(r["notnull"]),
-            "dflt_value": r["dflt_value"],
-            "pk": int(r["pk"]),
-        }
-    return out
+    # cached per schema_version (app.core.schema); read-only
+    return schema.table_info(conn, table)  # type: ignore[return-value]
 
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table,),
-    ).fetchone()
-    return row is not None
+    return schema.table_exists(conn, table)
 
 
 def _primary_key_name(cols: Dict[str, Dict[str, Any]]) -> Optional[str]:
@@ -145,6 +119,28 @@ def _insert(conn: sqlite3.Connection, table: str, row: Dict[str, Any]) -> str:
         return ""
 
 
+def _insert_many(conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    _insert for many rows: one executemany per distinct column set. Returns the
+    primary keys in row order; tables with an integer (autoincrement) key fall
+    back to one _insert per row, since lastrowid is per statement.
+    """
+    cols = _table_info(conn, table)
+    pk = _primary_key_name(cols)
+    if pk and "INT" in (cols.get(pk, {}).get("type") or "").upper():
+        return [_insert(conn, table, r) for r in rows]
+
+    filled = [_fill_required(cols, r) for r in rows]
+    groups: Dict[Tuple[str, ...], List[List[Any]]] = {}
+    for data in filled:
+        keys = tuple(sorted(k for k in data.keys() if k in cols))
+        groups.setdefault(keys, []).append([data[k] for k in keys])
+    for keys, values in groups.items():
+        sql = f"INSERT INTO {table} ({','.join(keys)}) VALUES ({','.join(['?'] * len(keys))});"
+        conn.executemany(sql, values)
+    return [str(d.get(pk, "")) if pk else "" for d in filled]
+
+
 def create_run(run_type: str, prompt_pack: Dict[str, Any]) -> Tuple[str, str, str]:
     """
     Append-only: creates PromptPack + Run as two INSERTs.
@@ -293,14 +289,19 @@ def get_run(run_id: str) -> Optional[Dict[str, Any]]:
                 break
 
 
-        # overlay: latest run_events (append-only transitions)
-        ev = _get_latest_run_event(conn, str(row[id_col]))
+        # overlay: current status projection (kept in step with run_events)
+        ev = _get_current_run_status(conn, str(row[id_col]))
         if ev:
             if ev.get('status'):
                 status = str(ev['status'])
             if isinstance(ev.get('result_refs'), dict):
                 result_refs = ev['result_refs']
 
+        # sweep parent: no events of its own, status aggregated from the children
+        sweep = _sweep_spec(row)
+        if sweep is not None:
+            status, result_refs = _sweep_aggregate(conn, sweep)
+
         return {
             "run_id": str(row[id_col]),
             "prompt_pack_id": prompt_pack_id,
@@ -312,26 +313,128 @@ def get_run(run_id: str) -> Optional[Dict[str, Any]]:
         conn.close()
 
 
-def _ensure_run_events_table(conn: sqlite3.Connection) -> None:
-    """
-    Append-only event log for Run status transitions & results (P1 ProviderAdapter).
-    This avoids UPDATE on runs table (runs is append-only).
-    """
-    conn.execute(
-        """
+_RUN_EVENTS_DDL: Dict[str, str] = {
+    "run_events": """
         CREATE TABLE IF NOT EXISTS run_events (
             event_id TEXT PRIMARY KEY,
             run_id TEXT NOT NULL,
             status TEXT NOT NULL,
             result_refs_json TEXT,
             request_id TEXT,
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            seq INTEGER
         );
-        """
+        """,
+    "idx_run_events_run_id_created_at": "CREATE INDEX IF NOT EXISTS idx_run_events_run_id_created_at ON run_events(run_id, created_at);",
+}
+
+# One row per run that has events: the latest event, by seq. Derived data, so it is
+# upserted (runs / run_events stay append-only) and can always be rebuilt from run_events.
+_RUN_STATUS_CURRENT_DDL: Dict[str, str] = {
+    "run_status_current": """
+        CREATE TABLE IF NOT EXISTS run_status_current (
+            run_id TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            result_refs_json TEXT,
+            event_id TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        """,
+    "idx_run_events_run_id_seq": "CREATE INDEX IF NOT EXISTS idx_run_events_run_id_seq ON run_events(run_id, seq);",
+}
+
+# legacy events have seq NULL: fall back to created_at, then the ms-ordered ULID event_id
+_RUN_STATUS_REBUILD_SQL = """
+    INSERT OR REPLACE INTO run_status_current (run_id, seq, status, result_refs_json, event_id, updated_at)
+    SELECT run_id, MAX(n, top_seq), status, result_refs_json, event_id, created_at FROM (
+        SELECT run_id, status, result_refs_json, event_id, created_at,
+               ROW_NUMBER() OVER w AS rk,
+               COUNT(*) OVER (PARTITION BY run_id) AS n,
+               COALESCE(MAX(seq) OVER (PARTITION BY run_id), 0) AS top_seq
+        FROM run_events
+        {where}
+        WINDOW w AS (PARTITION BY run_id ORDER BY COALESCE(seq, 0) DESC, created_at DESC, event_id DESC)
+    ) WHERE rk = 1;
+"""
+
+
+def _ensure_run_events_table(conn: sqlite3.Connection) -> None:
+    """
+    Append-only event log for Run status transitions & results (P1 ProviderAdapter).
+    This avoids UPDATE on runs table (runs is append-only).
+    DDL only runs while the schema catalog has not seen the table yet.
+    """
+    schema.ensure_objects(conn, _RUN_EVENTS_DDL)
+    if "seq" not in _table_info(conn, "run_events"):
+        # pre-projection databases: events appended from now on carry a seq
+        conn.execute("ALTER TABLE run_events ADD COLUMN seq INTEGER;")
+        schema.invalidate(conn)
+    fresh = not _table_exists(conn, "run_status_current")
+    schema.ensure_objects(conn, _RUN_STATUS_CURRENT_DDL)
+    if fresh:
+        rebuild_run_status_current(conn)
+        conn.commit()
+
+
+def rebuild_run_status_current(conn: sqlite3.Connection, run_ids: Optional[List[str]] = None) -> None:
+    """
+    Recompute the projection from run_events (all runs, or only run_ids).
+    Used on first creation and after rows are written to run_events directly (imports).
+    Caller owns the transaction.
+    """
+    if run_ids is None:
+        conn.execute(_RUN_STATUS_REBUILD_SQL.format(where=""))
+        return
+    for i in range(0, len(run_ids), 500):
+        chunk = run_ids[i:i + 500]
+        ph = ",".join(["?"] * len(chunk))
+        conn.execute(_RUN_STATUS_REBUILD_SQL.format(where=f"WHERE run_id IN ({ph})"), chunk)
+
+
+def _stage_run_event(
+    conn: sqlite3.Connection,
+    run_id: str,
+    *,
+    status: str,
+    result_refs: Optional[Dict[str, Any]],
+    request_id: Optional[str],
+) -> Dict[str, Any]:
+    """
+    Insert the event (next seq) and upsert run_status_current inside the caller's
+    write transaction (BEGIN IMMEDIATE, so the seq read is serialized).
+    Returns the bus payload to publish once the caller has committed.
+    """
+    event_id = new_ulid()
+    now = _now_iso()
+    rr_json = json.dumps(result_refs, ensure_ascii=False) if result_refs is not None else None
+    cur = conn.execute("SELECT seq FROM run_status_current WHERE run_id=?;", (run_id,)).fetchone()
+    if cur is not None:
+        seq = int(cur[0]) + 1
+    else:
+        seq = int(conn.execute("SELECT COUNT(*) FROM run_events WHERE run_id=?;", (run_id,)).fetchone()[0]) + 1
+    conn.execute(
+        "INSERT INTO run_events (event_id, run_id, status, result_refs_json, request_id, created_at, seq) VALUES (?,?,?,?,?,?,?);",
+        (event_id, run_id, status, rr_json, request_id or "", now, seq),
     )
     conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_run_events_run_id_created_at ON run_events(run_id, created_at);"
+        """
+        INSERT INTO run_status_current (run_id, seq, status, result_refs_json, event_id, updated_at)
+        VALUES (?,?,?,?,?,?)
+        ON CONFLICT(run_id) DO UPDATE SET
+            seq=excluded.seq, status=excluded.status, result_refs_json=excluded.result_refs_json,
+            event_id=excluded.event_id, updated_at=excluded.updated_at;
+        """,
+        (run_id, seq, status, rr_json, event_id, now),
     )
+    return {
+        "event_id": event_id,
+        "run_id": run_id,
+        "seq": seq,
+        "status": status,
+        "result_refs": result_refs if isinstance(result_refs, dict) else {},
+        "created_at": now,
+    }
 
 
 def append_run_event(
@@ -340,54 +443,219 @@ def append_run_event(
     status: str,
     result_refs: Optional[Dict[str, Any]] = None,
     request_id: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
 ) -> str:
     """
     Append-only insert of a run event.
+    The event gets the run's next seq and run_status_current is upserted in the
+    same transaction, so readers never see one without the other.
+    conn: reuse the caller's connection (no transaction may be open on it).
     Returns event_id.
     """
+    own = conn is None
+    c = _connect() if own else conn
+    try:
+        _ensure_run_events_table(c)
+        # IMMEDIATE: take the write lock before reading the current seq
+        c.execute("BEGIN IMMEDIATE;")
+        try:
+            event = _stage_run_event(c, run_id, status=status, result_refs=result_refs, request_id=request_id)
+            c.commit()
+        except Exception:
+            c.rollback()
+            raise
+    finally:
+        if own:
+            c.close()
+    # after commit: subscribers only ever see durable transitions
+    publish_run_event(event)
+    return event["event_id"]
+
+
+def record_run_result(
+    run_id: str,
+    *,
+    status: str,
+    result_refs: Dict[str, Any],
+    request_id: str,
+    assetize: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
+    """
+    Final transition of a run as one transaction:
+    - assetize=True: an asset row for the first storage_refs entry, put into result_refs.asset_ids
+    - produced_asset link for every result_refs.asset_ids entry
+    - the final run event (+ run_status_current)
+    Assetizing and linking stay best-effort (a savepoint each): a schema that
+    cannot take them loses the asset / link, never the final event.
+    Returns result_refs as recorded. conn: reuse the caller's connection.
+    """
+    rr = dict(result_refs)
+    own = conn is None
+    c = _connect() if own else conn
+    try:
+        _ensure_run_events_table(c)
+        c.execute("BEGIN IMMEDIATE;")
+        try:
+            if assetize and rr.get("storage_refs"):
+                asset_id = _best_effort(c, "assetize", lambda: _create_asset_from_storage_ref(
+                    c, storage_ref=rr["storage_refs"][0], request_id=request_id))
+                if asset_id:
+                    rr["asset_ids"] = [asset_id]
+            if rr.get("asset_ids") and _table_exists(c, "links"):
+                for asset_id in rr["asset_ids"]:
+                    _best_effort(c, "produced_asset", lambda: _insert_link(
+                        c, src_type="run", src_id=str(run_id), dst_type="asset", dst_id=str(asset_id),
+                        relation="produced_asset", meta={"request_id": request_id or ""}))
+            event = _stage_run_event(c, run_id, status=status, result_refs=rr, request_id=request_id)
+            c.commit()
+        except Exception:
+            c.rollback()
+            raise
+    finally:
+        if own:
+            c.close()
+    publish_run_event(event)
+    return rr
+
+
+def _best_effort(conn: sqlite3.Connection, name: str, fn: Any) -> Any:
+    """fn() inside SAVEPOINT name; on error roll just that back and return None."""
+    conn.execute(f"SAVEPOINT {name};")
+    try:
+        out = fn()
+    except Exception:
+        conn.execute(f"ROLLBACK TO {name};")
+        conn.execute(f"RELEASE {name};")
+        return None
+    conn.execute(f"RELEASE {name};")
+    return out
+
+
+def get_run_status_snapshot(run_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Current {status, seq, result_refs, sweep} for each existing run in run_ids
+    (set-based reads on runs and run_status_current). Unknown ids are absent.
+    seq is 0 for runs without events; sweep parents carry their aggregate and
+    sweep=True (they have no events of their own).
+    """
     conn = _connect()
     try:
+        if not _table_exists(conn, "runs"):
+            raise RuntimeError("DB missing table: runs")
         _ensure_run_events_table(conn)
-        event_id = new_ulid()
-        now = _now_iso()
-        rr_json = None
-        if result_refs is not None:
-            rr_json = json.dumps(result_refs, ensure_ascii=False)
-        conn.execute(
-            "INSERT INTO run_events (event_id, run_id, status, result_refs_json, request_id, created_at) VALUES (?,?,?,?,?,?);",
-            (event_id, run_id, status, rr_json, request_id or "", now),
-        )
-        conn.commit()
-        return event_id
+        cols = _table_info(conn, "runs")
+        pk = _primary_key_name(cols)
+        id_col = pk if pk else ("id" if "id" in cols else "run_id")
+
+        out: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(run_ids), 500):
+            chunk = list(run_ids[i:i + 500])
+            ph = ",".join(["?"] * len(chunk))
+            for row in conn.execute(f"SELECT * FROM runs WHERE {id_col} IN ({ph});", chunk).fetchall():
+                status = str(row["status"]) if "status" in row.keys() and row["status"] is not None else "queued"
+                out[str(row[id_col])] = {"status": status, "seq": 0, "result_refs": {}, "sweep": False}
+                sweep = _sweep_spec(row)
+                if sweep is not None:
+                    status, refs = _sweep_aggregate(conn, sweep)
+                    out[str(row[id_col])].update(status=status, result_refs=refs, sweep=True)
+            for row in conn.execute(
+                f"SELECT run_id, status, result_refs_json, seq FROM run_status_current WHERE run_id IN ({ph});", chunk
+            ).fetchall():
+                cur = out.get(str(row["run_id"]))
+                if cur is None or cur["sweep"]:
+                    continue
+                cur.update(
+                    status=str(row["status"]),
+                    seq=int(row["seq"]),
+                    result_refs=_json_loads(row["result_refs_json"]) if row["result_refs_json"] else {},
+                )
+        return out
     finally:
         conn.close()
 
 
-def _get_latest_run_event(conn: sqlite3.Connection, run_id: str) -> Optional[Dict[str, Any]]:
+def _get_current_run_status(conn: sqlite3.Connection, run_id: str) -> Optional[Dict[str, Any]]:
     """
-    Read latest event for run_id (best-effort).
-    Returns {status, result_refs} or None.
+    Read the current status projection for run_id (primary-key lookup, best-effort).
+    Returns {status, result_refs, seq} or None when the run has no events.
     """
     try:
         _ensure_run_events_table(conn)
         row = conn.execute(
-            "SELECT status, result_refs_json, created_at FROM run_events WHERE run_id=? ORDER BY created_at DESC LIMIT 1;",
+            "SELECT status, result_refs_json, seq FROM run_status_current WHERE run_id=?;",
             (run_id,),
         ).fetchone()
         if row is None:
             return None
         rr: Dict[str, Any] = {}
-        if "result_refs_json" in row.keys() and row["result_refs_json"]:
+        if row["result_refs_json"]:
             try:
                 rr = json.loads(row["result_refs_json"])
             except Exception:
                 rr = {}
-        return {"status": row["status"], "result_refs": rr if isinstance(rr, dict) else {}}
+        return {"status": row["status"], "result_refs": rr if isinstance(rr, dict) else {}, "seq": int(row["seq"])}
     except Exception:
         # If anything goes wrong, do not break GET /runs/{id}.
         return None
 
 
+def _sweep_spec(row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+    for k in ("input_json", "input", "meta_json", "meta", "payload_json", "payload", "params_json", "params"):
+        if k in row.keys():
+            raw = row[k]
+            if not raw or '"sweep"' not in raw:
+                return None
+            sweep = _json_loads(raw).get("sweep")
+            return sweep if isinstance(sweep, dict) and isinstance(sweep.get("child_run_ids"), list) else None
+    return None
+
+
+def _sweep_aggregate(conn: sqlite3.Connection, sweep: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parent status from the children's current status:
+    queued (none started) / running (any unfinished) / succeeded / failed (all alike) / partial.
+    """
+    child_ids = [str(c) for c in sweep.get("child_run_ids") or []]
+    current: Dict[str, sqlite3.Row] = {}
+    try:
+        _ensure_run_events_table(conn)
+        for i in range(0, len(child_ids), 500):
+            chunk = child_ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT run_id, status, result_refs_json FROM run_status_current WHERE run_id IN ({','.join('?' * len(chunk))});",
+                chunk,
+            ).fetchall()
+            current.update({r["run_id"]: r for r in rows})
+    except Exception:
+        current = {}
+
+    counts: Dict[str, int] = {}
+    asset_ids: List[str] = []
+    for cid in child_ids:
+        r = current.get(cid)
+        st = str(r["status"]) if r is not None else "queued"
+        counts[st] = counts.get(st, 0) + 1
+        if r is not None and r["result_refs_json"]:
+            asset_ids += [str(a) for a in _json_loads(r["result_refs_json"]).get("asset_ids") or []]
+
+    finished = counts.get("succeeded", 0) + counts.get("failed", 0)
+    if not child_ids or counts.get("queued", 0) == len(child_ids):
+        status = "queued"
+    elif finished < len(child_ids):
+        status = "running"
+    elif counts.get("succeeded", 0) == len(child_ids):
+        status = "succeeded"
+    elif counts.get("failed", 0) == len(child_ids):
+        status = "failed"
+    else:
+        status = "partial"
+    refs = {
+        "asset_ids": asset_ids,
+        "sweep": {"total": len(child_ids), "fanout": sweep.get("fanout"), "counts": counts, "child_run_ids": child_ids},
+    }
+    return status, refs
+
 
 # =========================
 # v1.1 Batch-2C additions
@@ -424,8 +692,8 @@ def _ensure_links_table(conn: sqlite3.Connection) -> None:
     raise RuntimeError("DB missing table: links")
 
 
-def _insert_link(
-    conn: sqlite3.Connection,
+def _link_row(
+    cols: Dict[str, Dict[str, Any]],
     *,
     src_type: str,
     src_id: str,
@@ -433,10 +701,7 @@ def _insert_link(
     dst_id: str,
     relation: str,
     meta: Optional[Dict[str, Any]] = None,
-) -> str:
-    _ensure_links_table(conn)
-    cols = _table_info(conn, "links")
-
+) -> Dict[str, Any]:
     has_src_dst = ("src_type" in cols and "src_id" in cols and "dst_type" in cols and "dst_id" in cols)
     src_type_col = "src_type" if has_src_dst else "source_type"
     src_id_col = "src_id" if has_src_dst else "source_id"
@@ -459,7 +724,22 @@ def _insert_link(
     for k in ("id", "link_id"):
         if k in cols and k not in row:
             row[k] = new_ulid()
+    return row
+
 
+def _insert_link(
+    conn: sqlite3.Connection,
+    *,
+    src_type: str,
+    src_id: str,
+    dst_type: str,
+    dst_id: str,
+    relation: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> str:
+    _ensure_links_table(conn)
+    cols = _table_info(conn, "links")
+    row = _link_row(cols, src_type=src_type, src_id=src_id, dst_type=dst_type, dst_id=dst_id, relation=relation, meta=meta)
     return _insert(conn, "links", row)
 
 
@@ -477,108 +757,168 @@ def _get_provider_profile_row(conn: sqlite3.Connection, provider_profile_id: str
     return dict(row)
 
 
-def resolve_provider_profile(override_provider_profile_id: Optional[str]) -> Dict[str, Any]:
+def _profile_is_scrubbed(row: Dict[str, Any]) -> bool:
+    name = str(row.get("name") or "")
+    if name.startswith("(scrubbed)"):
+        return True
+    cj = row.get("config_json")
+    if cj is None:
+        return True
+    if isinstance(cj, str) and cj.strip() == "":
+        return True
+    return False
+
+
+# config_json sections copied into the run's profile snapshot (read by the executor)
+_SNAPSHOT_CONFIG_KEYS = ("limits", "breaker", "hedge")
+
+
+def _profile_snapshot(r: Dict[str, Any], id_col: str) -> Dict[str, Any]:
+    snap = {
+        "id": str(r.get(id_col) or ""),
+        "name": str(r.get("name") or ""),
+        "provider_type": str(r.get("provider_type") or ""),
+        "has_config": bool(str(r.get("config_json") or "").strip()),
+    }
+    # admission limits / breaker / hedge settings travel with the run (runs/admission.py, runs/resilience.py)
+    config = _json_loads(str(r.get("config_json") or ""))
+    for k in _SNAPSHOT_CONFIG_KEYS:
+        if isinstance(config.get(k), dict) and config[k]:
+            snap[k] = config[k]
+    return snap
+
+
+def resolve_provider_profile(
+    override_provider_profile_id: Optional[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
     """
     v1.1 Batch-2C:
     selection: override > global default > fallback (latest usable)
     scrubbed rows must NOT be used.
-    Returns: {resolved_id, snapshot:{id,name,provider_type,has_config}}
+    Returns: {resolved_id, snapshot:{id,name,provider_type,has_config[,limits,breaker,hedge]}}
+    Cached per override id / default pointer until a profile write (provider_profiles.cache);
+    the returned dict is shared and must not be mutated. conn: reuse the caller's connection.
     """
-    conn = _connect()
+    override = override_provider_profile_id or None
+    own = conn is None
+    c = _connect() if own else conn
     try:
-        if not _table_exists(conn, "provider_profiles"):
-            raise ValueError("provider_profile_required")
+        return profile_cache.cached(c, ("resolve", override), lambda: _resolve_provider_profile(c, override))
+    finally:
+        if own:
+            c.close()
 
-        cols = _table_info(conn, "provider_profiles")
-        pk = _primary_key_name(cols)
-        id_col = pk if pk else ("id" if "id" in cols else "id")
 
-        def is_scrubbed(row: Dict[str, Any]) -> bool:
-            name = str(row.get("name") or "")
-            if name.startswith("(scrubbed)"):
-                return True
-            cj = row.get("config_json")
-            if cj is None:
-                return True
-            if isinstance(cj, str) and cj.strip() == "":
-                return True
-            return False
+def _resolve_provider_profile(conn: sqlite3.Connection, override_provider_profile_id: Optional[str]) -> Dict[str, Any]:
+    if not _table_exists(conn, "provider_profiles"):
+        raise ValueError("provider_profile_required")
 
-        def snapshot(r: Dict[str, Any]) -> Dict[str, Any]:
-            return {
-                "id": str(r.get(id_col) or ""),
-                "name": str(r.get("name") or ""),
-                "provider_type": str(r.get("provider_type") or ""),
-                "has_config": bool(str(r.get("config_json") or "").strip()),
-            }
+    cols = _table_info(conn, "provider_profiles")
+    pk = _primary_key_name(cols)
+    id_col = pk if pk else ("id" if "id" in cols else "id")
 
-        # 1) override
-        if override_provider_profile_id:
-            row = conn.execute(f"SELECT * FROM provider_profiles WHERE {id_col}=?", (override_provider_profile_id,)).fetchone()
-            if not row:
-                raise ValueError("provider_profile_not_found")
-            r = dict(row)
-            if is_scrubbed(r):
-                raise ValueError("provider_profile_deleted")
-            snap = snapshot(r)
-            if not snap["id"]:
-                raise ValueError("provider_profile_not_found")
-            return {"resolved_id": snap["id"], "snapshot": snap}
-
-        # 2) global default (if column exists)
-        if "is_global_default" in cols:
-            row = conn.execute(
-                "SELECT * FROM provider_profiles WHERE is_global_default=1 ORDER BY updated_at DESC, created_at DESC LIMIT 1"
-            ).fetchone()
-            if row:
-                r = dict(row)
-                if not is_scrubbed(r):
-                    snap = snapshot(r)
-                    if snap["id"]:
-                        return {"resolved_id": snap["id"], "snapshot": snap}
-
-        # 3) fallback: latest usable
+    # 1) override
+    if override_provider_profile_id:
+        row = conn.execute(f"SELECT * FROM provider_profiles WHERE {id_col}=?", (override_provider_profile_id,)).fetchone()
+        if not row:
+            raise ValueError("provider_profile_not_found")
+        r = dict(row)
+        if _profile_is_scrubbed(r):
+            raise ValueError("provider_profile_deleted")
+        snap = _profile_snapshot(r, id_col)
+        if not snap["id"]:
+            raise ValueError("provider_profile_not_found")
+        return {"resolved_id": snap["id"], "snapshot": snap}
+
+    for r in _usable_profiles(conn, cols, id_col, limit=1):
+        snap = _profile_snapshot(r, id_col)
+        return {"resolved_id": snap["id"], "snapshot": snap}
+
+    raise ValueError("provider_profile_required")
+
+
+def _usable_profiles(conn: sqlite3.Connection, cols: Dict[str, Dict[str, Any]], id_col: str, limit: int) -> List[Dict[str, Any]]:
+    """Unscrubbed profiles in default-resolution order: global default, then latest usable (max 50 scanned)."""
+    out: List[Dict[str, Any]] = []
+    seen = set()
+
+    def take(r: Dict[str, Any]) -> bool:
+        rid = str(r.get(id_col) or "")
+        if rid and rid not in seen and not _profile_is_scrubbed(r):
+            seen.add(rid)
+            out.append(r)
+        return len(out) >= limit
+
+    # 2) global default (if column exists)
+    if "is_global_default" in cols:
         row = conn.execute(
-            "SELECT * FROM provider_profiles ORDER BY updated_at DESC, created_at DESC LIMIT 50"
-        ).fetchall()
-        for rr in row:
-            r = dict(rr)
-            if is_scrubbed(r):
-                continue
-            snap = snapshot(r)
-            if snap["id"]:
-                return {"resolved_id": snap["id"], "snapshot": snap}
+            "SELECT * FROM provider_profiles WHERE is_global_default=1 ORDER BY updated_at DESC, created_at DESC LIMIT 1"
+        ).fetchone()
+        if row and take(dict(row)):
+            return out
 
-        raise ValueError("provider_profile_required")
+    # 3) fallback: latest usable
+    for rr in conn.execute("SELECT * FROM provider_profiles ORDER BY updated_at DESC, created_at DESC LIMIT 50").fetchall():
+        if take(dict(rr)):
+            break
+    return out
+
+
+def provider_fallback_chain(exclude_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+    """
+    Secondary profiles for hedging / an open circuit: the default-resolution tiers
+    (global default, latest usable) minus exclude_id. Returns [{resolved_id, snapshot}].
+    Cached like resolve_provider_profile.
+    """
+    conn = _connect()
+    try:
+        return profile_cache.cached(conn, ("fallback", exclude_id, limit),
+                                    lambda: _provider_fallback_chain(conn, exclude_id, limit))
     finally:
         conn.close()
 
 
-def _get_character_row(conn: sqlite3.Connection, character_id: str) -> Optional[Dict[str, Any]]:
-    if not _table_exists(conn, "characters"):
-        return None
-    cols = _table_info(conn, "characters")
+def _provider_fallback_chain(conn: sqlite3.Connection, exclude_id: str, limit: int) -> List[Dict[str, Any]]:
+    if not _table_exists(conn, "provider_profiles"):
+        return []
+    cols = _table_info(conn, "provider_profiles")
     pk = _primary_key_name(cols)
-    id_col = pk if pk else ("id" if "id" in cols else None)
-    if not id_col:
-        return None
-    row = conn.execute(f"SELECT * FROM characters WHERE {id_col}=?", (character_id,)).fetchone()
-    return dict(row) if row else None
+    id_col = pk if pk else "id"
+    out = []
+    for r in _usable_profiles(conn, cols, id_col, limit=limit + 1):
+        snap = _profile_snapshot(r, id_col)
+        if snap["id"] != exclude_id and len(out) < limit:
+            out.append({"resolved_id": snap["id"], "snapshot": snap})
+    return out
 
 
-def _get_ref_set_row(conn: sqlite3.Connection, ref_set_id: str) -> Optional[Dict[str, Any]]:
-    if not _table_exists(conn, "character_ref_sets"):
-        return None
-    cols = _table_info(conn, "character_ref_sets")
+def _rows_by_id(conn: sqlite3.Connection, table: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """One SELECT ... WHERE pk IN (...) for ids (deduplicated); {} when the table is absent."""
+    if not ids or not _table_exists(conn, table):
+        return {}
+    cols = _table_info(conn, table)
     pk = _primary_key_name(cols)
     id_col = pk if pk else ("id" if "id" in cols else None)
     if not id_col:
-        return None
-    row = conn.execute(f"SELECT * FROM character_ref_sets WHERE {id_col}=?", (ref_set_id,)).fetchone()
-    return dict(row) if row else None
+        return {}
+    uniq = list(dict.fromkeys(ids))
+    marks = ",".join("?" * len(uniq))
+    rows = conn.execute(f"SELECT * FROM {table} WHERE {id_col} IN ({marks})", uniq).fetchall()
+    return {str(r[id_col]): dict(r) for r in rows}
+
+
+# (db, ref_set_id) -> owning character_id. character_ref_sets is append-only
+# (UPDATE/DELETE triggers), so a confirmed row never changes and is kept for the
+# life of the process.
+_CONFIRMED_REF_SETS: Dict[Tuple[str, str], str] = {}
+_CONFIRMED_REF_SETS_MAX = 50000
 
 
-def resolve_characters(characters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def resolve_characters(
+    characters: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict[str, Any]]:
     """
     2C.2/2C.5: if provided, must have exactly one primary in router.
     Here we resolve ref_set:
@@ -586,49 +926,227 @@ def resolve_characters(characters: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     - enforce ownership
     - enforce status=confirmed (quality choice for v1.1 trace stability)
     Returns list of {character_id,is_primary,resolved_ref_set_id}
+    Characters, then uncached ref sets, are read with one IN query each; errors are
+    raised for the first failing entry in request order. conn: reuse the caller's connection.
     """
     if not characters:
         return []
 
-    conn = _connect()
+    own = conn is None
+    c = _connect() if own else conn
     try:
-        out: List[Dict[str, Any]] = []
-        for c in characters:
-            cid = str(c.get("character_id") or "").strip()
-            if not cid:
-                raise ValueError("character_not_found")
-            crow = _get_character_row(conn, cid)
-            if not crow:
-                raise ValueError("character_not_found")
-
-            ref_set_id = (c.get("character_ref_set_id") or "").strip()
-            if not ref_set_id:
-                ref_set_id = str(crow.get("active_ref_set_id") or "").strip()
-                if not ref_set_id:
-                    raise ValueError("active_ref_set_missing")
-
-            rs = _get_ref_set_row(conn, ref_set_id)
-            if not rs:
-                raise ValueError("ref_set_not_found")
-
-            owner = str(rs.get("character_id") or "")
-            if owner != cid:
-                raise ValueError("invalid_ref_set_owner")
-
-            st = str(rs.get("status") or "")
-            if st != "confirmed":
-                raise ValueError("ref_set_not_confirmed")
-
-            out.append(
-                {
-                    "character_id": cid,
-                    "is_primary": bool(c.get("is_primary")),
-                    "resolved_ref_set_id": ref_set_id,
-                }
-            )
-        return out
+        return _resolve_characters(c, characters)
     finally:
-        conn.close()
+        if own:
+            c.close()
+
+
+def _resolve_characters(conn: sqlite3.Connection, characters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    db = schema.db_key(conn)
+    cids = [str(c.get("character_id") or "").strip() for c in characters]
+    crows = _rows_by_id(conn, "characters", [cid for cid in cids if cid])
+
+    wanted: List[Tuple[str, str]] = []
+    for c, cid in zip(characters, cids):
+        crow = crows.get(cid)
+        ref_set_id = (c.get("character_ref_set_id") or "").strip()
+        if not ref_set_id and crow:
+            ref_set_id = str(crow.get("active_ref_set_id") or "").strip()
+        wanted.append((cid, ref_set_id))
+
+    owners: Dict[str, str] = {}
+    if db is not None:
+        for _cid, rsid in wanted:
+            owner = _CONFIRMED_REF_SETS.get((db, rsid))
+            if owner is not None:
+                owners[rsid] = owner
+    rsrows = _rows_by_id(conn, "character_ref_sets", [rsid for _cid, rsid in wanted if rsid and rsid not in owners])
+    for rsid, rs in rsrows.items():
+        if str(rs.get("status") or "") == "confirmed":
+            owners[rsid] = str(rs.get("character_id") or "")
+            if db is not None:
+                if len(_CONFIRMED_REF_SETS) >= _CONFIRMED_REF_SETS_MAX:
+                    _CONFIRMED_REF_SETS.clear()
+                _CONFIRMED_REF_SETS[(db, rsid)] = owners[rsid]
+
+    out: List[Dict[str, Any]] = []
+    for c, (cid, ref_set_id) in zip(characters, wanted):
+        if not cid or cid not in crows:
+            raise ValueError("character_not_found")
+        if not ref_set_id:
+            raise ValueError("active_ref_set_missing")
+
+        if ref_set_id in owners:
+            owner, st = owners[ref_set_id], "confirmed"
+        elif ref_set_id in rsrows:
+            rs = rsrows[ref_set_id]
+            owner, st = str(rs.get("character_id") or ""), str(rs.get("status") or "")
+        else:
+            raise ValueError("ref_set_not_found")
+
+        if owner != cid:
+            raise ValueError("invalid_ref_set_owner")
+        if st != "confirmed":
+            raise ValueError("ref_set_not_confirmed")
+
+        out.append(
+            {
+                "character_id": cid,
+                "is_primary": bool(c.get("is_primary")),
+                "resolved_ref_set_id": ref_set_id,
+            }
+        )
+    return out
+
+
+def _run_evidence(
+    run_type: str,
+    provider: Dict[str, Any],
+    resolved_chars: List[Dict[str, Any]],
+    inputs: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "run_type": run_type,
+        "resolved_provider_profile_id": provider.get("resolved_id"),
+        "provider_profile_snapshot": provider.get("snapshot") or {},
+        "characters": resolved_chars,
+        "inputs": inputs or {},
+    }
+
+
+_PROMPT_PACK_PAYLOAD_COLS = ("content", "payload_json", "payload", "input_json", "input", "meta_json", "meta", "params_json", "params")
+
+
+def _prompt_pack_row(pp_cols: Dict[str, Dict[str, Any]], run_type: str, prompt_pack: Dict[str, Any]) -> Dict[str, Any]:
+    payload = dict(prompt_pack or {})
+    payload["run_type"] = run_type
+    payload_json = _json_dumps(payload)
+
+    pp_row: Dict[str, Any] = {}
+    # put payload into first matching column
+    k_payload = _pick_first_present(pp_cols, _PROMPT_PACK_PAYLOAD_COLS)
+    if k_payload:
+        pp_row[k_payload] = payload_json
+    # digest (best-effort)
+    if "digest" in pp_cols and "digest" not in pp_row:
+        try:
+            import hashlib
+            pp_row["digest"] = hashlib.sha256(payload_json.encode("utf-8")).hexdigest()
+        except Exception:
+            pass
+    if "type" in pp_cols:
+        pp_row["type"] = run_type
+    if "kind" in pp_cols:
+        pp_row["kind"] = "prompt_pack"
+    return pp_row
+
+
+def _insert_prompt_packs(conn: sqlite3.Connection, pp_cols: Dict[str, Dict[str, Any]], rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    _insert_many for _prompt_pack_row rows; with RUN_INTERNING on, a row whose
+    digest + payload already exists (or repeats within rows) reuses that id.
+    """
+    pk = _primary_key_name(pp_cols)
+    k_payload = _pick_first_present(pp_cols, _PROMPT_PACK_PAYLOAD_COLS)
+    if not interning.enabled() or not pk or not k_payload or "digest" not in pp_cols:
+        return _insert_many(conn, "prompt_packs", rows)
+
+    found: Dict[Tuple[str, str], Optional[str]] = {}
+    first_new: Dict[Tuple[str, str], int] = {}
+    new_rows: List[Dict[str, Any]] = []
+    refs: List[Any] = []  # per row: an existing id (str) or an index into new_rows (int)
+    for row in rows:
+        key = (str(row.get("digest") or ""), str(row.get(k_payload) or ""))
+        if key[0]:
+            if key not in found:
+                found[key] = interning.find_prompt_pack(conn, pk, k_payload, key[0], key[1])
+            if found[key] is not None:
+                refs.append(found[key])
+                continue
+            if key in first_new:
+                refs.append(first_new[key])
+                continue
+            first_new[key] = len(new_rows)
+        refs.append(len(new_rows))
+        new_rows.append(row)
+    new_ids = _insert_many(conn, "prompt_packs", new_rows) if new_rows else []
+    return [r if isinstance(r, str) else new_ids[r] for r in refs]
+
+
+def _evidence_writer(conn: sqlite3.Connection) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Evidence -> the form stored in runs.input_json (snapshot interned with RUN_INTERNING on)."""
+    if not interning.enabled():
+        return lambda evidence: evidence
+    return interning.SnapshotStore(conn).stored_evidence
+
+
+def _run_row(
+    run_cols: Dict[str, Dict[str, Any]],
+    run_type: str,
+    prompt_pack_id: str,
+    provider: Dict[str, Any],
+    evidence: Dict[str, Any],
+) -> Dict[str, Any]:
+    run_row: Dict[str, Any] = {}
+
+    # FK to prompt_pack (best-effort)
+    for k in ("prompt_pack_id", "promptpack_id", "prompt_pack_ulid"):
+        if k in run_cols:
+            run_row[k] = prompt_pack_id
+            break
+
+    if "run_type" in run_cols:
+        run_row["run_type"] = run_type
+    if "type" in run_cols:
+        run_row["type"] = run_type
+    if "status" in run_cols:
+        run_row["status"] = "queued"
+
+    # evidence into run input json (best-effort)
+    k_in = _pick_first_present(run_cols, ("input_json", "input", "meta_json", "meta", "payload_json", "payload", "params_json", "params"))
+    if k_in:
+        run_row[k_in] = _json_dumps(evidence)
+
+    # resolved provider_profile_id (best-effort)
+    for k in ("provider_profile_id", "resolved_provider_profile_id"):
+        if k in run_cols:
+            run_row[k] = str(provider.get("resolved_id") or "")
+            break
+
+    rr = _json_dumps({"asset_ids": []})
+    for k in ("result_refs_json", "result_refs", "result_json", "result"):
+        if k in run_cols:
+            run_row[k] = rr
+            break
+    return run_row
+
+
+def sweep_child_evidence(evidence: Dict[str, Any], index: int, variation: Dict[str, Any]) -> Dict[str, Any]:
+    """Evidence of sweep child #index: the parent's, with the variation merged over inputs."""
+    child = {k: v for k, v in evidence.items() if k != "sweep"}
+    child["inputs"] = {**(evidence.get("inputs") or {}), **(variation or {})}
+    child["sweep_index"] = index
+    return child
+
+
+def _run_links(
+    run_id: str,
+    prompt_pack_id: str,
+    provider: Dict[str, Any],
+    resolved_chars: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """relationship_lock links of one run, as _insert_link / _link_row keyword sets."""
+    links: List[Dict[str, Any]] = [
+        dict(src_type="run", src_id=run_id, dst_type="prompt_pack", dst_id=prompt_pack_id, relation="uses_prompt_pack"),
+    ]
+    # provider profile (recommended)
+    if provider.get("resolved_id"):
+        links.append(dict(src_type="run", src_id=run_id, dst_type="provider_profile", dst_id=str(provider["resolved_id"]), relation="uses_provider_profile"))
+    # characters + ref_sets
+    for c in resolved_chars:
+        links.append(dict(src_type="run", src_id=run_id, dst_type="character", dst_id=str(c["character_id"]), relation="uses_character", meta={"is_primary": bool(c.get("is_primary"))}))
+        links.append(dict(src_type="run", src_id=run_id, dst_type="character_ref_set", dst_id=str(c["resolved_ref_set_id"]), relation="uses_character_ref_set", meta={"character_id": str(c["character_id"]), "is_primary": bool(c.get("is_primary"))}))
+    return links
 
 
 def create_run_v11(
@@ -638,6 +1156,10 @@ def create_run_v11(
     override_provider_profile_id: Optional[str],
     characters: List[Dict[str, Any]],
     inputs: Dict[str, Any],
+    variations: Optional[List[Dict[str, Any]]] = None,
+    fanout: int = 1,
+    conn: Optional[sqlite3.Connection] = None,
+    timer: Optional[StageTimer] = None,
 ) -> Tuple[str, str, str, Dict[str, Any]]:
     """
     v1.1 create:
@@ -649,110 +1171,172 @@ def create_run_v11(
       run -> character uses_character (0..N)
       run -> character_ref_set uses_character_ref_set (0..N)
       run -> provider_profile uses_provider_profile (optional but recommended)
+    Parameter sweep (variations given): one prompt_pack, a parent run and one
+    child run per variation (inputs | variation), all sharing the prompt_pack;
+    child -> parent sweep_child_of. The parent's evidence carries
+    sweep={fanout, child_run_ids}; its status is aggregated from the children on read.
+    Stages: "resolve" (reads, no transaction), then "insert" (one BEGIN IMMEDIATE
+    transaction: prompt_pack, runs, links). conn: reuse the caller's connection
+    (no transaction may be open on it); timer: records both stages.
     Returns: (run_id, prompt_pack_id, status, evidence_input_json_dict)
     """
-    pp_lock = dict(prompt_pack or {})
-
-    # resolve provider + characters
-    provider = resolve_provider_profile(override_provider_profile_id)
-    resolved_chars = resolve_characters(characters)
-
-    evidence: Dict[str, Any] = {
-        "run_type": run_type,
-        "resolved_provider_profile_id": provider.get("resolved_id"),
-        "provider_profile_snapshot": provider.get("snapshot") or {},
-        "characters": resolved_chars,
-        "inputs": inputs or {},
-    }
-
-    conn = _connect()
+    stage = stages(timer)
+    own = conn is None
+    c = _connect() if own else conn
     try:
-        if not _table_exists(conn, "prompt_packs"):
-            raise RuntimeError("DB missing table: prompt_packs")
-        if not _table_exists(conn, "runs"):
-            raise RuntimeError("DB missing table: runs")
-
-        # ---- prompt_packs
-        pp_cols = _table_info(conn, "prompt_packs")
-
-        payload = dict(pp_lock)
-        payload["run_type"] = run_type
-        payload_json = _json_dumps(payload)
-
-        pp_row: Dict[str, Any] = {}
-        # put payload into first matching column
-        k_payload = _pick_first_present(pp_cols, ("content", "payload_json", "payload", "input_json", "input", "meta_json", "meta", "params_json", "params"))
-        if k_payload:
-            pp_row[k_payload] = payload_json
-        # digest (best-effort)
-        if "digest" in pp_cols and "digest" not in pp_row:
+        with stage("resolve"):
+            provider = resolve_provider_profile(override_provider_profile_id, c)
+            resolved_chars = resolve_characters(characters, c)
+            evidence = _run_evidence(run_type, provider, resolved_chars, inputs)
+
+        with stage("insert"):
+            if not _table_exists(c, "prompt_packs"):
+                raise RuntimeError("DB missing table: prompt_packs")
+            if not _table_exists(c, "runs"):
+                raise RuntimeError("DB missing table: runs")
+            c.execute("BEGIN IMMEDIATE;")
             try:
-                import hashlib
-                pp_row["digest"] = hashlib.sha256(payload_json.encode("utf-8")).hexdigest()
+                run_id, prompt_pack_id, evidence = _insert_run(c, run_type, prompt_pack, provider, resolved_chars,
+                                                               evidence, variations, fanout)
+                c.commit()
             except Exception:
-                pass
-        if "type" in pp_cols:
-            pp_row["type"] = run_type
-        if "kind" in pp_cols:
-            pp_row["kind"] = "prompt_pack"
-
-        prompt_pack_id = _insert(conn, "prompt_packs", pp_row)
-
-        # ---- runs
-        run_cols = _table_info(conn, "runs")
-        run_row: Dict[str, Any] = {}
+                c.rollback()
+                raise
+        return run_id, prompt_pack_id, "queued", evidence
+    finally:
+        if own:
+            c.close()
 
-        # FK to prompt_pack (best-effort)
-        for k in ("prompt_pack_id", "promptpack_id", "prompt_pack_ulid"):
-            if k in run_cols:
-                run_row[k] = prompt_pack_id
-                break
 
-        if "run_type" in run_cols:
-            run_row["run_type"] = run_type
-        if "type" in run_cols:
-            run_row["type"] = run_type
-        if "status" in run_cols:
-            run_row["status"] = "queued"
+def _insert_run(
+    conn: sqlite3.Connection,
+    run_type: str,
+    prompt_pack: Dict[str, Any],
+    provider: Dict[str, Any],
+    resolved_chars: List[Dict[str, Any]],
+    evidence: Dict[str, Any],
+    variations: Optional[List[Dict[str, Any]]],
+    fanout: int,
+) -> Tuple[str, str, Dict[str, Any]]:
+    """create_run_v11's writes, inside the caller's transaction -> (run_id, prompt_pack_id, evidence)."""
+    pp_cols = _table_info(conn, "prompt_packs")
+    prompt_pack_id = _insert_prompt_packs(conn, pp_cols, [_prompt_pack_row(pp_cols, run_type, prompt_pack)])[0]
+    run_cols = _table_info(conn, "runs")
+    stored = _evidence_writer(conn)
+
+    child_ids: List[str] = []
+    if variations is not None:
+        child_ids = _insert_many(conn, "runs", [
+            _run_row(run_cols, run_type, prompt_pack_id, provider, stored(sweep_child_evidence(evidence, k, v)))
+            for k, v in enumerate(variations)
+        ])
+        evidence = dict(evidence, sweep={"fanout": max(int(fanout), 1), "child_run_ids": child_ids})
+
+    run_id = _insert(conn, "runs", _run_row(run_cols, run_type, prompt_pack_id, provider, stored(evidence)))
+
+    # ---- links (relationship_lock)
+    # safe degrade: do not fail run creation if links schema differs; router/gates can catch via evidence
+    def links() -> None:
+        for link in _run_links(str(run_id), str(prompt_pack_id), provider, resolved_chars):
+            _insert_link(conn, **link)
+        for child_id in child_ids:
+            for link in _run_links(child_id, str(prompt_pack_id), provider, resolved_chars):
+                _insert_link(conn, **link)
+            _insert_link(conn, src_type="run", src_id=child_id, dst_type="run", dst_id=str(run_id), relation="sweep_child_of")
+
+    _best_effort(conn, "run_links", links)
+    return str(run_id), str(prompt_pack_id), evidence
+
+
+def create_runs_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    POST /runs:batch: create_run_v11 for many items in one transaction.
+    - provider profiles / characters are resolved once per distinct id
+    - an item whose resolution fails gets {"error": code} and is skipped
+    - prompt_packs, runs and links of the remaining items are inserted with
+      executemany and committed together (any DB error rolls back the batch)
+    items: create_run_v11 keyword dicts. Returns one entry per item, in order:
+    {run_id, prompt_pack_id, status, evidence[, warning]} or {error}; warning is
+    links_not_recorded when the batch's links could not be written (all or none).
+    """
+    providers: Dict[Optional[str], Any] = {}
+    chars: Dict[Tuple[str, str], Any] = {}
 
-        # evidence into run input json (best-effort)
-        k_in = _pick_first_present(run_cols, ("input_json", "input", "meta_json", "meta", "payload_json", "payload", "params_json", "params"))
-        if k_in:
-            run_row[k_in] = _json_dumps(evidence)
+    def once(cache: Dict[Any, Any], key: Any, resolve: Any) -> Any:
+        if key not in cache:
+            try:
+                cache[key] = resolve()
+            except ValueError as e:
+                cache[key] = e
+        if isinstance(cache[key], ValueError):
+            raise cache[key]
+        return cache[key]
 
-        # resolved provider_profile_id (best-effort)
-        for k in ("provider_profile_id", "resolved_provider_profile_id"):
-            if k in run_cols:
-                run_row[k] = str(provider.get("resolved_id") or "")
-                break
+    results: List[Dict[str, Any]] = [{} for _ in items]
 
-        rr = _json_dumps({"asset_ids": []})
-        for k in ("result_refs_json", "result_refs", "result_json", "result"):
-            if k in run_cols:
-                run_row[k] = rr
-                break
+    conn = _connect()
+    try:
+        planned: List[Tuple[int, Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]] = []
+        for i, it in enumerate(items):
+            override = it.get("override_provider_profile_id") or None
+            try:
+                provider = once(providers, override, lambda: resolve_provider_profile(override, conn))
+                resolved_chars = []
+                for c in it.get("characters") or []:
+                    key = (str(c.get("character_id") or "").strip(), (c.get("character_ref_set_id") or "").strip())
+                    r = once(chars, key, lambda: resolve_characters([dict(c, is_primary=False)], conn)[0])
+                    resolved_chars.append(dict(r, is_primary=bool(c.get("is_primary"))))
+            except ValueError as e:
+                results[i] = {"error": str(e) or "bad_request"}
+                continue
+            evidence = _run_evidence(it["run_type"], provider, resolved_chars, it.get("inputs") or {})
+            planned.append((i, provider, resolved_chars, evidence))
 
-        run_id = _insert(conn, "runs", run_row)
+        if not planned:
+            return results
 
-        # ---- links (relationship_lock)
+        if not _table_exists(conn, "prompt_packs"):
+            raise RuntimeError("DB missing table: prompt_packs")
+        if not _table_exists(conn, "runs"):
+            raise RuntimeError("DB missing table: runs")
         try:
-            _insert_link(conn, src_type="run", src_id=str(run_id), dst_type="prompt_pack", dst_id=str(prompt_pack_id), relation="uses_prompt_pack")
-            # provider profile (recommended)
-            if provider.get("resolved_id"):
-                _insert_link(conn, src_type="run", src_id=str(run_id), dst_type="provider_profile", dst_id=str(provider["resolved_id"]), relation="uses_provider_profile")
-            # characters + ref_sets
-            for c in resolved_chars:
-                _insert_link(conn, src_type="run", src_id=str(run_id), dst_type="character", dst_id=str(c["character_id"]), relation="uses_character", meta={"is_primary": bool(c.get("is_primary"))})
-                _insert_link(conn, src_type="run", src_id=str(run_id), dst_type="character_ref_set", dst_id=str(c["resolved_ref_set_id"]), relation="uses_character_ref_set", meta={"character_id": str(c["character_id"]), "is_primary": bool(c.get("is_primary"))})
-        except Exception:
-            # safe degrade: do not fail run creation if links schema differs; router/gates can catch via evidence
-            pass
+            pp_cols = _table_info(conn, "prompt_packs")
+            pp_ids = _insert_prompt_packs(conn, pp_cols, [
+                _prompt_pack_row(pp_cols, items[i]["run_type"], items[i]["prompt_pack"]) for i, _p, _c, _e in planned
+            ])
+            run_cols = _table_info(conn, "runs")
+            stored = _evidence_writer(conn)
+            run_ids = _insert_many(conn, "runs", [
+                _run_row(run_cols, items[i]["run_type"], pp_id, provider, stored(evidence))
+                for (i, provider, _c, evidence), pp_id in zip(planned, pp_ids)
+            ])
+
+            # ---- links (relationship_lock); same safe degrade as create_run_v11: a failure
+            # rolls back every link of the batch (never a partial set) and is reported per item
+            def links() -> bool:
+                _ensure_links_table(conn)
+                link_cols = _table_info(conn, "links")
+                _insert_many(conn, "links", [
+                    _link_row(link_cols, **link)
+                    for (_i, provider, resolved_chars, _e), run_id, pp_id in zip(planned, run_ids, pp_ids)
+                    for link in _run_links(run_id, pp_id, provider, resolved_chars)
+                ])
+                return True
 
-        conn.commit()
-        return str(run_id), str(prompt_pack_id), "queued", evidence
+            links_ok = bool(_best_effort(conn, "batch_links", links))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
     finally:
         conn.close()
 
+    for (i, _p, _c, evidence), run_id, pp_id in zip(planned, run_ids, pp_ids):
+        results[i] = {"run_id": run_id, "prompt_pack_id": pp_id, "status": "queued", "evidence": evidence}
+        if not links_ok:
+            results[i]["warning"] = "links_not_recorded"
+    return results
+
 
 def _create_asset_from_storage_ref(conn: sqlite3.Connection, *, storage_ref: str, request_id: str) -> Optional[str]:
     if not _table_exists(conn, "assets"):
@@ -782,17 +1366,6 @@ def _create_asset_from_storage_ref(conn: sqlite3.Connection, *, storage_ref: str
     return str(asset_id) if asset_id else None
 
 
-def link_produced_asset(run_id: str, *, asset_id: str, request_id: str) -> None:
-    conn = _connect()
-    try:
-        if not _table_exists(conn, "links"):
-            return
-        _insert_link(conn, src_type="run", src_id=str(run_id), dst_type="asset", dst_id=str(asset_id), relation="produced_asset", meta={"request_id": request_id or ""})
-        conn.commit()
-    finally:
-        conn.close()
-
-
 def get_prompt_pack_payload(prompt_pack_id: str) -> Dict[str, Any]:
     conn = _connect()
     try:
@@ -809,7 +1382,7 @@ def get_prompt_pack_payload(prompt_pack_id: str) -> Dict[str, Any]:
             return {}
 
         d = dict(row)
-        k_payload = _pick_first_present(cols, ("content", "payload_json", "payload", "input_json", "input", "meta_json", "meta", "params_json", "params"))
+        k_payload = _pick_first_present(cols, _PROMPT_PACK_PAYLOAD_COLS)
         payload = _json_loads(str(d.get(k_payload) or "")) if k_payload else {}
         return payload
     finally:
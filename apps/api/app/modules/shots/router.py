@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import os
 import uuid
 import sqlite3
 from datetime import datetime, timezone
@@ -9,6 +8,10 @@ from typing import Any, Dict, List, Tuple
 from fastapi import APIRouter, Query, Path, Body, Request, Response
 from fastapi.responses import JSONResponse
 
+from app.core.db import connect
+from app.core.idempotency import idempotent
+from app.core.counters import CountMode, count_rows
+from app.core.pagination import InvalidCursor, KeysetOrder, split_page
 from app.modules.shots.schemas import (
     ShotsListOut,
     ShotListItem,
@@ -29,6 +32,7 @@ router = APIRouter(tags=["shots"])
 LIMIT_DEFAULT = 50
 LIMIT_MAX = 200
 UNLINK_PREFIX = "unlink::"
+SHOTS_ORDER = KeysetOrder("shots", ("created_at", "id"))
 
 
 def _utcnow_iso() -> str:
@@ -56,21 +60,8 @@ def _err(rid: str, status: int, error: str, message: str, details: Any = None) -
     )
 
 
-def _sqlite_path_from_url(url: str) -> str:
-    # Expected default: sqlite:///./data/app.db
-    if url.startswith("sqlite:///"):
-        return url[len("sqlite:///") :]
-    if url.startswith("sqlite://"):
-        return url[len("sqlite://") :]
-    raise ValueError(f"unsupported DATABASE_URL scheme: {url}")
-
-
 def _conn() -> sqlite3.Connection:
-    url = os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
-    path = _sqlite_path_from_url(url)
-    c = sqlite3.connect(path, check_same_thread=False)
-    c.row_factory = sqlite3.Row
-    return c
+    return connect()
 
 
 def _clamp_limit(limit: int) -> int:
@@ -170,6 +161,8 @@ def shots_list(
     response: Response,
     offset: int = Query(0, ge=0),
     limit: int = Query(LIMIT_DEFAULT, ge=1),
+    cursor: str | None = Query(default=None, description="Opaque page.next_cursor; overrides offset"),
+    count: CountMode = Query(default="exact", description="page.total: exact | estimate | none"),
     project_id: str | None = Query(default=None),
     series_id: str | None = Query(default=None),
 ):
@@ -180,14 +173,31 @@ def shots_list(
 
     where = []
     args: List[Any] = []
+    # list_counters key for this filter (migration 0006)
+    counter_keys: List[str] = []
 
     if project_id is not None and project_id != "":
         where.append("project_id = ?")
         args.append(project_id)
+        counter_keys.append(f"project:{project_id}")
 
     if series_id is not None and series_id != "":
         where.append("series_id = ?")
         args.append(series_id)
+        counter_keys.append(f"series:{series_id}")
+
+    count_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    count_args = list(args)
+    counter_key = "|".join(counter_keys) or "all"
+
+    if cursor:
+        try:
+            pred, vals = SHOTS_ORDER.after(SHOTS_ORDER.decode(cursor))
+        except InvalidCursor as e:
+            return _err(rid, 400, "invalid_cursor", str(e), {"cursor": cursor})
+        where.append(pred)
+        args.extend(vals)
+        offset = 0
 
     where_sql = ("WHERE " + " AND ".join(where)) if where else ""
 
@@ -195,17 +205,19 @@ def shots_list(
         con = _conn()
         cur = con.cursor()
 
-        total = cur.execute(f"SELECT COUNT(1) AS c FROM shots {where_sql}", tuple(args)).fetchone()["c"]
+        total = count_rows(con, "shots", count_sql, count_args, mode=count, counter=("shots", [counter_key]))
         rows = cur.execute(
             f"""
             SELECT id, project_id, series_id, name, created_at
             FROM shots
             {where_sql}
-            ORDER BY created_at DESC
+            ORDER BY {SHOTS_ORDER.order_by()}
             LIMIT ? OFFSET ?
             """,
-            tuple(args + [lim, offset]),
+            tuple(args + [lim + 1, offset]),
         ).fetchall()
+        has_more = len(rows) > lim
+        rows, next_cursor = split_page(rows, lim, SHOTS_ORDER)
 
         items = [
             ShotListItem(
@@ -218,11 +230,16 @@ def shots_list(
             for r in rows
         ]
 
-        has_more = (offset + lim) < int(total)
-
         return {
             "items": items,
-            "page": {"limit": lim, "offset": offset, "total": int(total), "has_more": bool(has_more)},
+            "page": {
+                "limit": lim,
+                "offset": offset,
+                "total": total,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+                "count": count,
+            },
         }
     except Exception as e:
         return _err(rid, 500, "internal_error", "internal server error", {"type": type(e).__name__})
@@ -297,6 +314,7 @@ def shots_detail(
 
 
 @router.post("/shots/{shot_id}/links", response_model=ShotLinkCreateOut)
+@idempotent("shots.links.create")
 def shot_link_create(
     request: Request,
     response: Response,
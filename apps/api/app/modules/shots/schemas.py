@@ -10,8 +10,10 @@ except Exception:
     class PageOut(BaseModel):
         limit: int
         offset: int
-        total: int
+        total: Optional[int]
         has_more: bool
+        next_cursor: Optional[str] = None
+        count: str = "exact"
 
 
 class ShotListItem(BaseModel):
@@ -1,10 +1,12 @@
 import os
 import json
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from app.core import schema
+from app.core.db import connect, get_sqlite_path
+
 SAFE_PATH_CANDIDATES = [
     "storage_path",
     "file_path",
@@ -16,17 +18,6 @@ SAFE_PATH_CANDIDATES = [
     "storage_key",
 ]
 
-def _resolve_sqlite_path(database_url: str) -> str:
-    # Supports sqlite:///./data/app.db
-    if database_url.startswith("sqlite:///"):
-        p = database_url.replace("sqlite:///", "", 1)
-        return str(Path(p).resolve())
-    if database_url.startswith("sqlite+pysqlite:///"):
-        p = database_url.replace("sqlite+pysqlite:///", "", 1)
-        return str(Path(p).resolve())
-    # fallback: treat as relative file path
-    return str(Path(database_url).resolve())
-
 def _pick_path_column(cols: List[str]) -> Optional[str]:
     for c in SAFE_PATH_CANDIDATES:
         if c in cols:
@@ -48,20 +39,18 @@ def _safe_under_root(root: Path, candidate: str) -> Optional[Path]:
         return None
 
 def purge_deleted_assets(storage_root: str, request_id: Optional[str] = None) -> Dict:
-    db_url = os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
-    db_path = _resolve_sqlite_path(db_url)
+    db_path = get_sqlite_path()
     storage_root_path = Path(os.getenv("STORAGE_ROOT", storage_root)).resolve()
 
-    if not Path(db_path).exists():
+    if not db_path.exists():
         raise RuntimeError(f"db not found: {db_path}")
 
     purged_files = 0
     purged_assets = 0
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     try:
-        conn.row_factory = sqlite3.Row
-        cols = [r["name"] for r in conn.execute("PRAGMA table_info(assets)").fetchall()]
+        cols = schema.columns(conn, "assets")
         path_col = _pick_path_column(cols)
 
         rows = conn.execute("SELECT * FROM assets WHERE deleted_at IS NOT NULL").fetchall()
@@ -0,0 +1 @@
+"""Operator tools: run from apps/api as `python -m app.tools.<name>`."""
@@ -0,0 +1,385 @@
+"""
+HTTP load test: concurrent clients against the API, latency percentiles per endpoint.
+
+Usage (from apps/api; the database should be migrated and seeded, e.g. with
+app.tools.seed_dataset):
+    python -m app.tools.load_test [--url http://127.0.0.1:7000 | --serve]
+        [--clients 16] [--duration 30] [--warmup 3] [--seed 1]
+        [--mix post_runs=1,get_run=3,list_assets=3,get_asset=3,get_shot=3]
+        [--export-rounds 3] [--export-assets 50]
+        [--mock-latency lognormal:800,0.6] [--mock-artifact-bytes 65536] [--mock-failure-rate 0.02]
+        [--out results.json]
+
+Targets:
+- default: the app in this process (httpx ASGITransport; DATABASE_URL / STORAGE_ROOT from env)
+- --serve: uvicorn subprocess on a free port (--server-workers processes), stopped afterwards
+- --url: an already running server (its MockProvider knobs are whatever it was started with)
+
+Mixed phase: each client picks an operation by --mix weight until --duration
+elapses (the first --warmup seconds are not recorded). POST /runs sends
+X-Provider-Enabled: 1, so runs go through the executor and MockProvider, whose
+latency / artifact size / failure rate come from the --mock-* flags
+(MOCK_PROVIDER_* env, see runs/providers/mock_provider.py).
+Export phase: --export-rounds sequential POST /exports (--export-assets assets)
+followed by POST /imports of that export.
+
+Exports/imports read APP_DB_PATH / APP_STORAGE_ROOT (not DATABASE_URL / STORAGE_ROOT);
+for local targets they default to the same database and storage root, and
+APP_EXPORTS_ROOT to a scratch directory.
+
+Output: JSON with throughput (req/s) and p50/p95/p99 per endpoint, written to
+--out and printed. Exit code 1 when any request failed with a transport error
+or 5xx.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.db import get_sqlite_path
+from app.core.storage import get_storage_root
+from app.modules.runs.providers.mock_provider import parse_latency
+
+RESULT_VERSION = 1
+
+DEFAULT_MIX = "post_runs=1,get_run=3,list_assets=3,get_asset=3,get_shot=3"
+
+# op -> endpoint label used in the report
+ENDPOINTS: Dict[str, str] = {
+    "post_runs": "POST /runs",
+    "get_run": "GET /runs/{id}",
+    "list_assets": "GET /assets",
+    "get_asset": "GET /assets/{id}",
+    "get_shot": "GET /shots/{id}",
+    "export": "POST /exports",
+    "import": "POST /imports",
+}
+
+_PACK = {"raw_input": "load test", "final_prompt": "load test", "assembly_used": False}
+
+
+@dataclass
+class Samples:
+    latencies_ms: List[float] = field(default_factory=list)
+    status: Counter = field(default_factory=Counter)
+    errors: int = 0  # transport errors and 5xx
+
+    def add(self, ms: float, status: str) -> None:
+        self.latencies_ms.append(ms)
+        self.status[status] += 1
+        if not status.isdigit() or int(status) >= 500:
+            self.errors += 1
+
+
+def percentile(sorted_ms: Sequence[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return None
+    k = max(int(-(-p * len(sorted_ms) // 100)) - 1, 0)
+    return round(sorted_ms[min(k, len(sorted_ms) - 1)], 2)
+
+
+def summarize(samples: Samples, seconds: float) -> Dict[str, Any]:
+    ms = sorted(samples.latencies_ms)
+    return {
+        "requests": len(ms),
+        "errors": samples.errors,
+        "status": dict(sorted(samples.status.items())),
+        "rps": round(len(ms) / seconds, 2) if seconds > 0 else None,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else None,
+        "max_ms": round(ms[-1], 2) if ms else None,
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        name, _, w = part.partition("=")
+        if name not in ENDPOINTS or name in ("export", "import"):
+            raise ValueError(f"unknown op in --mix: {name}")
+        mix[name] = float(w or 1)
+    if not mix or all(w <= 0 for w in mix.values()):
+        raise ValueError("--mix needs at least one positive weight")
+    return mix
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], seed: int) -> None:
+        self.client = client
+        self.ops = [op for op, w in mix.items() if w > 0]
+        self.weights = [mix[op] for op in self.ops]
+        self.seed = seed
+        self.samples: Dict[str, Samples] = {}
+        self.recording = False
+        self.asset_ids: List[str] = []
+        self.shot_ids: List[str] = []
+        self.run_ids: List[str] = []
+
+    async def _call(self, op: str, method: str, url: str, **kw: Any) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            resp: Optional[httpx.Response] = await self.client.request(method, url, **kw)
+            status = str(resp.status_code)
+        except httpx.HTTPError as e:
+            resp, status = None, type(e).__name__
+        if self.recording:
+            self.samples.setdefault(op, Samples()).add((time.perf_counter() - t0) * 1000.0, status)
+        return resp
+
+    async def prime(self) -> None:
+        """Id pools for the detail endpoints, read through the API itself."""
+        r = await self.client.get("/assets", params={"limit": 200, "count": "none"})
+        r.raise_for_status()
+        self.asset_ids = [it["id"] for it in r.json()["items"]]
+        r = await self.client.get("/shots", params={"limit": 200, "count": "none"})
+        if r.status_code == 200:
+            self.shot_ids = [it["shot_id"] for it in r.json()["items"]]
+        for _ in range(5):
+            await self.post_run()
+
+    # ---- operations
+
+    async def post_run(self) -> None:
+        resp = await self._call("post_runs", "POST", "/runs",
+                                json={"run_type": "t2i", "prompt_pack": _PACK},
+                                headers={"X-Provider-Enabled": "1"})
+        if resp is not None and resp.status_code == 200:
+            self.run_ids.append(resp.json()["run_id"])
+
+    async def get_run(self, rng: random.Random) -> None:
+        if self.run_ids:
+            await self._call("get_run", "GET", f"/runs/{rng.choice(self.run_ids)}")
+
+    async def list_assets(self, state: Dict[str, Any]) -> None:
+        # keyset walk: up to 5 pages, then back to the first page
+        params: Dict[str, Any] = {"limit": 50}
+        if state.get("cursor") and state.get("depth", 0) < 5:
+            params["cursor"] = state["cursor"]
+            state["depth"] = state.get("depth", 0) + 1
+        else:
+            state["depth"] = 0
+        resp = await self._call("list_assets", "GET", "/assets", params=params)
+        state["cursor"] = resp.json()["page"].get("next_cursor") if resp is not None and resp.status_code == 200 else None
+
+    async def get_asset(self, rng: random.Random) -> None:
+        if self.asset_ids:
+            await self._call("get_asset", "GET", f"/assets/{rng.choice(self.asset_ids)}")
+
+    async def get_shot(self, rng: random.Random) -> None:
+        if self.shot_ids:
+            await self._call("get_shot", "GET", f"/shots/{rng.choice(self.shot_ids)}")
+
+    async def _client_loop(self, k: int, deadline: float) -> None:
+        rng = random.Random(f"{self.seed}:{k}")
+        state: Dict[str, Any] = {}
+        while time.perf_counter() < deadline:
+            op = rng.choices(self.ops, self.weights)[0]
+            if op == "post_runs":
+                await self.post_run()
+            elif op == "list_assets":
+                await self.list_assets(state)
+            else:
+                await getattr(self, op)(rng)
+
+    async def mixed(self, clients: int, duration: float, warmup: float) -> float:
+        start = time.perf_counter()
+        deadline = start + warmup + duration
+        tasks = [asyncio.create_task(self._client_loop(k, deadline)) for k in range(clients)]
+        await asyncio.sleep(warmup)
+        self.recording = True
+        t0 = time.perf_counter()
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - t0
+
+    async def export_import(self, rounds: int, n_assets: int) -> float:
+        self.recording = True
+        t0 = time.perf_counter()
+        for k in range(rounds):
+            ids = self.asset_ids[k * n_assets % max(len(self.asset_ids), 1):][:n_assets] or self.asset_ids[:n_assets]
+            resp = await self._call("export", "POST", "/exports", json={"asset_ids": ids, "include_binaries": True})
+            if resp is None or resp.status_code != 200:
+                continue
+            await self._call("import", "POST", "/imports", json={"export_id": resp.json()["export_id"]})
+        return time.perf_counter() - t0
+
+    async def run_statuses(self, limit: int = 200) -> Dict[str, int]:
+        """Final status histogram of (up to `limit` of) the runs this test created."""
+        out: Counter = Counter()
+        for run_id in self.run_ids[-limit:]:
+            r = await self.client.get(f"/runs/{run_id}")
+            out[r.json().get("status", "unknown") if r.status_code == 200 else str(r.status_code)] += 1
+        return dict(sorted(out.items()))
+
+
+# ---- targets
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, env=os.environ.copy(), stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def _run(args: argparse.Namespace, mix: Dict[str, float], base_url: Optional[str]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.clients + 4)
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout, limits=limits)
+    async with client:
+        lt = LoadTest(client, mix, args.seed)
+        await lt.prime()
+        mixed_s = await lt.mixed(args.clients, args.duration, args.warmup)
+        mixed_ops = {op: lt.samples.pop(op) for op in list(lt.samples)}
+        export_s = await lt.export_import(args.export_rounds, args.export_assets) if args.export_rounds > 0 else 0.0
+        statuses = await lt.run_statuses()
+
+    endpoints = {ENDPOINTS[op]: summarize(s, mixed_s) for op, s in sorted(mixed_ops.items())}
+    endpoints.update({ENDPOINTS[op]: summarize(s, export_s) for op, s in sorted(lt.samples.items())})
+    total = Samples()
+    for s in mixed_ops.values():
+        total.latencies_ms += s.latencies_ms
+        total.status.update(s.status)
+        total.errors += s.errors
+    return {"endpoints": endpoints, "mixed_total": summarize(total, mixed_s), "runs_created": len(lt.run_ids),
+            "run_status_sample": statuses}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = ap.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server")
+    target.add_argument("--serve", action="store_true", help="start uvicorn for the duration of the test")
+    ap.add_argument("--server-workers", type=int, default=1)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=30.0, help="recorded seconds of the mixed phase")
+    ap.add_argument("--warmup", type=float, default=3.0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    ap.add_argument("--seed", type=int, default=1, help="client operation / id choice seed")
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--export-rounds", type=int, default=3)
+    ap.add_argument("--export-assets", type=int, default=50)
+    ap.add_argument("--mock-latency", help="MOCK_PROVIDER_LATENCY, e.g. fixed:200 | lognormal:800,0.6")
+    ap.add_argument("--mock-artifact-bytes", type=int, help="MOCK_PROVIDER_ARTIFACT_BYTES")
+    ap.add_argument("--mock-failure-rate", type=float, help="MOCK_PROVIDER_FAILURE_RATE (0..1)")
+    ap.add_argument("--out", help="write the JSON result here")
+    args = ap.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        parse_latency(args.mock_latency)
+    except ValueError as e:
+        print(f"[err] {e}", file=sys.stderr)
+        return 2
+    knobs = {
+        "MOCK_PROVIDER_LATENCY": args.mock_latency,
+        "MOCK_PROVIDER_ARTIFACT_BYTES": args.mock_artifact_bytes,
+        "MOCK_PROVIDER_FAILURE_RATE": args.mock_failure_rate,
+    }
+    if args.url and any(v is not None for v in knobs.values()):
+        print("[warn] --mock-* flags do not reach a server started elsewhere (--url)", file=sys.stderr)
+    for k, v in knobs.items():
+        if v is not None:
+            os.environ[k] = str(v)
+    if not args.url:
+        os.environ.setdefault("APP_DB_PATH", str(get_sqlite_path()))
+        os.environ.setdefault("APP_STORAGE_ROOT", str(get_storage_root()))
+        os.environ.setdefault("APP_EXPORTS_ROOT", tempfile.mkdtemp(prefix="load_test_exports_"))
+
+    proc = None
+    base_url = args.url
+    if args.serve:
+        proc, base_url = _start_server(args.server_workers)
+    started = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    try:
+        result = asyncio.run(_run(args, mix, base_url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=15)
+        if not base_url:
+            from app.modules.runs.executor import shutdown_executor
+
+            shutdown_executor()
+
+    report = {
+        "result_version": RESULT_VERSION,
+        "started_at": started,
+        "git_rev": _git_rev(),
+        "target": "uvicorn" if args.serve else ("url" if args.url else "inprocess"),
+        "python": platform.python_version(),
+        "config": {
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+            "export_rounds": args.export_rounds,
+            "export_assets": args.export_assets,
+            "server_workers": args.server_workers if args.serve else None,
+            "mock_provider": {k: os.environ.get(k) for k in knobs},
+            "run_executor_mode": os.environ.get("RUN_EXECUTOR_MODE") or "queue",
+        },
+        **result,
+    }
+    out = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(out + "\n", encoding="utf-8")
+    print(out)
+    failed = sum(e["errors"] for e in result["endpoints"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
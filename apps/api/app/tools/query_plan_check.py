@@ -0,0 +1,329 @@
+"""
+Query-plan regression check over every statement the services actually issue.
+
+Usage (from apps/api; needs httpx for fastapi.testclient):
+    python -m app.tools.query_plan_check --db PATH [--rows 5000] [--large 1000] [--json OUT]
+
+--db is a database migrated to head; it is copied to a scratch directory, seeded
+with --rows synthetic assets (plus shots, links, characters, profiles in
+proportion) and never modified itself. A scripted API scenario then runs
+in-process with a sqlite trace callback on every pooled connection
+(app.core.db.set_statement_tracer). Each distinct statement (literals folded to
+?) is explained once. The check fails on:
+
+- USE TEMP B-TREE (a sort or DISTINCT an index should have served)
+- a full SCAN of a large table (>= --large rows), or a full index walk of one
+  by a statement without LIMIT
+
+unless the statement matches ALLOWED. Small-table scans are reported as warnings.
+Exit code 1 on any failure.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.tools.query_plans import explain
+
+# (pattern over the normalized statement, reason it may keep its plan)
+ALLOWED: List[Tuple[str, str]] = [
+    (r"^INSERT OR REPLACE INTO run_status_current", "one-time projection rebuild from run_events"),
+    (r"FROM links WHERE \(src_type = \? AND src_id = \?\) OR \(dst_type = \? AND dst_id = \?\)",
+     "asset traceability: two index lookups merged by rowid (docs/QUERY_PLANS.md)"),
+]
+
+_SKIP_PREFIXES = (
+    "BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA",
+    "CREATE", "ALTER", "DROP", "ANALYZE", "EXPLAIN", "VACUUM", "--",
+)
+
+_STR_LIT = re.compile(r"'(?:[^']|'')*'")
+_NUM_LIT = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"IN \((?:\?\s*,\s*)+\?\)")
+_WS = re.compile(r"\s+")
+
+
+def normalize(sql: str) -> str:
+    s = _STR_LIT.sub("?", sql)
+    s = _NUM_LIT.sub("?", s)
+    s = _WS.sub(" ", s).strip().rstrip(";").strip()
+    s = s.replace("( ", "(").replace(" )", ")")
+    return _IN_LIST.sub("IN (?, ...)", s)
+
+
+class StatementLog:
+    """Thread-safe sqlite trace sink: one sample (expanded SQL) per normalized statement."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {}
+
+    def __call__(self, sql: str) -> None:
+        head = sql.lstrip()[:16].upper()
+        if head.startswith(_SKIP_PREFIXES) or "sqlite_master" in sql:
+            return
+        key = normalize(sql)
+        with self._lock:
+            self.samples.setdefault(key, sql)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+@dataclass
+class Finding:
+    statement: str
+    calls: int
+    plan: List[str]
+    status: str  # ok | warn | allowed | FAIL
+    problems: List[str] = field(default_factory=list)
+    reason: Optional[str] = None
+
+
+def _scan_target(line: str) -> Optional[str]:
+    m = re.match(r"SCAN (\w+)", line)
+    return m.group(1) if m else None
+
+
+def judge(statement: str, plan: Sequence[str], large: Dict[str, int]) -> Tuple[str, List[str], List[str]]:
+    """Returns (status, failures, warnings) for one plan."""
+    fails: List[str] = []
+    warns: List[str] = []
+    has_limit = " LIMIT " in f" {statement.upper()} "
+    for line in plan:
+        if line.startswith("ERROR "):
+            fails.append(line)
+        elif "USE TEMP B-TREE" in line:
+            fails.append(line)
+        else:
+            t = _scan_target(line)
+            if t is None or "CONSTANT ROW" in line:
+                continue
+            if t in large and " USING " not in line:
+                fails.append(f"{line} ({large[t]} rows)")
+            elif t in large and not has_limit:
+                fails.append(f"{line} without LIMIT ({large[t]} rows)")
+            elif " USING " not in line:
+                warns.append(line)
+    if fails:
+        return "FAIL", fails, warns
+    return ("warn" if warns else "ok"), fails, warns
+
+
+# -------------------------
+# seed + scenario
+# -------------------------
+def _ts(i: int) -> str:
+    # one second apart, lexicographically ordered like service timestamps
+    return f"2025-01-{1 + i // 86400:02d}T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}Z"
+
+
+def seed(path: Path, rows: int) -> None:
+    """Bulk synthetic rows so that large tables are actually large (plain INSERTs; triggers apply)."""
+    con = sqlite3.connect(str(path))
+    try:
+        projects = [f"seed-project-{p}" for p in range(10)]
+        con.executemany("INSERT INTO projects (id, name, created_at) VALUES (?,?,?)",
+                        [(p, p, _ts(0)) for p in projects])
+        series = [(f"seed-series-{p}-{s}", projects[p]) for p in range(10) for s in range(2)]
+        con.executemany("INSERT INTO series (id, project_id, name, created_at) VALUES (?,?,?,?)",
+                        [(sid, pid, sid, _ts(0)) for sid, pid in series])
+        con.executemany(
+            "INSERT INTO assets (id, kind, uri, mime_type, created_at, deleted_at, project_id, series_id) "
+            "VALUES (?,?,?,?,?,?,?,?)",
+            [
+                (f"seed-asset-{i:07d}", "image", f"seed/{i}.png", "image/png", _ts(i),
+                 _ts(i + 1) if i % 10 == 0 else None, series[i % 20][1], series[i % 20][0])
+                for i in range(rows)
+            ],
+        )
+        n_shots = max(rows // 5, 1)
+        con.executemany(
+            "INSERT INTO shots (id, project_id, series_id, name, created_at) VALUES (?,?,?,?,?)",
+            [(f"seed-shot-{i:07d}", series[i % 20][1], series[i % 20][0], f"shot {i}", _ts(i)) for i in range(n_shots)],
+        )
+        con.executemany(
+            "INSERT INTO links (id, src_type, src_id, dst_type, dst_id, rel, created_at) VALUES (?,?,?,?,?,?,?)",
+            [
+                (f"seed-link-{i:07d}-{k}", "shot", f"seed-shot-{i:07d}", "asset",
+                 f"seed-asset-{(i * 3 + k) % rows:07d}", "uses", _ts(i + k))
+                for i in range(n_shots) for k in range(3)
+            ],
+        )
+        statuses = ("draft", "confirmed", "archived")
+        con.executemany(
+            "INSERT INTO characters (id, name, status, active_ref_set_id, created_at, updated_at) VALUES (?,?,?,?,?,?)",
+            [(f"seed-char-{i:07d}", f"char {i}", statuses[i % 3], None, _ts(i), _ts(i + 5))
+             for i in range(max(rows // 20, 1))],
+        )
+        con.executemany(
+            "INSERT INTO provider_profiles (id, name, provider_type, config_json, secrets_redaction_policy_json, "
+            "is_global_default, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?)",
+            [(f"seed-profile-{i:04d}", f"profile {i}", "mock", "{}", "{}", 0, _ts(i), _ts(i)) for i in range(20)],
+        )
+        con.commit()
+    finally:
+        con.close()
+
+
+def run_scenario(client) -> None:
+    """Touch every hot endpoint at least once (list pages, cursors, counts, details, writes)."""
+
+    def ok(resp, code: int = 200):
+        if resp.status_code != code:
+            raise RuntimeError(f"{resp.request.method} {resp.request.url}: {resp.status_code} {resp.text[:300]}")
+        return resp.json()
+
+    ok(client.get("/health"))
+    ok(client.post("/provider_profiles", json={
+        "name": "qp-default", "provider_type": "mock", "config": {}, "set_global_default": True,
+    }))
+    page = ok(client.get("/provider_profiles?limit=5"))
+    ok(client.get(f"/provider_profiles?limit=5&cursor={page['page']['next_cursor']}"))
+
+    pack = {"raw_input": "qp", "final_prompt": "qp", "assembly_used": False}
+    r_off = ok(client.post("/runs", json={"run_type": "t2i", "prompt_pack": pack}))
+    ok(client.get(f"/runs/{r_off['run_id']}"))
+    run_ids = []
+    for _ in range(3):
+        r = ok(client.post("/runs", json={"run_type": "t2i", "prompt_pack": pack}, headers={"X-Provider-Enabled": "1"}))
+        run_ids.append(r["run_id"])
+    for rid in run_ids:
+        ok(client.get(f"/runs/{rid}"))
+    ok(client.post("/reviews", json={"run_id": r_off["run_id"], "review_type": "manual", "conclusion": "pass"}))
+
+    for q in ("", "?count=estimate", "?count=none", "?include_deleted=true"):
+        page = ok(client.get(f"/assets{q}"))
+        sep = "&" if q else "?"
+        ok(client.get(f"/assets{q}{sep}cursor={page['page']['next_cursor']}"))
+    ok(client.get("/assets?offset=1000&limit=50"))
+    assets = ok(client.get("/assets?limit=20"))["items"]
+    ok(client.get(f"/assets/{assets[0]['id']}"))
+
+    for q in ("", "?status=draft", "?status=confirmed&count=estimate"):
+        page = ok(client.get(f"/characters{q}"))
+        if page["page"]["next_cursor"]:
+            sep = "&" if q else "?"
+            ok(client.get(f"/characters{q}{sep}cursor={page['page']['next_cursor']}"))
+    ch = ok(client.post("/characters", json={"name": "qp"}))
+    rs = ok(client.post(f"/characters/{ch['id']}/ref_sets", json={"status": "draft"}))
+    for a in assets[:8]:
+        ok(client.post(f"/characters/{ch['id']}/ref_sets/{rs['id']}/refs", json={"asset_id": a["id"]}))
+    rs2 = ok(client.post(f"/characters/{ch['id']}/ref_sets", json={"status": "confirmed", "base_ref_set_id": rs["id"]}))
+    ok(client.get(f"/characters/{ch['id']}"))
+    ok(client.get(f"/characters/{ch['id']}/ref_sets/{rs2['id']}"))
+    ok(client.post("/runs", json={
+        "run_type": "t2i", "prompt_pack": pack, "characters": [{"character_id": ch["id"], "is_primary": True}],
+    }))
+
+    for q in ("", "?project_id=seed-project-1", "?series_id=seed-series-2-1", "?project_id=seed-project-2&count=none"):
+        page = ok(client.get(f"/shots{q}"))
+        sep = "&" if q else "?"
+        if page["page"]["next_cursor"]:
+            ok(client.get(f"/shots{q}{sep}cursor={page['page']['next_cursor']}"))
+    shot_id = "seed-shot-0000001"
+    link = ok(client.post(f"/shots/{shot_id}/links", json={"dst_type": "asset", "dst_id": assets[1]["id"], "rel": "uses"}))
+    ok(client.get(f"/shots/{shot_id}"))
+    ok(client.delete(f"/shots/{shot_id}/links/{link['link_id']}"))
+
+    ok(client.delete(f"/assets/{assets[-1]['id']}"))
+    ok(client.post("/trash/empty"))
+
+
+def _table_sizes(path: Path) -> Dict[str, int]:
+    con = sqlite3.connect(str(path))
+    try:
+        names = [r[0] for r in con.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        return {n: int(con.execute(f"SELECT COUNT(1) FROM {n}").fetchone()[0]) for n in names}
+    finally:
+        con.close()
+
+
+def check(db: Path, rows: int, large_threshold: int) -> List[Finding]:
+    work = Path(tempfile.mkdtemp(prefix="qpcheck-"))
+    path = work / "app.db"
+    shutil.copyfile(db, path)
+    seed(path, rows)
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{path.as_posix()}"
+    os.environ["APP_DB_PATH"] = str(path)
+    os.environ["STORAGE_ROOT"] = str(work / "storage")
+    os.environ["APP_STORAGE_ROOT"] = str(work / "storage")
+    os.environ.setdefault("RUN_EXECUTOR_MODE", "inline")
+
+    from fastapi.testclient import TestClient
+
+    from app.core.db import connect, set_statement_tracer
+    from app.main import app
+
+    log = StatementLog()
+    set_statement_tracer(log)
+    try:
+        with TestClient(app) as client:
+            run_scenario(client)
+    finally:
+        set_statement_tracer(None)
+
+    sizes = _table_sizes(path)
+    large = {t: n for t, n in sizes.items() if n >= large_threshold}
+
+    findings: List[Finding] = []
+    conn = connect(path)
+    try:
+        for key, sample in sorted(log.samples.items()):
+            try:
+                plan = explain(conn, sample)
+            except sqlite3.Error as e:
+                plan = [f"ERROR {type(e).__name__}: {e}"]
+            status, fails, warns = judge(key, plan, large)
+            f = Finding(statement=key, calls=log.counts[key], plan=plan, status=status, problems=fails + warns)
+            if status == "FAIL":
+                for pattern, reason in ALLOWED:
+                    if re.search(pattern, key):
+                        f.status, f.reason = "allowed", reason
+                        break
+            findings.append(f)
+    finally:
+        conn.close()
+    shutil.rmtree(work, ignore_errors=True)
+    return findings
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="query-plan regression check over captured service SQL")
+    ap.add_argument("--db", required=True, help="sqlite file migrated to head (copied, never modified)")
+    ap.add_argument("--rows", type=int, default=5000, help="synthetic assets to seed (default 5000)")
+    ap.add_argument("--large", type=int, default=1000, help="row count from which a table counts as large")
+    ap.add_argument("--json", help="write findings as JSON to this path")
+    args = ap.parse_args(argv)
+
+    findings = check(Path(args.db), args.rows, args.large)
+
+    failed = 0
+    for f in findings:
+        failed += int(f.status == "FAIL")
+        print(f"[{f.status}] x{f.calls} {f.statement[:160]}")
+        if f.status != "ok":
+            for line in f.plan:
+                print(f"        {line}")
+            if f.reason:
+                print(f"        allowed: {f.reason}")
+    print(f"[info] statements={len(findings)} failed={failed}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps([asdict(f) for f in findings], ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
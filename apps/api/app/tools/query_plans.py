@@ -0,0 +1,202 @@
+"""
+EXPLAIN QUERY PLAN report for the hot service queries.
+
+Usage (from apps/api, against a database migrated to head):
+    python -m app.tools.query_plans [--db PATH] [--report ../../docs/QUERY_PLANS.md]
+
+Each query below is the statement a service issues on a hot path, built from the
+same KeysetOrder / filters the service uses. A plan is flagged when it contains a
+full table scan ("SCAN <table>" without an index) or "USE TEMP B-TREE".
+Exit code 1 when any hot query is flagged.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.db import connect, get_sqlite_path
+from app.modules.assets.service import ASSETS_ORDER
+from app.modules.characters.service import CHARACTERS_ORDER
+from app.modules.provider_profiles.service import PROFILES_ORDER
+from app.modules.runs.leases import CLAIM_SQL as RUN_LEASES_CLAIM_SQL
+from app.modules.runs.service import _ensure_run_events_table
+from app.modules.shots.router import SHOTS_ORDER
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    source: str  # endpoint / function issuing it
+    sql: str
+    params: Tuple = ()
+    # documented exception: why a flagged plan is acceptable (bounded row count, etc.)
+    allow: Optional[str] = None
+
+
+def _keyset(table: str, order, where: str = "") -> str:
+    pred, _ = order.after(["x"] * len(order.columns))
+    conds = [c for c in (where, pred) if c]
+    return f"SELECT * FROM {table} WHERE {' AND '.join(conds)} ORDER BY {order.order_by()} LIMIT ?"
+
+
+def _params(n: int) -> Tuple:
+    return tuple("x" for _ in range(n))
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("assets.page", "GET /assets",
+             f"SELECT * FROM assets WHERE deleted_at IS NULL ORDER BY {ASSETS_ORDER.order_by()} LIMIT ? OFFSET ?", (51, 0)),
+    HotQuery("assets.page.cursor", "GET /assets?cursor=",
+             _keyset("assets", ASSETS_ORDER, "deleted_at IS NULL"), _params(3)),
+    HotQuery("assets.page.cursor.include_deleted", "GET /assets?include_deleted=true&cursor=",
+             _keyset("assets", ASSETS_ORDER), _params(3)),
+    HotQuery("assets.trash", "POST /trash/empty",
+             "SELECT * FROM assets WHERE deleted_at IS NOT NULL"),
+    HotQuery("characters.page", "GET /characters",
+             f"SELECT * FROM characters ORDER BY {CHARACTERS_ORDER.order_by()} LIMIT ? OFFSET ?", (51, 0)),
+    HotQuery("characters.page.status.cursor", "GET /characters?status=&cursor=",
+             _keyset("characters", CHARACTERS_ORDER, "status=?"), _params(4)),
+    HotQuery("character_ref_sets.by_character", "GET /characters/{id}",
+             "SELECT * FROM character_ref_sets WHERE character_id=? ORDER BY version DESC, created_at DESC;", _params(1)),
+    HotQuery("characters.by_ids", "POST /runs (resolve_characters)",
+             "SELECT * FROM characters WHERE id IN (?,?,?)", _params(3)),
+    HotQuery("character_ref_sets.by_ids", "POST /runs (resolve_characters, unconfirmed or uncached)",
+             "SELECT * FROM character_ref_sets WHERE id IN (?,?,?)", _params(3)),
+    HotQuery("links.ref_set_refs", "GET /characters/{id}/ref_sets/{id}",
+             "SELECT dst_id AS asset_id FROM links WHERE src_type=? AND src_id=? AND dst_type=? AND rel=? ORDER BY rowid ASC;",
+             _params(4)),
+    HotQuery("links.ref_set_count", "characters._refs_count",
+             "SELECT COUNT(1) AS n FROM links WHERE src_type=? AND src_id=? AND dst_type=? AND rel=?;", _params(4)),
+    HotQuery("links.ref_set_dedup", "POST /characters/{id}/ref_sets/{id}/refs",
+             "SELECT id FROM links WHERE src_type=? AND src_id=? AND dst_type=? AND dst_id=? AND rel=? ORDER BY rowid DESC LIMIT 1;",
+             _params(5)),
+    HotQuery("shots.page", "GET /shots",
+             f"SELECT id, project_id, series_id, name, created_at FROM shots ORDER BY {SHOTS_ORDER.order_by()} LIMIT ? OFFSET ?",
+             (51, 0)),
+    HotQuery("shots.page.project.cursor", "GET /shots?project_id=&cursor=",
+             _keyset("shots", SHOTS_ORDER, "project_id = ?"), _params(4)),
+    HotQuery("shots.page.series.cursor", "GET /shots?series_id=&cursor=",
+             _keyset("shots", SHOTS_ORDER, "series_id = ?"), _params(4)),
+    HotQuery("links.shot_refs", "GET /shots/{id}",
+             "SELECT id, dst_type, dst_id, rel, created_at FROM links WHERE src_type=? AND src_id=? ORDER BY created_at ASC",
+             _params(2)),
+    HotQuery("links.run_trace", "GET /assets/{id} (trace chain)",
+             "SELECT * FROM links WHERE src_type=? AND src_id=? ORDER BY rowid DESC LIMIT 200", _params(2)),
+    HotQuery("links.asset_traceability", "GET /assets/{id}",
+             "SELECT * FROM links WHERE (src_type = ? AND src_id = ?) OR (dst_type = ? AND dst_id = ?) "
+             "ORDER BY rowid DESC LIMIT 200", _params(4),
+             allow="two index lookups merged by rowid; sort input is the asset's own links"),
+    HotQuery("provider_profiles.page", "GET /provider_profiles",
+             f"SELECT * FROM provider_profiles ORDER BY {PROFILES_ORDER.order_by()} LIMIT ? OFFSET ?", (51, 0)),
+    HotQuery("provider_profiles.global_default", "provider_profiles.get_global_default_provider_profile",
+             "SELECT * FROM provider_profiles WHERE is_global_default=1 ORDER BY updated_at DESC LIMIT 1"),
+    HotQuery("provider_profiles.resolve_default", "POST /runs (resolve_provider_profile, cache miss)",
+             "SELECT * FROM provider_profiles WHERE is_global_default=1 ORDER BY updated_at DESC, created_at DESC LIMIT 1"),
+    HotQuery("provider_profiles.resolve_fallback", "POST /runs (resolve_provider_profile, cache miss)",
+             "SELECT * FROM provider_profiles ORDER BY updated_at DESC, created_at DESC LIMIT 50"),
+    HotQuery("runs.get", "GET /runs/{id}", "SELECT * FROM runs WHERE id=? LIMIT 1;", _params(1)),
+    HotQuery("run_status_current.get", "GET /runs/{id}",
+             "SELECT status, result_refs_json, seq FROM run_status_current WHERE run_id=?;", _params(1)),
+    HotQuery("list_counters.get", "list totals (count=exact)",
+             "SELECT n FROM list_counters WHERE scope=? AND key=?;", _params(2)),
+    HotQuery("idempotency_keys.claim", "create endpoints with Idempotency-Key",
+             "SELECT * FROM idempotency_keys WHERE scope=? AND key=?;", _params(2)),
+    HotQuery("idempotency_keys.purge", "idempotency._maybe_purge",
+             "DELETE FROM idempotency_keys WHERE expires_at < ?;", _params(1)),
+    HotQuery("run_result_cache.lookup", "runs executor (RUN_RESULT_CACHE=1)",
+             "SELECT * FROM run_result_cache WHERE cache_key=?;", _params(1)),
+    HotQuery("run_result_cache.evict_lru", "result_cache._maybe_evict",
+             "SELECT cache_key FROM run_result_cache ORDER BY last_used_at ASC LIMIT ?", (1,)),
+    HotQuery("prompt_packs.intern", "POST /runs (RUN_INTERNING=1)",
+             "SELECT id FROM prompt_packs WHERE digest=? AND content=? ORDER BY rowid LIMIT 1;", _params(2)),
+    HotQuery("provider_profile_snapshots.get", "GET /assets/{id} (trace chain, interned snapshot)",
+             "SELECT snapshot_json FROM provider_profile_snapshots WHERE digest=?;", _params(1)),
+    HotQuery("cache_versions.get", "POST /runs (cached resolve_provider_profile)",
+             "SELECT version FROM cache_versions WHERE name=?;", ("provider_profiles",)),
+    HotQuery("run_leases.claim", "app.tools.run_worker (leases.claim)",
+             RUN_LEASES_CLAIM_SQL, _params(3)),
+    HotQuery("run_leases.renew", "app.tools.run_worker heartbeat (leases.renew)",
+             "UPDATE run_leases SET heartbeat_at=?, lease_expires_at=? WHERE worker_id=?;", _params(3)),
+]
+
+
+def flagged(plan: Sequence[str]) -> List[str]:
+    """Plan lines that indicate a full table scan or a sort into a temp b-tree."""
+    bad = []
+    for line in plan:
+        if line.startswith("ERROR ") or "USE TEMP B-TREE" in line:
+            bad.append(line)
+        elif line.startswith("SCAN ") and " USING " not in line and "CONSTANT ROW" not in line:
+            bad.append(line)
+    return bad
+
+
+def explain(conn, sql: str, params: Sequence = ()) -> List[str]:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params)).fetchall()
+    return [str(r[3]) for r in rows]
+
+
+def collect(conn) -> List[Tuple[HotQuery, List[str], List[str]]]:
+    out = []
+    for q in HOT_QUERIES:
+        try:
+            plan = explain(conn, q.sql, q.params)
+        except Exception as e:  # table missing in this database
+            plan = [f"ERROR {type(e).__name__}: {e}"]
+        out.append((q, plan, flagged(plan)))
+    return out
+
+
+def render(results, db_label: str) -> str:
+    now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    lines = [
+        "# Hot Query Plans",
+        "",
+        f"Generated by `python -m app.tools.query_plans` (apps/api) on {now} against {db_label}.",
+        "Indexes: migrations 0005_list_keyset_indexes, 0007_hot_query_indexes, 0008_idempotency_keys, 0009_run_result_cache and 0012_run_leases.",
+        "Flagged = full table scan or `USE TEMP B-TREE`.",
+        "",
+        "| query | source | result |",
+        "|---|---|---|",
+    ]
+    for q, _plan, bad in results:
+        verdict = "ok" if not bad else (f"accepted: {q.allow}" if q.allow else "**FLAGGED**")
+        lines.append(f"| `{q.name}` | {q.source} | {verdict} |")
+    lines.append("")
+    for q, plan, _bad in results:
+        lines += [f"## {q.name}", "", "```sql", q.sql, "```", "", "```"] + plan + ["```", ""]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", help="sqlite file (default: DATABASE_URL)")
+    ap.add_argument("--report", help="write a markdown report to this path")
+    args = ap.parse_args(argv)
+
+    path = Path(args.db) if args.db else get_sqlite_path()
+    conn = connect(path)
+    try:
+        _ensure_run_events_table(conn)
+        results = collect(conn)
+    finally:
+        conn.close()
+
+    failures = 0
+    for q, plan, bad in results:
+        status = "ok" if not bad else ("allowed" if q.allow else "FLAGGED")
+        failures += int(bool(bad) and not q.allow)
+        print(f"[{status}] {q.name}: {' | '.join(plan)}")
+
+    if args.report:
+        Path(args.report).write_text(render(results, "a freshly migrated database"), encoding="utf-8")
+        print(f"[info] report written: {args.report}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
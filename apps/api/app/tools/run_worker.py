@@ -0,0 +1,212 @@
+"""
+Standalone run workers: claim runs queued in run_leases and execute them.
+
+Usage (from apps/api, next to uvicorn started with RUN_EXECUTOR_MODE=workers and
+the same DATABASE_URL / STORAGE_ROOT / provider env; any host sharing both works):
+    python -m app.tools.run_worker [--processes N] [--threads 4] [--poll 0.5] [--drain]
+
+- --processes: worker processes (default: CPU count); each claims on its own
+- --threads: runs executed at once per process (default RUN_WORKERS, else 4)
+- --poll: seconds to wait after finding nothing to claim (jittered; default 0.5)
+- --drain: exit once run_leases is empty (batch jobs, gates)
+
+Each process has one worker id (host:pid:suffix) and a heartbeat thread that
+extends all of its leases every RUN_LEASE_S / 3. SIGTERM / SIGINT: stop
+claiming, finish the runs in hand, exit. A process killed outright leaves its
+leases to expire and another worker takes them over (runs/leases.py).
+Runs go through executor.execute_run, so the result cache, breaker / hedging
+and provider runtime settings behave as in the API process.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence
+
+from app.core.db import connect
+from app.core.env import env_int
+from app.modules.runs import leases
+from app.modules.runs.executor import RunJob, execute_run
+from app.modules.runs.providers.registry import shutdown_runtimes
+
+
+def _emit(level: str, event: str, message: str, request_id: Optional[str] = None, **extra: Any) -> None:
+    payload = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "level": level,
+        "message": message,
+        "request_id": request_id,
+        "event": event,
+        "module": __name__,
+    }
+    payload.update(extra)
+    print(json.dumps(payload, ensure_ascii=False), flush=True)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkerProcess:
+    """`threads` claim loops plus one heartbeat thread, all under one worker id."""
+
+    def __init__(self, threads: int, poll_s: float, drain: bool) -> None:
+        self.worker_id = _worker_id()
+        self.threads = max(threads, 1)
+        self.poll_s = max(poll_s, 0.01)
+        self.drain = drain
+        self.stopping = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _heartbeat(self) -> None:
+        # keeps going after stopping is set: runs in hand still need their leases
+        every = max(leases.lease_s() / 3.0, 0.1)
+        while not self._done.wait(every):
+            try:
+                conn = connect()
+                try:
+                    leases.renew(conn, self.worker_id)
+                finally:
+                    conn.close()
+            except Exception as e:
+                _emit("warn", "runs.lease.heartbeat_failed", str(e), worker_id=self.worker_id, type=type(e).__name__)
+
+    def _queue_empty(self) -> bool:
+        conn = connect()
+        try:
+            return conn.execute("SELECT 1 FROM run_leases LIMIT 1;").fetchone() is None
+        finally:
+            conn.close()
+
+    def _loop(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                conn = connect()
+                try:
+                    lease = leases.claim(conn, self.worker_id)
+                finally:
+                    conn.close()
+            except Exception as e:
+                # e.g. database locked past the busy timeout; try again after a pause
+                _emit("warn", "runs.lease.claim_failed", str(e), worker_id=self.worker_id, type=type(e).__name__)
+                lease = None
+            if lease is None:
+                if self.drain and self._queue_empty():
+                    return
+                self.stopping.wait(self.poll_s * random.uniform(0.5, 1.5))
+                continue
+            self._run(lease)
+
+    def _run(self, lease: leases.Lease) -> None:
+        job = RunJob(run_id=lease.run_id, input=lease.input, request_id=lease.request_id)
+        try:
+            self._count(execute_run(job).status)
+        except Exception as e:
+            # a provider error is already recorded as a `failed` run event
+            self._count("failed")
+            _emit("error", "runs.execute.failed", str(e), job.request_id, run_id=job.run_id,
+                  worker_id=self.worker_id, type=type(e).__name__)
+        try:
+            conn = connect()
+            try:
+                if not leases.finish(conn, lease):
+                    self._count("lease_lost")
+                    _emit("warn", "runs.lease.lost", "lease taken over before the run finished", job.request_id,
+                          run_id=job.run_id, worker_id=self.worker_id, attempt=lease.attempt)
+            finally:
+                conn.close()
+        except Exception as e:
+            # the lease expires and the run is claimed again
+            _emit("error", "runs.lease.finish_failed", str(e), job.request_id, run_id=job.run_id,
+                  worker_id=self.worker_id, type=type(e).__name__)
+
+    def run(self) -> None:
+        conn = connect()
+        try:
+            leases.ensure_tables(conn)
+        finally:
+            conn.close()
+        _emit("info", "runs.worker.started", f"threads={self.threads}", worker_id=self.worker_id, threads=self.threads)
+        hb = threading.Thread(target=self._heartbeat, name="run-lease-heartbeat", daemon=True)
+        hb.start()
+        loops: List[threading.Thread] = []
+        for i in range(self.threads):
+            t = threading.Thread(target=self._loop, name=f"run-lease-worker-{i}", daemon=True)
+            t.start()
+            loops.append(t)
+        try:
+            for t in loops:
+                # join with a timeout so signals reach the main thread
+                while t.is_alive():
+                    t.join(timeout=0.5)
+        finally:
+            self._done.set()
+            hb.join(timeout=5.0)
+            shutdown_runtimes()
+            _emit("info", "runs.worker.stopped", " ".join(f"{k}={v}" for k, v in sorted(self.counts.items())),
+                  worker_id=self.worker_id, counts=dict(self.counts))
+
+
+def serve(threads: int, poll_s: float, drain: bool) -> int:
+    """One worker process (the caller's): runs until drained or signalled."""
+    w = WorkerProcess(threads, poll_s, drain)
+
+    def stop(signum: int, _frame: Any) -> None:
+        w.stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    w.run()
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--threads", type=int, default=env_int("RUN_WORKERS", 4))
+    ap.add_argument("--poll", type=float, default=0.5)
+    ap.add_argument("--drain", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.processes <= 1:
+        return serve(args.threads, args.poll, args.drain)
+
+    # spawn: children start clean (no inherited pooled connections or threads)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=serve, args=(args.threads, args.poll, args.drain), name=f"run-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+
+    def forward(signum: int, _frame: Any) -> None:
+        for p in procs:
+            if p.is_alive() and p.pid is not None:
+                os.kill(p.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for p in procs:
+        p.join()
+    return 1 if any(p.exitcode for p in procs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
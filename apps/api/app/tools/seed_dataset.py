@@ -0,0 +1,489 @@
+"""
+Deterministic synthetic dataset for local performance testing.
+
+Usage (from apps/api, against a freshly migrated database):
+    python -m app.tools.seed_dataset --db PATH [--storage-root DIR] [--seed 1]
+        [--preset small|medium|large] [--assets N] [--links N] [--runs N]
+        [--characters N] [--shots N] [--projects N] [--manifest OUT.json]
+
+`--preset large` is production scale: 1M assets, 5M links, 500k runs (with
+run_events), 10k characters with versioned ref sets, 200k shots. Explicit
+counts override the preset.
+
+Same seed + same scale => the same rows (ids, timestamps, payloads) and the same
+storage blobs, so benchmark numbers are comparable across commits. Ids and
+timestamps are derived from (seed, entity, index) rather than from a shared RNG
+stream, so changing one count does not reshuffle the other entities.
+DATASET_VERSION is bumped whenever the generated content changes.
+
+Written the way the services write, never around them:
+- prompt_packs / runs / reviews / links / character_ref_sets are insert-only
+  (0002_core_entities append-only triggers stay active)
+- shot links are removed by appending rel = "unlink::<rel>" (latest event wins)
+- links.tombstone is filled (0) when the column exists, as characters does
+- run status lives in run_events (seq 1..n) and the run_status_current
+  projection is rebuilt from them; list_counters are kept by their triggers
+- only columns present in the target schema are written
+
+Blobs: --blobs distinct files of --blob-bytes under
+<storage-root>/seed/blobs/<aa>/<sha256>.bin, shared by assets and run results.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core import schema
+from app.core.db import dispose_pools, get_sqlite_path
+from app.core.storage import get_storage_root
+from app.modules.characters.service import (
+    MIN_REFS_CONFIRMED,
+    REL_HAS_REF_SET_VERSION,
+    REL_INCLUDES_REFERENCE_ASSET,
+    TYPE_ASSET,
+    TYPE_CHARACTER,
+    TYPE_REF_SET,
+)
+from app.modules.provider_profiles import cache as profile_cache
+from app.modules.runs.service import (
+    _encode_crockford,
+    _ensure_run_events_table,
+    rebuild_run_status_current,
+)
+from app.modules.shots.router import UNLINK_PREFIX
+
+DATASET_VERSION = 1
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+EPOCH_MS = int(EPOCH.timestamp() * 1000)
+SPAN_S = 365 * 24 * 3600  # every entity kind is spread over one year
+BATCH = 5000
+MAX_REF_SET_VERSIONS = 4
+
+RUN_TYPES = ("t2i", "i2i", "t2v", "i2v")
+ASSET_KINDS = (("image", "image/png"), ("image", "image/png"), ("image", "image/jpeg"), ("video", "video/mp4"))
+SHOT_RELS = (("asset", "uses_asset"), ("asset", "uses_asset"), ("character", "features_character"), ("run", "from_run"))
+
+
+@dataclass(frozen=True)
+class Scale:
+    projects: int
+    series_per_project: int
+    assets: int
+    shots: int
+    links: int  # total link rows, structural ones included; shots take the remainder
+    runs: int
+    characters: int
+    profiles: int = 8
+    blobs: int = 256
+    blob_bytes: int = 2048
+
+
+PRESETS: Dict[str, Scale] = {
+    "small": Scale(projects=5, series_per_project=4, assets=10_000, shots=2_000, links=50_000, runs=5_000, characters=100),
+    "medium": Scale(projects=20, series_per_project=5, assets=100_000, shots=20_000, links=500_000, runs=50_000,
+                    characters=1_000),
+    "large": Scale(projects=50, series_per_project=8, assets=1_000_000, shots=200_000, links=5_000_000, runs=500_000,
+                   characters=10_000, blobs=4096),
+}
+
+
+def _ts(sec: int) -> str:
+    return (EPOCH + timedelta(seconds=sec)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _Ids:
+    """
+    Random-access ids / creation times for entity #i of one kind, so relations can
+    point at any row without holding id lists in memory.
+    Entity i is created in slot i of `span` seconds (plus deterministic jitter);
+    ids are ULIDs whose time part matches created_at.
+    """
+
+    def __init__(self, seed: int, kind: str, n: int, span: int = SPAN_S, start: int = 0) -> None:
+        self.prefix = f"{seed}:{kind}:".encode("ascii")
+        self.step = max(span // max(n, 1), 1)
+        self.start = start
+
+    def _digest(self, i: int) -> bytes:
+        return hashlib.blake2b(self.prefix + str(i).encode("ascii"), digest_size=12).digest()
+
+    def sec(self, i: int) -> int:
+        return self.start + i * self.step + int.from_bytes(self._digest(i)[:2], "big") % self.step
+
+    def id(self, i: int, sec: Optional[int] = None) -> str:
+        d = self._digest(i)
+        ms = EPOCH_MS + (self.sec(i) if sec is None else sec) * 1000 + int.from_bytes(d[:2], "big") % 1000
+        return _encode_crockford((ms << 80) | int.from_bytes(d[2:], "big"), 26)
+
+
+class _Table:
+    """Batched executemany into one table, restricted to the columns this database has."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str, fields: Sequence[str]) -> None:
+        self.conn = conn
+        self.table = table
+        present = set(schema.columns(conn, table))
+        self.idx = [k for k, f in enumerate(fields) if f in present]
+        cols = [fields[k] for k in self.idx]
+        self.sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+        self.pending: List[Tuple[Any, ...]] = []
+        self.rows = 0
+
+    def add(self, *values: Any) -> None:
+        self.pending.append(tuple(values[k] for k in self.idx))
+        if len(self.pending) >= BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.conn.executemany(self.sql, self.pending)
+            self.conn.commit()
+            self.rows += len(self.pending)
+            self.pending = []
+
+
+def _json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+class DatasetBuilder:
+    def __init__(self, conn: sqlite3.Connection, storage_root: Path, seed: int, scale: Scale) -> None:
+        self.conn = conn
+        self.root = storage_root
+        self.seed = seed
+        self.scale = scale
+        self.tables: Dict[str, _Table] = {}
+        self.link_ids = _Ids(seed, "link", 1)
+        self.links_written = 0
+        self.blob_refs: List[Tuple[str, str]] = []  # (sha256, storage uri)
+        self.series: List[Tuple[str, str]] = []  # (project_id, series_id)
+        self.profiles: List[Dict[str, Any]] = []
+        self.active_ref_sets: List[Optional[str]] = []  # per character index
+
+        self.asset_ids = _Ids(seed, "asset", scale.assets)
+        self.char_ids = _Ids(seed, "character", scale.characters)
+        self.run_ids = _Ids(seed, "run", scale.runs)
+
+    # ---- plumbing
+
+    def _rng(self, kind: str) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}")
+
+    def _table(self, table: str, fields: Sequence[str]) -> Optional[_Table]:
+        if table not in self.tables:
+            if not schema.table_exists(self.conn, table):
+                return None
+            self.tables[table] = _Table(self.conn, table, fields)
+        return self.tables[table]
+
+    def _link(self, src_type: str, src_id: str, dst_type: str, dst_id: str, rel: str, sec: int) -> None:
+        t = self._table("links", ("id", "src_type", "src_id", "dst_type", "dst_id", "rel", "created_at", "tombstone"))
+        if t is None:
+            return
+        t.add(self.link_ids.id(self.links_written, sec), src_type, src_id, dst_type, dst_id, rel, _ts(sec), 0)
+        self.links_written += 1
+
+    def rows(self) -> Dict[str, int]:
+        return {name: t.rows for name, t in sorted(self.tables.items())}
+
+    # ---- entities
+
+    def blobs(self) -> None:
+        rng = self._rng("blob")
+        for _ in range(max(self.scale.blobs, 1)):
+            data = rng.randbytes(self.scale.blob_bytes)
+            sha = hashlib.sha256(data).hexdigest()
+            path = self.root / "seed" / "blobs" / sha[:2] / f"{sha}.bin"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not path.exists():
+                path.write_bytes(data)
+            self.blob_refs.append((sha, f"storage://seed/blobs/{sha[:2]}/{sha}.bin"))
+
+    def provider_profiles(self) -> None:
+        t = self._table("provider_profiles", (
+            "id", "name", "provider_type", "config_json", "secrets_redaction_policy_json",
+            "is_global_default", "created_at", "updated_at",
+        ))
+        if t is None:
+            return
+        ids = _Ids(self.seed, "provider_profile", self.scale.profiles, span=24 * 3600)
+        for i in range(self.scale.profiles):
+            sec = ids.sec(i)
+            pid = ids.id(i)
+            name = f"seed-profile-{i}"
+            t.add(pid, name, "mock", _json({"model": f"mock-{i}"}), _json({}), int(i == 0), _ts(sec), _ts(sec))
+            self.profiles.append({"id": pid, "name": name, "provider_type": "mock", "has_config": True})
+
+    def hierarchy(self) -> None:
+        tp = self._table("projects", ("id", "name", "created_at"))
+        ts = self._table("series", ("id", "project_id", "name", "created_at"))
+        if tp is None:
+            return
+        n = self.scale.projects
+        p_ids = _Ids(self.seed, "project", n, span=30 * 24 * 3600)
+        s_ids = _Ids(self.seed, "series", n * self.scale.series_per_project, span=60 * 24 * 3600)
+        for p in range(n):
+            pid = p_ids.id(p)
+            tp.add(pid, f"Project {p}", _ts(p_ids.sec(p)))
+            for s in range(self.scale.series_per_project):
+                k = p * self.scale.series_per_project + s
+                sid = s_ids.id(k)
+                if ts is not None:
+                    ts.add(sid, pid, f"Series {p}.{s}", _ts(s_ids.sec(k)))
+                    self.series.append((pid, sid))
+
+    def _placement(self, rng: random.Random) -> Tuple[Optional[str], Optional[str]]:
+        if not self.series or rng.random() < 0.2:
+            return None, None
+        return self.series[rng.randrange(len(self.series))]
+
+    def assets(self) -> None:
+        t = self._table("assets", (
+            "id", "kind", "uri", "mime_type", "sha256", "width", "height", "duration_ms", "meta_json",
+            "created_at", "deleted_at", "project_id", "series_id",
+        ))
+        rng = self._rng("asset")
+        for i in range(self.scale.assets):
+            sec = self.asset_ids.sec(i)
+            kind, mime = ASSET_KINDS[rng.randrange(len(ASSET_KINDS))]
+            sha, uri = self.blob_refs[rng.randrange(len(self.blob_refs))]
+            w, h = rng.choice(((1024, 1024), (1216, 832), (832, 1216), (1920, 1080)))
+            duration = rng.randrange(2000, 15000) if kind == "video" else None
+            deleted = _ts(sec + rng.randrange(3600, 30 * 24 * 3600)) if rng.random() < 0.03 else None
+            project_id, series_id = self._placement(rng)
+            t.add(self.asset_ids.id(i), kind, uri, mime, sha, w, h, duration, _json({"source": "seed_dataset"}),
+                  _ts(sec), deleted, project_id, series_id)
+
+    def characters(self) -> None:
+        tc = self._table("characters", ("id", "name", "status", "active_ref_set_id", "created_at", "updated_at",
+                                        "tags_json", "meta_json"))
+        tr = self._table("character_ref_sets", ("id", "character_id", "version", "status",
+                                                 "min_requirements_snapshot_json", "created_at"))
+        if tc is None or tr is None:
+            return
+        rng = self._rng("character")
+        rs_ids = _Ids(self.seed, "character_ref_set", self.scale.characters * MAX_REF_SET_VERSIONS)
+        snapshot = _json({"min_refs": MIN_REFS_CONFIRMED})
+        for c in range(self.scale.characters):
+            cid = self.char_ids.id(c)
+            created = self.char_ids.sec(c)
+            active = rng.random() < 0.7
+            versions = rng.randint(1, MAX_REF_SET_VERSIONS)
+            active_id: Optional[str] = None
+            sec = created
+            for v in range(1, versions + 1):
+                sec += rng.randrange(600, 7 * 24 * 3600)
+                last = v == versions
+                if active:
+                    status = "confirmed" if last else rng.choice(("archived", "confirmed", "draft"))
+                else:
+                    status = "draft"
+                refs = rng.randint(MIN_REFS_CONFIRMED, MIN_REFS_CONFIRMED + 4) if status != "draft" else rng.randint(0, 10)
+                rs_id = rs_ids.id(c * MAX_REF_SET_VERSIONS + v - 1, sec)
+                tr.add(rs_id, cid, v, status, snapshot, _ts(sec))
+                self._link(TYPE_CHARACTER, cid, TYPE_REF_SET, rs_id, REL_HAS_REF_SET_VERSION, sec)
+                for asset_i in rng.sample(range(self.scale.assets), min(refs, self.scale.assets)):
+                    self._link(TYPE_REF_SET, rs_id, TYPE_ASSET, self.asset_ids.id(asset_i), REL_INCLUDES_REFERENCE_ASSET, sec)
+                if active and last:
+                    active_id = rs_id
+            status = "confirmed" if active else rng.choice(("draft", "draft", "archived"))
+            tc.add(cid, f"Character {c}", status, active_id, _ts(created), _ts(sec),
+                   _json([f"tag-{c % 17}"]), _json({"source": "seed_dataset"}))
+            self.active_ref_sets.append(active_id)
+
+    def runs(self) -> None:
+        tp = self._table("prompt_packs", ("id", "name", "content", "digest", "created_at"))
+        tr = self._table("runs", ("id", "prompt_pack_id", "status", "input_json", "output_json", "created_at"))
+        if tp is None or tr is None:
+            return
+        _ensure_run_events_table(self.conn)
+        te = self._table("run_events", ("event_id", "run_id", "status", "result_refs_json", "request_id",
+                                        "created_at", "seq"))
+        tv = self._table("reviews", ("id", "run_id", "rating", "notes", "created_at"))
+        rng = self._rng("run")
+        pp_ids = _Ids(self.seed, "prompt_pack", self.scale.runs)
+        ev_ids = _Ids(self.seed, "run_event", self.scale.runs * 2)
+        rv_ids = _Ids(self.seed, "review", self.scale.runs)
+        with_chars = [k for k, rs in enumerate(self.active_ref_sets) if rs]
+        for i in range(self.scale.runs):
+            run_id = self.run_ids.id(i)
+            sec = self.run_ids.sec(i)
+            run_type = RUN_TYPES[rng.randrange(len(RUN_TYPES))]
+            prompt = f"seed prompt {i}"
+            content = _json({"raw_input": prompt, "final_prompt": prompt, "assembly_used": False, "run_type": run_type})
+            pp_id = pp_ids.id(i, sec)
+            tp.add(pp_id, None, content, hashlib.sha256(content.encode("utf-8")).hexdigest(), _ts(sec))
+
+            profile = (self.profiles[0] if rng.random() < 0.8 else rng.choice(self.profiles)) if self.profiles else None
+            chars: List[Dict[str, Any]] = []
+            if with_chars and rng.random() < 0.3:
+                c = with_chars[rng.randrange(len(with_chars))]
+                chars.append({"character_id": self.char_ids.id(c), "is_primary": True,
+                              "resolved_ref_set_id": self.active_ref_sets[c]})
+            evidence = {
+                "run_type": run_type,
+                "resolved_provider_profile_id": profile["id"] if profile else None,
+                "provider_profile_snapshot": profile or {},
+                "characters": chars,
+                "inputs": {"seed": rng.randrange(1 << 31)},
+            }
+            tr.add(run_id, pp_id, "queued", _json(evidence), None, _ts(sec))
+
+            self._link("run", run_id, "prompt_pack", pp_id, "uses_prompt_pack", sec)
+            if profile:
+                self._link("run", run_id, "provider_profile", profile["id"], "uses_provider_profile", sec)
+            for ch in chars:
+                self._link("run", run_id, "character", ch["character_id"], "uses_character", sec)
+                self._link("run", run_id, "character_ref_set", ch["resolved_ref_set_id"], "uses_character_ref_set", sec)
+
+            # ~10% never left the queue (provider disabled); the rest ran to completion
+            if rng.random() < 0.1:
+                continue
+            rid = f"seed-{i}"
+            t_run = sec + rng.randrange(1, 5)
+            te.add(ev_ids.id(2 * i, t_run), run_id, "running", None, rid, _ts(t_run), 1)
+            t_end = t_run + rng.randrange(2, 60)
+            if rng.random() < 0.9:
+                asset_i = rng.randrange(self.scale.assets) if self.scale.assets else None
+                sha, uri = self.blob_refs[rng.randrange(len(self.blob_refs))]
+                asset_ids = [self.asset_ids.id(asset_i)] if asset_i is not None else []
+                rr = {"asset_ids": asset_ids, "provider": "mock", "storage_refs": [uri]}
+                te.add(ev_ids.id(2 * i + 1, t_end), run_id, "succeeded", _json(rr), rid, _ts(t_end), 2)
+                for aid in asset_ids:
+                    self._link("run", run_id, "asset", aid, "produced_asset", t_end)
+                if tv is not None and rng.random() < 0.2:
+                    tv.add(rv_ids.id(i, t_end + 60), run_id, rng.randint(1, 5), "", _ts(t_end + 60))
+            else:
+                rr = {"asset_ids": [], "provider": "mock", "error": "synthetic failure"}
+                te.add(ev_ids.id(2 * i + 1, t_end), run_id, "failed", _json(rr), rid, _ts(t_end), 2)
+
+    def shots(self) -> None:
+        t = self._table("shots", ("id", "project_id", "series_id", "name", "created_at"))
+        if t is None or self.scale.shots <= 0:
+            return
+        budget = max(self.scale.links - self.links_written, 0)
+        per_shot, extra = divmod(budget, self.scale.shots)
+        rng = self._rng("shot")
+        ids = _Ids(self.seed, "shot", self.scale.shots)
+        targets = {
+            "asset": (self.asset_ids, self.scale.assets),
+            "character": (self.char_ids, self.scale.characters),
+            "run": (self.run_ids, self.scale.runs),
+        }
+        for i in range(self.scale.shots):
+            shot_id = ids.id(i)
+            sec = ids.sec(i)
+            project_id, series_id = self._placement(rng)
+            t.add(shot_id, project_id, series_id, f"shot {i}", _ts(sec))
+            live: List[Tuple[str, str, str]] = []
+            for slot in range(per_shot + (1 if i < extra else 0)):
+                at = sec + 60 * (slot + 1)
+                # ~10% of edits remove an existing edge: tombstone appended later than the link
+                if live and rng.random() < 0.1:
+                    dst_type, dst_id, rel = live.pop(rng.randrange(len(live)))
+                    self._link("shot", shot_id, dst_type, dst_id, UNLINK_PREFIX + rel, at)
+                    continue
+                dst_type, rel = SHOT_RELS[rng.randrange(len(SHOT_RELS))]
+                id_gen, n = targets[dst_type]
+                if n <= 0:
+                    dst_type, rel = "asset", "uses_asset"
+                    id_gen, n = targets["asset"]
+                dst_id = id_gen.id(rng.randrange(max(n, 1)))
+                self._link("shot", shot_id, dst_type, dst_id, rel, at)
+                live.append((dst_type, dst_id, rel))
+
+    def build(self) -> Dict[str, int]:
+        self.blobs()
+        self.provider_profiles()
+        self.hierarchy()
+        self.assets()
+        self.characters()
+        self.runs()
+        self.shots()
+        for t in self.tables.values():
+            t.flush()
+        if self.profiles:
+            # a running API re-resolves its cached default profile
+            profile_cache.bump(self.conn)
+            self.conn.commit()
+        if schema.table_exists(self.conn, "run_status_current"):
+            rebuild_run_status_current(self.conn)
+            self.conn.commit()
+        return self.rows()
+
+
+_SEEDED_TABLES = ("assets", "links", "runs", "characters", "shots", "projects", "provider_profiles")
+
+
+def _non_empty(conn: sqlite3.Connection) -> List[str]:
+    return [t for t in _SEEDED_TABLES
+            if schema.table_exists(conn, t) and conn.execute(f"SELECT 1 FROM {t} LIMIT 1").fetchone()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", help="sqlite file migrated to head (default: DATABASE_URL)")
+    ap.add_argument("--storage-root", help="blob root (default: STORAGE_ROOT)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ("projects", "series_per_project", "assets", "shots", "links", "runs", "characters",
+                 "profiles", "blobs", "blob_bytes"):
+        ap.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, help=f"override preset {name}")
+    ap.add_argument("--manifest", help="also write the run manifest (scale, seed, row counts) to this JSON file")
+    args = ap.parse_args(argv)
+
+    scale = replace(PRESETS[args.preset], **{
+        k: getattr(args, k) for k in asdict(PRESETS[args.preset]) if getattr(args, k) is not None
+    })
+    if scale.profiles < 1 or scale.blobs < 1 or scale.blob_bytes < 1 or min(asdict(scale).values()) < 0:
+        print("[err] counts must be >= 0 (profiles, blobs, blob-bytes >= 1)", file=sys.stderr)
+        return 2
+
+    path = Path(args.db) if args.db else get_sqlite_path()
+    root = Path(args.storage_root) if args.storage_root else get_storage_root()
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    try:
+        busy = _non_empty(conn)
+        if busy:
+            print(f"[err] {path} already has rows in {', '.join(busy)}; seed a freshly migrated database",
+                  file=sys.stderr)
+            return 2
+        # bulk load: durability of a half-written synthetic dataset does not matter
+        conn.execute("PRAGMA synchronous=OFF;")
+        t0 = time.perf_counter()
+        rows = DatasetBuilder(conn, root, args.seed, scale).build()
+        elapsed = time.perf_counter() - t0
+    finally:
+        conn.close()
+        dispose_pools()
+
+    manifest = {
+        "dataset_version": DATASET_VERSION,
+        "seed": args.seed,
+        "preset": args.preset,
+        "scale": asdict(scale),
+        "db": str(path),
+        "storage_root": str(root),
+        "rows": rows,
+        "elapsed_s": round(elapsed, 1),
+    }
+    out = json.dumps(manifest, indent=2)
+    if args.manifest:
+        Path(args.manifest).write_text(out + "\n", encoding="utf-8")
+    print(out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""list endpoints: composite indexes matching keyset (cursor) pagination
+
+Revision ID: 0005_list_keyset_indexes
+Revises: 0004_characters_provider_profiles
+Create Date: 2026-10-18
+
+- each index covers one list ordering (see app.core.pagination.KeysetOrder):
+  - assets            (created_at, id)  [+ partial WHERE deleted_at IS NULL for the default view]
+  - characters        (updated_at, id)  [+ status prefix for ?status=]
+  - shots             (created_at, id)  [+ project_id / series_id prefixes]
+  - provider_profiles (updated_at, id)
+- indexes only; no table rewrites (defensive: skips tables/columns that are absent)
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_list_keyset_indexes"
+down_revision = "0004_characters_provider_profiles"
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, required columns, DDL)
+_INDEXES = [
+    ("ix_assets_created_at_id", "assets", ["created_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_assets_created_at_id ON assets (created_at, id);"),
+    ("ix_assets_live_created_at_id", "assets", ["created_at", "id", "deleted_at"],
+     "CREATE INDEX IF NOT EXISTS ix_assets_live_created_at_id ON assets (created_at, id) WHERE deleted_at IS NULL;"),
+    ("ix_characters_updated_at_id", "characters", ["updated_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_characters_updated_at_id ON characters (updated_at, id);"),
+    ("ix_characters_status_updated_at_id", "characters", ["status", "updated_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_characters_status_updated_at_id ON characters (status, updated_at, id);"),
+    ("ix_shots_created_at_id", "shots", ["created_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_shots_created_at_id ON shots (created_at, id);"),
+    ("ix_shots_project_id_created_at_id", "shots", ["project_id", "created_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_shots_project_id_created_at_id ON shots (project_id, created_at, id);"),
+    ("ix_shots_series_id_created_at_id", "shots", ["series_id", "created_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_shots_series_id_created_at_id ON shots (series_id, created_at, id);"),
+    ("ix_provider_profiles_updated_at_id", "provider_profiles", ["updated_at", "id"],
+     "CREATE INDEX IF NOT EXISTS ix_provider_profiles_updated_at_id ON provider_profiles (updated_at, id);"),
+]
+
+
+def _columns(conn, table: str) -> set:
+    rows = conn.execute(sa.text(f"PRAGMA table_info('{table}')")).fetchall()
+    # (cid, name, type, notnull, dflt_value, pk)
+    return {r[1] for r in rows}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for _name, table, cols, ddl in _INDEXES:
+        if set(cols).issubset(_columns(conn, table)):
+            op.execute(ddl)
+
+
+def downgrade() -> None:
+    for name, _table, _cols, _ddl in reversed(_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name};")
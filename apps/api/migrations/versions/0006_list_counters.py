@@ -0,0 +1,147 @@
+"""list endpoints: trigger-maintained row counters (O(1) exact totals)
+
+Revision ID: 0006_list_counters
+Revises: 0005_list_keyset_indexes
+Create Date: 2026-10-18
+
+- list_counters(scope, key, n): one row per table/filter value the list endpoints
+  count by (see app.core.counters):
+  - assets:     live | deleted
+  - characters: all | status:<status>
+  - shots:      all | project:<id> | series:<id> | project:<id>|series:<id>
+- AFTER INSERT/UPDATE/DELETE triggers keep counters in the writer's transaction,
+  so imports, trash purge and direct SQL stay consistent without app changes
+- backfilled from the current rows; defensive: skips tables/columns that are absent
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_list_counters"
+down_revision = "0005_list_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _inc(key_sql: str, when: str = "") -> str:
+    where = f" WHERE {when}" if when else ""
+    return (
+        f"INSERT INTO list_counters (scope, key, n) SELECT '{{scope}}', {key_sql}, 1{where} "
+        "ON CONFLICT(scope, key) DO UPDATE SET n = n + 1;"
+    )
+
+
+def _dec(key_sql: str, when: str = "") -> str:
+    extra = f" AND {when}" if when else ""
+    return f"UPDATE list_counters SET n = n - 1 WHERE scope = '{{scope}}' AND key = {key_sql}{extra};"
+
+
+# per-table counter keys: (key expression over a row alias, condition under which the key applies)
+_KEYS = {
+    "assets": [
+        ("CASE WHEN {r}.deleted_at IS NULL THEN 'live' ELSE 'deleted' END", ""),
+    ],
+    "characters": [
+        ("'all'", ""),
+        ("'status:' || {r}.status", "{r}.status IS NOT NULL"),
+    ],
+    "shots": [
+        ("'all'", ""),
+        ("'project:' || {r}.project_id", "{r}.project_id IS NOT NULL"),
+        ("'series:' || {r}.series_id", "{r}.series_id IS NOT NULL"),
+        (
+            "'project:' || {r}.project_id || '|series:' || {r}.series_id",
+            "{r}.project_id IS NOT NULL AND {r}.series_id IS NOT NULL",
+        ),
+    ],
+}
+
+_REQUIRED_COLUMNS = {
+    "assets": {"deleted_at"},
+    "characters": {"status"},
+    "shots": {"project_id", "series_id"},
+}
+
+# UPDATE triggers only fire when a counted column changes
+_UPDATE_OF = {
+    "assets": ("deleted_at", "(OLD.deleted_at IS NULL) <> (NEW.deleted_at IS NULL)"),
+    "characters": ("status", "OLD.status IS NOT NEW.status"),
+    "shots": (
+        "project_id, series_id",
+        "OLD.project_id IS NOT NEW.project_id OR OLD.series_id IS NOT NEW.series_id",
+    ),
+}
+
+
+def _columns(conn, table: str) -> set:
+    rows = conn.execute(sa.text(f"PRAGMA table_info('{table}')")).fetchall()
+    return {r[1] for r in rows}
+
+
+def _body(table: str, steps) -> str:
+    return "\n  ".join(s.replace("{scope}", table) for s in steps)
+
+
+def _triggers(table: str):
+    keys = _KEYS[table]
+    inc_new = [_inc(k.format(r="NEW"), w.format(r="NEW")) for k, w in keys]
+    dec_old = [_dec(k.format(r="OLD"), w.format(r="OLD")) for k, w in keys]
+    cols, changed = _UPDATE_OF[table]
+    return [
+        (
+            f"trg_{table}_count_ins",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_ins AFTER INSERT ON {table}\n"
+            f"BEGIN\n  {_body(table, inc_new)}\nEND;",
+        ),
+        (
+            f"trg_{table}_count_upd",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_upd AFTER UPDATE OF {cols} ON {table}\n"
+            f"WHEN {changed}\nBEGIN\n  {_body(table, dec_old + inc_new)}\nEND;",
+        ),
+        (
+            f"trg_{table}_count_del",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_del AFTER DELETE ON {table}\n"
+            f"BEGIN\n  {_body(table, dec_old)}\nEND;",
+        ),
+    ]
+
+
+def _backfill(table: str):
+    out = [f"DELETE FROM list_counters WHERE scope = '{table}';"]
+    for k, w in _KEYS[table]:
+        where = f" WHERE {w.format(r='t')}" if w else ""
+        out.append(
+            f"INSERT INTO list_counters (scope, key, n) "
+            f"SELECT '{table}', {k.format(r='t')}, COUNT(1) FROM {table} AS t{where} GROUP BY 2;"
+        )
+    return out
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS list_counters (
+          scope TEXT NOT NULL,
+          key TEXT NOT NULL,
+          n INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (scope, key)
+        );
+        """
+    )
+    for table in _KEYS:
+        cols = _columns(conn, table)
+        if not cols or not _REQUIRED_COLUMNS[table].issubset(cols):
+            continue
+        for stmt in _backfill(table):
+            op.execute(stmt)
+        for _name, ddl in _triggers(table):
+            op.execute(ddl)
+
+
+def downgrade() -> None:
+    for table in _KEYS:
+        for name, _ddl in _triggers(table):
+            op.execute(f"DROP TRIGGER IF EXISTS {name};")
+    op.execute("DROP TABLE IF EXISTS list_counters;")
@@ -0,0 +1,57 @@
+"""hot service queries: composite / partial indexes (no full scans, no temp b-trees)
+
+Revision ID: 0007_hot_query_indexes
+Revises: 0006_list_counters
+Create Date: 2026-10-18
+
+Complements 0005 (list orderings). Each index is named after the query it serves;
+docs/QUERY_PLANS.md records the resulting EXPLAIN QUERY PLAN for every hot query.
+
+- links (src_type, src_id, created_at): GET /shots/{id} linked refs, oldest first
+- links (src_type, src_id, rel, dst_type): character ref-set membership / refs_count /
+  add_ref dedup; equality on every column keeps rowid order, so ORDER BY rowid is free
+- assets (deleted_at) WHERE deleted_at IS NOT NULL: trash listing / purge
+- provider_profiles (updated_at, created_at): run-time fallback profile resolution
+  (the global-default lookup is already served by uq_provider_profiles_global_default)
+- indexes only; defensive: skips tables/columns that are absent
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_hot_query_indexes"
+down_revision = "0006_list_counters"
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, required columns, DDL)
+_INDEXES = [
+    ("ix_links_src_created_at", "links", ["src_type", "src_id", "created_at"],
+     "CREATE INDEX IF NOT EXISTS ix_links_src_created_at ON links (src_type, src_id, created_at);"),
+    ("ix_links_src_rel_dst_type", "links", ["src_type", "src_id", "rel", "dst_type"],
+     "CREATE INDEX IF NOT EXISTS ix_links_src_rel_dst_type ON links (src_type, src_id, rel, dst_type);"),
+    ("ix_assets_trashed", "assets", ["deleted_at"],
+     "CREATE INDEX IF NOT EXISTS ix_assets_trashed ON assets (deleted_at) WHERE deleted_at IS NOT NULL;"),
+    ("ix_provider_profiles_updated_at_created_at", "provider_profiles", ["updated_at", "created_at"],
+     "CREATE INDEX IF NOT EXISTS ix_provider_profiles_updated_at_created_at ON provider_profiles (updated_at, created_at);"),
+]
+
+
+def _columns(conn, table: str) -> set:
+    rows = conn.execute(sa.text(f"PRAGMA table_info('{table}')")).fetchall()
+    # (cid, name, type, notnull, dflt_value, pk)
+    return {r[1] for r in rows}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for _name, table, cols, ddl in _INDEXES:
+        if set(cols).issubset(_columns(conn, table)):
+            op.execute(ddl)
+
+
+def downgrade() -> None:
+    for name, _table, _cols, _ddl in reversed(_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name};")
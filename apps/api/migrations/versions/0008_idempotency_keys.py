@@ -0,0 +1,44 @@
+"""idempotency_keys: stored responses for Idempotency-Key retries on create endpoints
+
+Revision ID: 0008_idempotency_keys
+Revises: 0007_hot_query_indexes
+Create Date: 2026-10-18
+
+Backs app/core/idempotency.py (POST /runs, /reviews, /characters, /shots/{id}/links).
+- one row per (scope, key): request fingerprint, pending/complete state, stored
+  status code + JSON body, expires_at (TTL)
+- ix_idempotency_keys_expires_at: expiry purge
+- not append-only: expired rows are deleted
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0008_idempotency_keys"
+down_revision = "0007_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            state TEXT NOT NULL,
+            status_code INTEGER,
+            response_json TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            PRIMARY KEY (scope, key)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_idempotency_keys_expires_at;")
+    op.execute("DROP TABLE IF EXISTS idempotency_keys;")
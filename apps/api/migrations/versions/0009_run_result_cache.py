@@ -0,0 +1,47 @@
+"""run_result_cache: opt-in provider result memoization (RUN_RESULT_CACHE=1)
+
+Revision ID: 0009_run_result_cache
+Revises: 0008_idempotency_keys
+Create Date: 2026-10-18
+
+Backs app/modules/runs/result_cache.py.
+- one row per cache key: source run, storage refs / asset ids, hit count, TTL
+- ix_run_result_cache_last_used_at: LRU eviction beyond RUN_RESULT_CACHE_MAX_ENTRIES
+- ix_run_result_cache_expires_at: TTL purge
+- derived data, not append-only: entries are updated (hits) and evicted
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0009_run_result_cache"
+down_revision = "0008_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_result_cache (
+            cache_key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            source_run_id TEXT NOT NULL,
+            storage_refs_json TEXT NOT NULL,
+            asset_ids_json TEXT NOT NULL,
+            details_json TEXT,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_used_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_result_cache_last_used_at ON run_result_cache (last_used_at);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_result_cache_expires_at ON run_result_cache (expires_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_run_result_cache_expires_at;")
+    op.execute("DROP INDEX IF EXISTS ix_run_result_cache_last_used_at;")
+    op.execute("DROP TABLE IF EXISTS run_result_cache;")
@@ -0,0 +1,34 @@
+"""cache_versions: cross-process invalidation counters for in-process caches
+
+Revision ID: 0010_cache_versions
+Revises: 0009_run_result_cache
+Create Date: 2026-10-18
+
+Backs app/modules/provider_profiles/cache.py.
+- one row per cache scope ('provider_profiles'); version is bumped in the same
+  transaction as the write it invalidates
+- derived data, not append-only
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0010_cache_versions"
+down_revision = "0009_run_result_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS cache_versions;")
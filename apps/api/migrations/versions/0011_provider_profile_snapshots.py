@@ -0,0 +1,51 @@
+"""provider_profile_snapshots: content-addressed run snapshots (RUN_INTERNING=1)
+
+Revision ID: 0011_provider_profile_snapshots
+Revises: 0010_cache_versions
+Create Date: 2026-10-18
+
+Backs app/modules/runs/interning.py.
+- one row per distinct provider profile snapshot, keyed by the sha256 of its
+  canonical JSON; runs reference it as input_json.provider_profile_snapshot_ref
+- append-only like the other evidence tables (no UPDATE / DELETE triggers)
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0011_provider_profile_snapshots"
+down_revision = "0010_cache_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS provider_profile_snapshots (
+            digest TEXT PRIMARY KEY,
+            snapshot_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        """
+    )
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_provider_profile_snapshots_no_update
+    BEFORE UPDATE ON provider_profile_snapshots
+    BEGIN
+      SELECT RAISE(ABORT, 'append-only: provider_profile_snapshots cannot be updated');
+    END;
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_provider_profile_snapshots_no_delete
+    BEFORE DELETE ON provider_profile_snapshots
+    BEGIN
+      SELECT RAISE(ABORT, 'append-only: provider_profile_snapshots cannot be deleted');
+    END;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_provider_profile_snapshots_no_delete;")
+    op.execute("DROP TRIGGER IF EXISTS trg_provider_profile_snapshots_no_update;")
+    op.execute("DROP TABLE IF EXISTS provider_profile_snapshots;")
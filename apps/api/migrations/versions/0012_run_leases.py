@@ -0,0 +1,57 @@
+"""run_leases: DB-backed run queue claimed by standalone worker processes
+
+Revision ID: 0012_run_leases
+Revises: 0011_provider_profile_snapshots
+Create Date: 2026-10-18
+
+Backs app/modules/runs/leases.py (RUN_EXECUTOR_MODE=workers).
+- one row per queued or leased run; deleted once the run has a terminal event
+- lease columns (worker_id, lease_token, heartbeat_at, lease_expires_at) are
+  rewritten on claim / heartbeat / takeover, so the table is not append-only;
+  the status transitions themselves stay in run_events
+- indexes: claim order (enqueued_at), heartbeat (worker_id), live leases per
+  sweep (group_id) and per profile (lane)
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0012_run_leases"
+down_revision = "0011_provider_profile_snapshots"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_leases (
+            run_id TEXT PRIMARY KEY,
+            job_json TEXT NOT NULL,
+            request_id TEXT,
+            lane TEXT,
+            lane_limit INTEGER,
+            group_id TEXT,
+            group_limit INTEGER,
+            enqueued_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_token TEXT,
+            leased_at TEXT,
+            heartbeat_at TEXT,
+            lease_expires_at TEXT
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_leases_enqueued_at ON run_leases (enqueued_at, run_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_leases_worker_id ON run_leases (worker_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_leases_group ON run_leases (group_id, lease_expires_at);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_run_leases_lane ON run_leases (lane, lease_expires_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_run_leases_lane;")
+    op.execute("DROP INDEX IF EXISTS ix_run_leases_group;")
+    op.execute("DROP INDEX IF EXISTS ix_run_leases_worker_id;")
+    op.execute("DROP INDEX IF EXISTS ix_run_leases_enqueued_at;")
+    op.execute("DROP TABLE IF EXISTS run_leases;")
@@ -142,6 +142,10 @@ bash scripts/gate_export_import.sh
 
     run_gate "api_smoke" "scripts/gate_api_smoke.sh" "$i" || exit $?
     run_gate "provider_adapter" "scripts/gate_provider_adapter.sh" "$i" || exit $?
+    run_gate "run_resilience" "scripts/gate_run_resilience.sh" "$i" || exit $?
+    run_gate "query_plans" "scripts/gate_query_plans.sh" "$i" || exit $?
+    run_gate "run_workers" "scripts/gate_run_workers.sh" "$i" || exit $?
+    run_gate "run_events" "scripts/gate_run_events.sh" "$i" || exit $?
     run_gate "web_routes" "scripts/gate_web_routes.sh" "$i" || exit $?
 
     run_gate "ac_001" "scripts/gate_ac_001.sh" "$i" || exit $?
@@ -13,7 +13,7 @@ echo "[ok] /openapi.json reachable"
 
 PAYLOAD_FILE="$TMPDIR/payload.json"
 cat > "$PAYLOAD_FILE" <<'JSON'
-{"run_type":"t2i","prompt_pack":{"prompt":"gate_provider_adapter","params":{}}}
+{"run_type":"t2i","prompt_pack":{"raw_input":"gate_provider_adapter","final_prompt":"gate_provider_adapter","assembly_used":false}}
 JSON
 
 py_get_json() {
@@ -53,6 +53,25 @@ dump_resp() {
   echo
 }
 
+# POST /runs returns once the run is queued (RUN_EXECUTOR_MODE=queue, the default):
+# poll GET /runs/{id} until the executor has recorded a terminal status
+wait_terminal() {
+  local RUN_ID="$1"; local OUT="$2"
+  python - <<'PY' "$API_BASE_URL" "$RUN_ID" "$OUT"
+import json,sys,time,urllib.request
+base,run_id,out=sys.argv[1:4]
+deadline=time.time()+60
+while True:
+    body=urllib.request.urlopen(f"{base}/runs/{run_id}").read().decode("utf-8-sig")
+    obj=json.loads(body)
+    if obj.get("status") in ("succeeded","failed") or time.time()>deadline:
+        break
+    time.sleep(0.2)
+open(out,"w",encoding="utf-8").write(body)
+print("[ok] run %s -> status=%s" % (run_id, obj.get("status")))
+PY
+}
+
 do_post() {
   local label="$1"
   local RID="$2"
@@ -126,12 +145,14 @@ fi
 echo "[ok] flag ON -> POST /runs ok run_id=$RUN_ID_ON status=$STATUS_ON"
 
 G2="$TMPDIR/on.get.json"
-curl -sS -o "$G2" "$API_BASE_URL/runs/$RUN_ID_ON"
+wait_terminal "$RUN_ID_ON" "$G2"
 python - <<'PY' "$G2"
 import json,sys
 obj=json.load(open(sys.argv[1],encoding="utf-8-sig"))
+assert obj.get("status") == "succeeded", "run status must be succeeded, got %r" % obj.get("status")
 rr=obj.get("result_refs") or {}
-refs=(rr.get("refs") or []) if isinstance(rr, dict) else []
+# the executor records the provider's refs as storage_refs
+refs=(rr.get("refs") or rr.get("storage_refs") or []) if isinstance(rr, dict) else []
 assert isinstance(refs, list), "result_refs.refs must be list"
 assert len(refs) >= 1, "result_refs.refs must be non-empty when provider succeeds"
 print("[ok] flag ON -> GET ok status=%s refs_count=%d" % (obj.get("status"), len(refs)))
@@ -175,26 +196,30 @@ if echo "$J3" | grep -q '^__JSON_PARSE_ERROR__'; then
 fi
 echo "$J3" > "$TMPDIR/fail.body.json"
 
+# queue mode (default): 200 RunCreateOut with status=queued, the failure is recorded later;
+# inline mode: 500 error envelope carrying details.run_id
 python - <<'PY' "$TMPDIR/fail.body.json"
 import json,sys
 obj=json.load(open(sys.argv[1],encoding="utf-8-sig"))
-for k in ("error","message","request_id","details"):
-    assert k in obj, f"missing envelope key: {k}"
-run_id=(obj.get("details") or {}).get("run_id")
-assert run_id, "details.run_id missing"
-print("[ok] forced fail -> error_envelope ok request_id=%s run_id=%s" % (obj.get("request_id"), run_id))
+if "run_id" in obj:
+    print("[ok] forced fail -> accepted run_id=%s status=%s" % (obj["run_id"], obj.get("status")))
+else:
+    for k in ("error","message","request_id","details"):
+        assert k in obj, f"missing envelope key: {k}"
+    assert (obj.get("details") or {}).get("run_id"), "details.run_id missing"
+    print("[ok] forced fail -> error_envelope ok request_id=%s run_id=%s" % (obj.get("request_id"), obj["details"]["run_id"]))
 PY
 
 RUN_ID_FAIL="$(python - <<'PY' "$TMPDIR/fail.body.json"
 import json,sys
 obj=json.load(open(sys.argv[1],encoding="utf-8-sig"))
-print((obj.get("details") or {}).get("run_id",""))
+print(obj.get("run_id") or (obj.get("details") or {}).get("run_id",""))
 PY
 )"
 test -n "$RUN_ID_FAIL"
 
 G3="$TMPDIR/fail.get.json"
-curl -sS -o "$G3" "$API_BASE_URL/runs/$RUN_ID_FAIL"
+wait_terminal "$RUN_ID_FAIL" "$G3"
 python - <<'PY' "$G3"
 import json,sys
 obj=json.load(open(sys.argv[1],encoding="utf-8-sig"))
@@ -0,0 +1,39 @@
+#!/usr/bin/env bash
+set +e
+
+ROOT="$(git rev-parse --show-toplevel 2>/dev/null)"
+if [ -z "$ROOT" ]; then echo "[err] not a git repo"; exit 2; fi
+cd "$ROOT" || exit 2
+
+ok()  { echo "[ok] $*"; }
+warn(){ echo "[warn] $*"; }
+err() { echo "[err] $*"; }
+
+echo "== gate_query_plans: start =="
+
+# migrated db to copy from (never modified); QP_ROWS / QP_LARGE tune the seeded size
+export DATABASE_URL="${DATABASE_URL:-sqlite:///./data/app.db}"
+export PYTHONPATH="$ROOT/apps/api"
+mkdir -p "$ROOT/tmp" 2>/dev/null
+
+pushd "$ROOT/apps/api" >/dev/null
+python -m alembic -c alembic.ini upgrade head
+RC_UP=$?
+if [ $RC_UP -ne 0 ]; then
+  popd >/dev/null
+  err "alembic upgrade head failed (rc=$RC_UP)"
+  exit 10
+fi
+DB_PATH="$(python -c 'from app.core.db import get_sqlite_path; print(get_sqlite_path())')"
+python -m app.tools.query_plan_check --db "$DB_PATH" \
+  --rows "${QP_ROWS:-5000}" --large "${QP_LARGE:-1000}" \
+  --json "$ROOT/tmp/_out_query_plans.json"
+RC=$?
+popd >/dev/null
+
+if [ $RC -ne 0 ]; then
+  err "query plan regressions found (see tmp/_out_query_plans.json)"
+  exit $RC
+fi
+ok "gate_query_plans passed"
+exit 0
@@ -0,0 +1,135 @@
+#!/usr/bin/env bash
+set +e
+
+ROOT="$(git rev-parse --show-toplevel 2>/dev/null)"
+if [ -z "$ROOT" ]; then echo "[err] not a git repo"; exit 2; fi
+cd "$ROOT" || exit 2
+
+err() { echo "[err] $*"; }
+
+echo "== gate_run_events: start =="
+
+# SSE run status streams (GET /runs/{id}/events, /runs/events?ids=): snapshot ->
+# transitions -> end, for a run and for a sweep parent. The gate starts its own API
+# on a copy of the migrated db with a slow mock provider, so transitions arrive after
+# the snapshot. GATE_EVENTS_PORT picks the API port (default 7012).
+export DATABASE_URL="${DATABASE_URL:-sqlite:///./data/app.db}"
+export PYTHONPATH="$ROOT/apps/api"
+PORT="${GATE_EVENTS_PORT:-7012}"
+TMPDIR="$ROOT/tmp/gate_run_events.$$"
+mkdir -p "$TMPDIR"
+
+API_PID=""
+cleanup() {
+  if [ -n "$API_PID" ]; then kill "$API_PID" >/dev/null 2>&1; wait "$API_PID" 2>/dev/null; fi
+  rm -rf "$TMPDIR" >/dev/null 2>&1
+}
+trap cleanup EXIT
+
+pushd "$ROOT/apps/api" >/dev/null
+python -m alembic -c alembic.ini upgrade head
+RC_UP=$?
+if [ $RC_UP -ne 0 ]; then
+  popd >/dev/null
+  err "alembic upgrade head failed (rc=$RC_UP)"
+  exit 10
+fi
+SRC_DB="$(python -c 'from app.core.db import get_sqlite_path; print(get_sqlite_path())')"
+python - <<'PY' "$SRC_DB" "$TMPDIR/events.db"
+import sqlite3, sys
+src, dst = sqlite3.connect(sys.argv[1]), sqlite3.connect(sys.argv[2])
+src.backup(dst)
+PY
+
+export DATABASE_URL="sqlite:///$TMPDIR/events.db"
+export STORAGE_ROOT="$TMPDIR/storage"
+export RUN_EXECUTOR_MODE=queue
+export MOCK_PROVIDER_LATENCY="fixed:400"
+export RUN_EVENTS_HEARTBEAT_S=1
+python -m uvicorn app.main:app --host 127.0.0.1 --port "$PORT" > "$TMPDIR/api.log" 2>&1 &
+API_PID=$!
+
+python - <<'PY' "http://127.0.0.1:$PORT"
+import json, sys, time, urllib.error, urllib.request
+
+base = sys.argv[1]
+pack = {"raw_input": "gate_run_events", "final_prompt": "gate_run_events", "assembly_used": False}
+
+def post_run(body):
+    req = urllib.request.Request(base + "/runs", method="POST", data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json", "X-Provider-Enabled": "1"})
+    return json.loads(urllib.request.urlopen(req, timeout=30).read().decode("utf-8-sig"))
+
+def check(cond, msg):
+    if not cond:
+        print("[err] " + msg)
+        sys.exit(1)
+    print("[ok] " + msg)
+
+def frames(path):
+    """(event, data) per SSE frame until the server closes the stream; pings skipped."""
+    out, event, data = [], None, None
+    with urllib.request.urlopen(base + path, timeout=30) as r:
+        check(r.headers.get("Content-Type", "").startswith("text/event-stream"), "stream is text/event-stream")
+        for raw in r:
+            line = raw.decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+            elif line == "" and event:
+                out.append((event, data))
+                event, data = None, None
+    return out
+
+def status_code(path):
+    try:
+        return urllib.request.urlopen(base + path, timeout=10).status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+deadline = time.time() + 30
+while True:
+    try:
+        urllib.request.urlopen(base + "/health", timeout=2)
+        break
+    except Exception:
+        if time.time() > deadline:
+            check(False, "API did not start (see api.log)")
+        time.sleep(0.2)
+
+# (1) one run: snapshot, pushed transitions, end
+run_id = post_run({"run_type": "t2i", "prompt_pack": pack, "inputs": {"gate": "events"}})["run_id"]
+fs = frames(f"/runs/{run_id}/events")
+statuses = [d["status"] for e, d in fs if e == "run_status"]
+check(fs[0][0] == "run_status" and fs[0][1].get("snapshot") is True, "snapshot first: %s" % fs[0][1]["status"])
+check(len(statuses) >= 2 and statuses[-1] == "succeeded", "transitions pushed: %s" % statuses)
+seqs = [d["seq"] for e, d in fs if e == "run_status"]
+check(seqs == sorted(seqs) and len(set(seqs)) == len(seqs), "seq increases: %s" % seqs)
+check(fs[-1][0] == "end" and fs[-1][1]["run_ids"] == [run_id], "end after the terminal status")
+
+# (2) sweep parent: aggregate re-sent on child transitions until every child finished
+sweep = post_run({"run_type": "t2i", "prompt_pack": pack, "variations": [{"seed": k} for k in range(3)], "fanout": 1})
+fs = frames(f"/runs/{sweep['run_id']}/events")
+agg = [d for e, d in fs if e == "run_status"]
+check(agg[0].get("snapshot") is True and agg[0]["status"] in ("queued", "running"), "sweep snapshot: %s" % agg[0]["status"])
+check(len(agg) >= 2 and all(d.get("sweep") for d in agg[1:]), "sweep aggregate frames: %d" % (len(agg) - 1))
+check(agg[-1]["status"] == "succeeded" and agg[-1]["result_refs"]["sweep"]["counts"] == {"succeeded": 3},
+      "sweep aggregate reached succeeded")
+check(fs[-1][0] == "end", "end after the sweep finished")
+
+# (3) several ids on one stream; terminal runs end at once
+fs = frames(f"/runs/events?ids={run_id},{sweep['run_id']}")
+check([e for e, _ in fs] == ["run_status", "run_status", "end"], "multi-id stream of finished runs: snapshot x2 + end")
+check(status_code("/runs/gate_run_events_missing/events") == 404, "unknown run -> 404")
+check(status_code("/runs/events?ids=") == 400, "empty ids -> 400")
+PY
+RC=$?
+popd >/dev/null
+
+if [ $RC -ne 0 ]; then
+  err "gate_run_events failed"
+  exit $RC
+fi
+echo "== gate_run_events: passed =="
+exit 0
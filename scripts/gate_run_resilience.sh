@@ -0,0 +1,55 @@
+#!/usr/bin/env bash
+set +e
+
+ROOT="$(git rev-parse --show-toplevel 2>/dev/null)"
+if [ -z "$ROOT" ]; then echo "[err] not a git repo"; exit 2; fi
+cd "$ROOT/apps/api" || exit 2
+
+echo "== gate_run_resilience: start =="
+
+# in-process: breaker / hedging on fake profiles, no API or database needed
+RUN_BREAKER=1 RUN_HEDGE=1 PYTHONPATH="$ROOT/apps/api" python - <<'PY'
+import asyncio, sys, time
+
+from app.modules.runs import resilience
+from app.modules.runs.providers import ProviderResult
+
+def profile(pid):
+    return {"resolved_id": pid, "snapshot": {"id": pid,
+            "breaker": {"min_calls": 1, "error_rate": 0.5, "open_s": 0.2, "half_open_probes": 1},
+            "hedge": {"after_ms": 50}}}
+
+A, B = profile("gate-res-A"), profile("gate-res-B")
+job = {"evidence": {"resolved_provider_profile_id": A["resolved_id"], "provider_profile_snapshot": A["snapshot"]}}
+fallbacks = lambda _pid: [B]
+
+def check(cond, msg):
+    if not cond:
+        print("[err] " + msg)
+        sys.exit(1)
+    print("[ok] " + msg)
+
+breaker_a = resilience.breaker_for(A)
+breaker_a.record(False, 1.0)
+check(breaker_a.state == "open", "profile A tripped open after a failure")
+time.sleep(0.25)
+
+async def slow_a_fast_b(inp):
+    pid = inp["evidence"]["resolved_provider_profile_id"]
+    await asyncio.sleep(1.0 if pid == A["resolved_id"] else 0.01)
+    return ProviderResult(status="succeeded", result_refs=[pid])
+
+res, used = asyncio.run(resilience.call_with_policy_async(slow_a_fast_b, job, fallbacks))
+check(used["provider_profile_id"] == B["resolved_id"] and used["hedged"], "hedge to B won over the half-open probe on A")
+check(breaker_a.state == "half_open", "A stays half_open (the cancelled probe recorded no outcome)")
+check(breaker_a.allow(), "A's probe slot was released: the next call may probe it")
+breaker_a.record(True, 1.0)
+check(breaker_a.state == "closed", "a successful probe closes A")
+PY
+RC=$?
+if [ $RC -ne 0 ]; then
+  echo "[err] gate_run_resilience failed"
+  exit $RC
+fi
+echo "== gate_run_resilience: passed =="
+exit 0
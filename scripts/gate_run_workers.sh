@@ -0,0 +1,134 @@
+#!/usr/bin/env bash
+set +e
+
+ROOT="$(git rev-parse --show-toplevel 2>/dev/null)"
+if [ -z "$ROOT" ]; then echo "[err] not a git repo"; exit 2; fi
+cd "$ROOT" || exit 2
+
+err() { echo "[err] $*"; }
+
+echo "== gate_run_workers: start =="
+
+# RUN_EXECUTOR_MODE=workers end to end: an API process started by this gate on a copy
+# of the migrated db, runs / a batch / a sweep drained by app.tools.run_worker, and a
+# worker killed mid-run whose lease expires and is taken over.
+# GATE_WORKERS_PORT picks the API port (default 7011).
+export DATABASE_URL="${DATABASE_URL:-sqlite:///./data/app.db}"
+export PYTHONPATH="$ROOT/apps/api"
+PORT="${GATE_WORKERS_PORT:-7011}"
+TMPDIR="$ROOT/tmp/gate_run_workers.$$"
+mkdir -p "$TMPDIR"
+
+API_PID=""
+cleanup() {
+  if [ -n "$API_PID" ]; then kill "$API_PID" >/dev/null 2>&1; wait "$API_PID" 2>/dev/null; fi
+  rm -rf "$TMPDIR" >/dev/null 2>&1
+}
+trap cleanup EXIT
+
+pushd "$ROOT/apps/api" >/dev/null
+python -m alembic -c alembic.ini upgrade head
+RC_UP=$?
+if [ $RC_UP -ne 0 ]; then
+  popd >/dev/null
+  err "alembic upgrade head failed (rc=$RC_UP)"
+  exit 10
+fi
+SRC_DB="$(python -c 'from app.core.db import get_sqlite_path; print(get_sqlite_path())')"
+python - <<'PY' "$SRC_DB" "$TMPDIR/workers.db"
+import sqlite3, sys
+src, dst = sqlite3.connect(sys.argv[1]), sqlite3.connect(sys.argv[2])
+src.backup(dst)
+PY
+
+export DATABASE_URL="sqlite:///$TMPDIR/workers.db"
+export STORAGE_ROOT="$TMPDIR/storage"
+export RUN_EXECUTOR_MODE=workers
+export RUN_LEASE_S=2
+python -m uvicorn app.main:app --host 127.0.0.1 --port "$PORT" > "$TMPDIR/api.log" 2>&1 &
+API_PID=$!
+
+python - <<'PY' "http://127.0.0.1:$PORT" "$TMPDIR/workers.db"
+import json, os, signal, sqlite3, subprocess, sys, time, urllib.request
+
+base, db_path = sys.argv[1:3]
+pack = {"raw_input": "gate_run_workers", "final_prompt": "gate_run_workers", "assembly_used": False}
+
+def http(method, path, body=None):
+    req = urllib.request.Request(base + path, method=method, data=json.dumps(body).encode("utf-8") if body else None,
+                                 headers={"Content-Type": "application/json", "X-Provider-Enabled": "1"})
+    return json.loads(urllib.request.urlopen(req, timeout=30).read().decode("utf-8-sig"))
+
+def check(cond, msg):
+    if not cond:
+        print("[err] " + msg)
+        sys.exit(1)
+    print("[ok] " + msg)
+
+def worker(*args, **env):
+    return subprocess.Popen([sys.executable, "-m", "app.tools.run_worker", "--poll", "0.1", *args],
+                            env={**os.environ, **env}, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+deadline = time.time() + 30
+while True:
+    try:
+        urllib.request.urlopen(base + "/health", timeout=2)
+        break
+    except Exception:
+        if time.time() > deadline:
+            check(False, "API did not start (see api.log)")
+        time.sleep(0.2)
+check(http("GET", "/runs/queue").get("mode") == "workers", "API started in workers mode")
+
+# (1) a worker that dies holding a lease: the run is taken over once the lease expires
+crash_id = http("POST", "/runs", {"run_type": "t2i", "prompt_pack": pack, "inputs": {"gate": "crash"}})["run_id"]
+slow = worker("--processes", "1", "--threads", "1", MOCK_PROVIDER_LATENCY="fixed:60000")
+deadline = time.time() + 30
+while http("GET", "/runs/queue").get("leased", 0) < 1:
+    if time.time() > deadline:
+        slow.kill()
+        check(False, "slow worker did not lease the run")
+    time.sleep(0.1)
+os.kill(slow.pid, signal.SIGKILL)
+slow.wait()
+check(http("GET", f"/runs/{crash_id}")["status"] == "running", "worker killed mid-run, run left running")
+
+# (2) single runs, a batch and a sweep queued behind it
+run_ids = [http("POST", "/runs", {"run_type": "t2i", "prompt_pack": pack, "inputs": {"gate": k}})["run_id"] for k in range(4)]
+batch = http("POST", "/runs:batch", {"items": [{"run_type": "t2i", "prompt_pack": pack, "inputs": {"batch": k}} for k in range(3)]})
+run_ids += [i["run_id"] for i in batch["items"]]
+check(batch.get("created") == 3, "batch queued 3 runs")
+sweep = http("POST", "/runs", {"run_type": "t2i", "prompt_pack": pack,
+                               "variations": [{"seed": k} for k in range(4)], "fanout": 2})
+check(len(sweep.get("child_run_ids") or []) == 4, "sweep queued 4 children")
+q = http("GET", "/runs/queue")
+check(q.get("queue_depth", 0) >= 12, "queue depth %s (incl. the expired lease)" % q.get("queue_depth"))
+
+# (3) drain with two worker processes
+t0 = time.time()
+drain = worker("--processes", "2", "--threads", "2", "--drain")
+out, _ = drain.communicate(timeout=180)
+if drain.returncode != 0:
+    print(out[-2000:])
+check(drain.returncode == 0, "run_worker --drain exited 0 in %.1fs" % (time.time() - t0))
+
+statuses = {rid: http("GET", f"/runs/{rid}")["status"] for rid in run_ids + [crash_id]}
+check(set(statuses.values()) == {"succeeded"}, "all runs succeeded: %s" % sorted(set(statuses.values())))
+parent = http("GET", f"/runs/{sweep['run_id']}")
+check(parent["status"] == "succeeded", "sweep parent succeeded counts=%s" % parent["result_refs"]["sweep"]["counts"])
+check(http("GET", "/runs/queue").get("queue_depth") == 0, "run_leases drained")
+
+db = sqlite3.connect(db_path)
+rows = db.execute("SELECT status, result_refs_json FROM run_events WHERE run_id=? ORDER BY seq;", (crash_id,)).fetchall()
+lease = [json.loads(r or "{}").get("lease") for s, r in rows if s == "queued"]
+check(any(l and l.get("reason") == "lease_expired" for l in lease), "expired lease taken over: %s" % [s for s, _ in rows])
+PY
+RC=$?
+popd >/dev/null
+
+if [ $RC -ne 0 ]; then
+  err "gate_run_workers failed"
+  exit $RC
+fi
+echo "== gate_run_workers: passed =="
+exit 0